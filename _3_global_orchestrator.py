@@ -8,6 +8,7 @@
 #
 # Use this script to automate the full ETL pipeline run.
 
+import argparse
 import os
 import sys
 
@@ -22,6 +23,11 @@ from etl._1_pricing.pricing_orchestrator import main as run_pricing_etl
 from etl._2_financial_statements.financial_statements_orchestrator import main as run_financials_etl
 from etl._3_fundamentals.fundamentals_orchestrator import main as run_fundamentals_etl
 from etl._4_technicals.technicals_orchestrator import main as run_technicals_etl
+from etl.yq_cache import cache_stats
+from etl.fetch_engine import get_rate_controller
+from etl.run_manifest import set_resume
+from etl.shard_runner import set_shards
+from utils import ETL_RUN_ID
 
 def run_step(func, name):
     print(f"\n🚀 Running: {name}")
@@ -31,14 +37,30 @@ def run_step(func, name):
     except Exception as e:
         print(f"❌ Failed: {name} → {e}")
 
-def main():
+def main(resume=False, shards=None):
     print("🔁 Starting GLOBAL ETL Orchestration")
+    if shards:
+        # Extract steps run in `shards` processes sharing one rate budget
+        set_shards(shards)
+        print(f"🧩 Sharded extraction: {shards} processes per extract step")
+    if resume:
+        # Skip tickers this run already extracted, retry only failed or missing ones
+        set_resume(True)
+        print(f"⏯️ Resume mode: using extraction manifests of run {ETL_RUN_ID} in output/manifests/")
 
     run_step(run_pricing_etl, "Pricing ETL")
     run_step(run_financials_etl, "Financial Statements ETL")
     run_step(run_fundamentals_etl, "Fundamentals ETL")
     run_step(run_technicals_etl, "Technicals ETL")
+    print(f"\n🗄️ yahooquery cache: {cache_stats()}")
+    print(f"🚦 Rate controller: {get_rate_controller()}")
     print("\n🏁 GLOBAL ETL Orchestration Complete")
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description="Run all ETL segments")
+    parser.add_argument('--resume', action='store_true',
+                        help="skip tickers already extracted in this run (see ETL_RUN_ID), retry failed/missing ones")
+    parser.add_argument('--shards', type=int, default=None,
+                        help="split the ticker universe across this many extract processes (default: ETL_SHARDS)")
+    args = parser.parse_args()
+    main(resume=args.resume, shards=args.shards)
@@ -14,7 +14,7 @@ def move_csvs_with_structure(source_dir, base_archive_dir):
 
     for root, _, files in os.walk(source_dir):
         for file in files:
-            if file.lower().endswith(".csv"):
+            if file.lower().endswith((".csv", ".parquet")):
                 src_file = os.path.join(root, file)
 
                 # Calculate relative path from source_dir
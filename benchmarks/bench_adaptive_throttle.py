@@ -0,0 +1,122 @@
+# bench_adaptive_throttle.py
+# ----------------------
+# Drives the shared AdaptiveRateController against a local stub HTTP server
+# that answers 429 once the request rate goes over its capacity, and compares
+# it with the old fixed-pause approach.
+#
+# Usage: python benchmarks/bench_adaptive_throttle.py [seconds] [server_capacity_rps]
+
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from etl.fetch_engine import AdaptiveRateController
+
+WORKERS = 4
+FIXED_PAUSE = 0.5                         # Old per-request sleep
+
+
+class ThrottlingHandler(BaseHTTPRequestHandler):
+    capacity = 10                         # Requests per rolling second before 429s
+    window = deque()
+    lock = threading.Lock()
+
+    def do_GET(self):
+        now = time.monotonic()
+        with self.lock:
+            while self.window and now - self.window[0] > 1.0:
+                self.window.popleft()
+            throttled = len(self.window) >= self.capacity
+            if not throttled:
+                self.window.append(now)
+        self.send_response(429 if throttled else 200)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(b'{"error": "Too Many Requests"}' if throttled else b'{"result": []}')
+
+    def log_message(self, *args):
+        pass
+
+
+def call(url):
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def run_adaptive(url, seconds):
+    controller = AdaptiveRateController(rate=2, capacity=2, max_rate=50)
+    counts = {'ok': 0, 'throttled': 0}
+    lock = threading.Lock()
+    stop = time.monotonic() + seconds
+    samples = []
+
+    def worker():
+        while time.monotonic() < stop:
+            controller.acquire(1)
+            status = call(url)
+            with lock:
+                counts['ok' if status == 200 else 'throttled'] += 1
+            controller.on_success() if status == 200 else controller.on_throttle()
+
+    threads = [threading.Thread(target=worker) for _ in range(WORKERS)]
+    for t in threads:
+        t.start()
+    start = time.monotonic()
+    while time.monotonic() < stop:
+        time.sleep(1)
+        samples.append((time.monotonic() - start, controller.current_rate, dict(counts)))
+    for t in threads:
+        t.join()
+    return counts, samples
+
+
+def run_fixed(url, seconds):
+    counts = {'ok': 0, 'throttled': 0}
+    stop = time.monotonic() + seconds
+    while time.monotonic() < stop:
+        status = call(url)
+        counts['ok' if status == 200 else 'throttled'] += 1
+        time.sleep(FIXED_PAUSE)
+    return counts
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 15
+    ThrottlingHandler.capacity = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ThrottlingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/v8/finance/chart/TEST"
+
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        adaptive, samples = run_adaptive(url, seconds)
+    finally:
+        sys.stdout.close()
+        sys.stdout = sys.__stdout__
+    time.sleep(1.1)
+    fixed = run_fixed(url, seconds)
+    server.shutdown()
+
+    print(f"Stub capacity {ThrottlingHandler.capacity} req/s, {seconds:.0f}s per run, {WORKERS} workers")
+    print(f"{'t_s':>5} {'rate':>7} {'ok':>6} {'429':>6}")
+    for t, rate, counts in samples:
+        print(f"{t:>5.0f} {rate:>7.2f} {counts['ok']:>6} {counts['throttled']:>6}")
+    print(f"\nadaptive: {adaptive['ok'] / seconds:6.2f} ok req/s, {adaptive['throttled']} throttled")
+    print(f"fixed {FIXED_PAUSE}s: {fixed['ok'] / seconds:6.2f} ok req/s, {fixed['throttled']} throttled")
+
+
+if __name__ == '__main__':
+    main()
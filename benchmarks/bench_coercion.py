@@ -0,0 +1,147 @@
+# bench_coercion.py
+# -----------------
+# Technical insights load preparation: the old per-cell cleanup
+# (`.apply(lambda x: x.to_pydatetime())` on every datetime column, `.replace`
+# passes over object columns, string checks via astype(str)) against the
+# column-wise coercions (schema_registry.conform, epoch_text, fill_blank),
+# each followed by the text COPY encoding the loader sends. Uses the merged
+# technical insights file when it exists, else a synthetic CSV of the same
+# columns. Columns whose COPY output differs are listed: with pandas 3 the
+# old code filled a missing ms_summary_date as a timestamp (YYYY-MM-DD
+# 00:00:00) instead of the intended YYYY-MM-DD text.
+#
+# Usage: python benchmarks/bench_coercion.py [n_rows]
+
+import datetime
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+import pandas as pd
+from functools import partial
+from etl.bulk_load import COPY_CHUNK_ROWS, _chunks, _column_kind, _target_types
+from etl.schema_registry import iter_typed, mapped_column, sql_kind, table_columns
+from etl.staging import merged_path
+from etl._4_technicals.load_technicals import prepare_insights
+from utils import MERGED_DIR, PRICING_TECHNICAL_INSIGHTS_TABLE_NAME, rename_map
+
+REPEATS = 3                               # Best of N runs per method
+
+
+def legacy_prepare_insights(df_insights):
+    # prepare_insights as it was before the coercion layer
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')  # pandas 3 deprecations of the old calls
+        return _legacy_prepare(df_insights)
+
+def _legacy_prepare(df_insights):
+    df_insights.columns = [col.lower().replace('.', '_') for col in df_insights.columns]
+    df_insights.rename(columns=rename_map, inplace=True)
+    if 'ms_summary_date' in df_insights.columns:
+        df_insights['ms_summary_date'] = pd.to_datetime(
+            pd.to_numeric(df_insights['ms_summary_date'], errors='coerce'), unit='ms', errors='coerce'
+        )
+        df_insights['ms_summary_date'] = df_insights['ms_summary_date'].apply(
+            lambda x: x.to_pydatetime() if pd.notnull(x) else None
+        )
+    for col in df_insights.select_dtypes(include=['datetime64[ns]']).columns:
+        df_insights[col] = df_insights[col].apply(lambda x: x.to_pydatetime() if pd.notnull(x) else None)
+    for col in df_insights.select_dtypes(include='object').columns:
+        df_insights[col] = df_insights[col].replace({pd.NA: None, np.nan: None, "": None})
+    today_str = datetime.date.today().isoformat()
+    for col in ['ms_summary_date', 'research_date']:
+        if col in df_insights.columns:
+            df_insights[col] = df_insights[col].fillna(today_str)
+            df_insights.loc[df_insights[col].astype(str).str.strip() == '', col] = today_str
+    return df_insights
+
+
+def synthetic_insights(path, n_rows):
+    rng = np.random.default_rng(0)
+    source = {target: column for column, target in rename_map.items()}
+    columns = {}
+    for column, sql_type in table_columns(PRICING_TECHNICAL_INSIGHTS_TABLE_NAME).items():
+        kind = sql_kind(sql_type)
+        name = source.get(column, column)
+        if column == 'date':
+            columns[name] = datetime.date.today().isoformat()
+        elif column == 'symbol':
+            columns[name] = np.array([f"T{i:05d}" for i in range(n_rows)])
+        elif column == 'ms_summary_date':
+            epochs = rng.integers(1_600_000_000, 1_760_000_000, n_rows).astype('float64') * 1000
+            columns[name] = np.where(rng.random(n_rows) < 0.2, np.nan, epochs)
+        elif column == 'research_date':
+            columns[name] = np.where(rng.random(n_rows) < 0.3, '', '2025-06-30')
+        elif kind == 'int':
+            columns[name] = rng.integers(-3, 4, n_rows)
+        elif kind == 'float':
+            columns[name] = np.where(rng.random(n_rows) < 0.1, np.nan, rng.uniform(0, 500, n_rows).round(4))
+        elif kind == 'json':
+            columns[name] = '[]'
+        else:
+            columns[name] = rng.choice(['Bullish', 'Bearish', 'Neutral', ''], n_rows)
+    pd.DataFrame(columns).to_csv(path, index=False)
+
+
+def encode(df):
+    kinds = {c: _column_kind(df[c], t) for c, t in _target_types(df, PRICING_TECHNICAL_INSIGHTS_TABLE_NAME).items()}
+    return b''.join(_chunks(df, kinds, 'text', COPY_CHUNK_ROWS))
+
+
+def timed(prepare, chunks):
+    """(best prepare seconds, best prepare + encode seconds, prepared frames)."""
+    best_prepare = best_total = None
+    for _ in range(REPEATS):
+        frames = [chunk.copy() for chunk in chunks]
+        start = time.perf_counter()
+        prepared = [prepare(df) for df in frames]
+        middle = time.perf_counter()
+        for df in prepared:
+            encode(df)
+        end = time.perf_counter()
+        best_prepare = min(best_prepare or middle - start, middle - start)
+        best_total = min(best_total or end - start, end - start)
+    return best_prepare, best_total, prepared
+
+
+def differing_columns(left, right):
+    return [c for c in left[0].columns
+            if b''.join(encode(df[[c]]) for df in left) != b''.join(encode(df[[c]]) for df in right)]
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = merged_path(MERGED_DIR, 'merged_technical_insights')
+        if os.path.exists(path) and len(sys.argv) < 2:
+            print(f"📄 Using {path}")
+        else:
+            path = os.path.join(tmp, 'merged_technical_insights.csv')
+            synthetic_insights(path, n_rows)
+        chunks = list(iter_typed(path, PRICING_TECHNICAL_INSIGHTS_TABLE_NAME,
+                                 rename=partial(mapped_column, rename_map)))
+
+    rows = sum(len(df) for df in chunks)
+    results = {
+        'per-cell': timed(legacy_prepare_insights, chunks),
+        'column-wise': timed(prepare_insights, chunks),
+    }
+
+    print(f"\nmerged_technical_insights: {rows:,} rows (best of {REPEATS})")
+    print(f"{'method':>12} {'prepare (s)':>12} {'+ encode (s)':>13} {'rows/s':>12}")
+    for name, (prepare, total, _) in results.items():
+        print(f"{name:>12} {prepare:>12.3f} {total:>13.2f} {rows / total:>12,.0f}")
+    legacy, vectorized = results['per-cell'], results['column-wise']
+    print(f"prepare speedup {legacy[0] / vectorized[0]:.1f}x, with encoding {legacy[1] / vectorized[1]:.1f}x")
+    print(f"columns with different COPY output: {differing_columns(legacy[2], vectorized[2]) or 'none'}")
+
+
+if __name__ == '__main__':
+    main()
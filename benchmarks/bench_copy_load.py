@@ -0,0 +1,130 @@
+# bench_copy_load.py
+# ------------------
+# pricing_history load time: the old `execute_values` path (object frame ->
+# list of tuples -> escaped VALUES) against `copy_dataframe` in text and
+# binary COPY format, all upserting on the (ticker, date) key. Loads the
+# merged history file when it exists, else a synthetic frame of the same
+# shape. With a reachable database (DB_PARAMS) each method loads into a
+# temporary copy of the table; without one, only the client-side work
+# (building the statement / encoding the COPY stream) is timed.
+#
+# Usage: python benchmarks/bench_copy_load.py [n_tickers]
+
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+import pandas as pd
+import psycopg2
+from psycopg2.extensions import adapt
+from psycopg2.extras import execute_values
+from setup.table_definitions import KEYS, TABLES
+from etl.bulk_load import COPY_CHUNK_ROWS, _chunks, _column_kind, _target_types, copy_dataframe
+from etl.schema_registry import read_typed
+from etl.staging import merged_path
+from utils import DB_PARAMS, MERGED_DIR, PRICING_HISTORY_TABLE_NAME
+
+N_BARS = 2500                             # Rows per synthetic ticker (~10 years of daily bars)
+TABLE = 'pricing_history'                 # Temporary table; shadows the real one for this session
+
+
+def history_frame(n_tickers):
+    path = merged_path(MERGED_DIR, 'merged_history')
+    if os.path.exists(path) and len(sys.argv) < 2:
+        print(f"📄 Using {path}")
+        return read_typed(path, PRICING_HISTORY_TABLE_NAME)
+    rng = np.random.default_rng(0)
+    n = n_tickers * N_BARS
+    close = rng.uniform(10, 500, n).round(6)
+    df = pd.DataFrame({
+        'date': np.tile(pd.date_range('2015-01-01', periods=N_BARS, freq='B').values, n_tickers),
+        'ticker': pd.Categorical(np.repeat([f"T{i:04d}" for i in range(n_tickers)], N_BARS)),
+        'open': close, 'high': close * 1.01, 'low': close * 0.99, 'close': close, 'adjclose': close,
+        'volume': rng.integers(0, 10_000_000, n).astype('float64'),
+        'dividends': 0.0, 'splits': 0.0,
+    })
+    df.loc[df.sample(frac=0.01, random_state=0).index, 'adjclose'] = np.nan
+    return df
+
+
+def execute_values_rows(df):
+    # What the loaders did before: None for every missing value, then one tuple per row
+    return [tuple(x) for x in df.astype(object).where(df.notna(), None).to_numpy()]
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def bench_database(df):
+    conn = psycopg2.connect(**DB_PARAMS)
+    cols = ', '.join(df.columns)
+    key = ', '.join(KEYS[TABLE])
+    updates = ', '.join(f"{c} = EXCLUDED.{c}" for c in df.columns if c not in KEYS[TABLE])
+    results = {}
+
+    def run(name, load):
+        with conn.cursor() as cur:
+            cur.execute(f"DROP TABLE IF EXISTS pg_temp.{TABLE}; "
+                        f"CREATE TEMP TABLE {TABLE} ({TABLES[TABLE]}, PRIMARY KEY ({key}))")
+        results[name] = timed(load)
+        with conn.cursor() as cur:
+            cur.execute(f"SELECT count(*) FROM pg_temp.{TABLE}")
+            assert cur.fetchone()[0] == len(df), f"{name} loaded a different row count"
+        conn.rollback()
+
+    def insert_values():
+        with conn.cursor() as cur:
+            execute_values(cur, f"INSERT INTO {TABLE} ({cols}) VALUES %s ON CONFLICT ({key}) DO UPDATE SET {updates}",
+                           execute_values_rows(df))
+
+    run('execute_values', insert_values)
+    run('COPY text', lambda: copy_dataframe(conn, df, TABLE, 'text'))
+    run('COPY binary', lambda: copy_dataframe(conn, df, TABLE, 'binary'))
+    conn.close()
+    return results
+
+
+def bench_client(df):
+    # No database: time what each method does before anything goes over the wire
+    kinds = {c: _column_kind(df[c], t) for c, t in _target_types(df, TABLE).items()}
+
+    def quote_values():
+        for row in execute_values_rows(df):
+            b'(' + b','.join(adapt(v).getquoted() for v in row) + b')'
+
+    def encode(fmt):
+        return lambda: sum(len(chunk) for chunk in _chunks(df, kinds, fmt, COPY_CHUNK_ROWS))
+
+    return {
+        'execute_values': timed(quote_values),
+        'COPY text': timed(encode('text')),
+        'COPY binary': timed(encode('binary')),
+    }
+
+
+def main():
+    n_tickers = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    df = history_frame(n_tickers)
+    try:
+        results, mode = bench_database(df), 'load into a temp table'
+    except psycopg2.OperationalError as e:
+        print(f"⚠️ No database ({str(e).strip().splitlines()[0]}), timing client-side encoding only")
+        results, mode = bench_client(df), 'client-side encoding'
+
+    print(f"\npricing_history: {len(df):,} rows ({mode})")
+    print(f"{'method':>16} {'time (s)':>10} {'rows/s':>12} {'speedup':>8}")
+    baseline = results['execute_values']
+    for name, seconds in results.items():
+        print(f"{name:>16} {seconds:>10.2f} {len(df) / seconds:>12,.0f} {baseline / seconds:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+# bench_history_fetch.py
+# ----------------------
+# Wall-clock scaling of the price history fetch engine against a local fake
+# `Ticker` backend (no network). Each fake request sleeps LATENCY seconds,
+# like one yahooquery chart call per symbol.
+#
+# Usage: python benchmarks/bench_history_fetch.py [n_tickers]
+
+import os
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+import pandas as pd
+from etl._1_pricing import _1_history
+from etl.fetch_engine import TokenBucket, chunk, run_batches
+
+LATENCY = 0.05                            # Seconds per fake request
+N_BARS = 250                              # Bars returned per ticker
+RATE = 200                                # Requests/second budget for the run
+
+
+class FakeTicker:
+    def __init__(self, symbols, **kwargs):
+        self.symbols = symbols if isinstance(symbols, list) else [symbols]
+
+    def history(self, period='ytd', start=None, **kwargs):
+        frames = {}
+        dates = pd.date_range('2020-01-01', periods=N_BARS, freq='B').date
+        for symbol in self.symbols:
+            time.sleep(LATENCY)
+            close = np.linspace(100, 120, N_BARS)
+            frames[symbol] = pd.DataFrame({
+                'open': close, 'high': close, 'low': close, 'close': close,
+                'adjclose': close, 'volume': 1000, 'dividends': 0.0, 'splits': 0.0,
+            }, index=pd.Index(dates, name='date'))
+        return pd.concat(frames, names=['symbol', 'date'])
+
+
+def run(tickers, output_dir, max_in_flight):
+    start = time.perf_counter()
+    run_batches(
+        chunk(tickers, _1_history.BATCH_SIZE),
+        lambda batch: _1_history.download_price_history(batch, output_dir),
+        max_in_flight=max_in_flight,
+        limiter=TokenBucket(RATE, _1_history.BATCH_SIZE * max_in_flight),
+    )
+    return time.perf_counter() - start
+
+
+def main():
+    n_tickers = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    tickers = [f"T{i:04d}" for i in range(n_tickers)]
+    _1_history.Ticker = FakeTicker
+
+    results = []
+    with tempfile.TemporaryDirectory() as output_dir:
+        for max_in_flight in (1, 2, 4, 8):
+            sys.stdout = open(os.devnull, 'w')
+            try:
+                elapsed = run(tickers, output_dir, max_in_flight)
+            finally:
+                sys.stdout.close()
+                sys.stdout = sys.__stdout__
+            results.append((max_in_flight, elapsed))
+
+    base = results[0][1]
+    print(f"{n_tickers} tickers, batch={_1_history.BATCH_SIZE}, latency={LATENCY}s, rate={RATE}/s")
+    print(f"{'in_flight':>10} {'wall_s':>8} {'speedup':>8}")
+    for max_in_flight, elapsed in results:
+        print(f"{max_in_flight:>10} {elapsed:>8.2f} {base / elapsed:>8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
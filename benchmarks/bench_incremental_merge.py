@@ -0,0 +1,74 @@
+# bench_incremental_merge.py
+# --------------------------
+# Re-merge time vs. number of changed input files: a full `stream_merge`
+# against `merge_csvs`, which only re-reads the files whose fingerprint moved
+# since the previous merge and copies every other file's rows from the
+# previous output. Uses ETL_STAGING_FORMAT (incremental merges need parquet);
+# no network, no database.
+#
+# Usage: python benchmarks/bench_incremental_merge.py [n_files]
+
+import os
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+import pandas as pd
+from etl._1_pricing.merge_pricing import merge_csvs, postprocess_pricing_history
+from etl.merge_engine import stream_merge
+from etl.staging import list_frames, staging_path, write_frame, merged_path
+
+N_BARS = 2500                             # Rows per file (~10 years of daily bars)
+
+
+def make_file(input_dir, ticker, shift=0.0):
+    dates = pd.date_range('2015-01-01', periods=N_BARS, freq='B').date
+    close = np.linspace(100, 120, N_BARS) + shift
+    df = pd.DataFrame({
+        'date': dates, 'ticker': ticker, 'open': close, 'high': close, 'low': close, 'close': close,
+        'adjclose': close, 'volume': 1000, 'dividends': 0.0, 'splits': 0.0,
+    })
+    write_frame(df, staging_path(input_dir, ticker))
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main():
+    n_files = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    changes = [k for k in (0, 1, 10, 50, 200) if k <= n_files]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_dir = os.path.join(tmp, 'history')
+        output_dir = os.path.join(tmp, 'merged')
+        tickers = [f"T{i:04d}" for i in range(n_files)]
+        for ticker in tickers:
+            make_file(input_dir, ticker)
+        merge_csvs(input_dir, output_dir, 'incremental', postprocess=postprocess_pricing_history)
+
+        results = []
+        for round_no, n_changed in enumerate(changes, start=1):
+            for ticker in tickers[:n_changed]:
+                make_file(input_dir, ticker, shift=round_no)
+            t_full = timed(stream_merge, list_frames(input_dir), merged_path(output_dir, 'full'),
+                           transform=postprocess_pricing_history)
+            t_incr = timed(merge_csvs, input_dir, output_dir, 'incremental',
+                           postprocess=postprocess_pricing_history)
+            results.append((n_changed, t_full, t_incr))
+
+    print(f"\n{n_files} files x {N_BARS} rows")
+    print(f"{'changed':>8} {'full (s)':>10} {'incremental (s)':>16} {'speedup':>8}")
+    for n_changed, t_full, t_incr in results:
+        print(f"{n_changed:>8} {t_full:>10.2f} {t_incr:>16.2f} {t_full / t_incr:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+# bench_load_memory.py
+# --------------------
+# Peak RSS of the load stage vs. table size: `load_file` streams a merged
+# pricing_history file of N rows (read typed, encoded for COPY) in chunks
+# sized from ETL_LOAD_MEMORY_MB, against reading the whole file first as
+# the loaders used to. Each run is a separate process so peaks do not mix.
+# The COPY stream goes to a connection that discards it: no database, and
+# only the client-side memory is measured.
+#
+# Usage: python benchmarks/bench_load_memory.py [max_million_rows]
+
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from etl.merge_engine import MERGE_BUFFER_ROWS
+from etl.staging import PARQUET_COMPRESSION
+from utils import LOAD_MEMORY_MB, PRICING_HISTORY_TABLE_NAME
+
+
+class DiscardCursor:
+    rowcount = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        pass
+
+    def fetchone(self):
+        return None
+
+    def fetchall(self):
+        return []
+
+    def copy_expert(self, sql, stream, size):
+        while stream.read(size):
+            pass
+
+
+class DiscardConnection:
+    autocommit = True
+
+    def cursor(self):
+        return DiscardCursor()
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+def make_history(path, n_rows):
+    rng = np.random.default_rng(0)
+    tickers = np.array([f"T{i:04d}" for i in range(500)])
+    writer = None
+    for start in range(0, n_rows, MERGE_BUFFER_ROWS):
+        n = min(MERGE_BUFFER_ROWS, n_rows - start)
+        close = rng.uniform(10, 500, n)
+        df = pd.DataFrame({
+            'date': pd.Timestamp('2010-01-01') + pd.to_timedelta(rng.integers(0, 5000, n), 'D'),
+            'ticker': rng.choice(tickers, n), 'open': close, 'high': close, 'low': close, 'close': close,
+            'adjclose': close, 'volume': rng.integers(0, 10_000_000, n).astype('float64'),
+            'dividends': 0.0, 'splits': 0.0,
+        })
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        writer = writer or pq.ParquetWriter(path, table.schema, compression=PARQUET_COMPRESSION)
+        writer.write_table(table, row_group_size=MERGE_BUFFER_ROWS)  # Same row groups as merged outputs
+    writer.close()
+
+
+def measure(mode, path):
+    """Run in a child process: load `path` one way and print (seconds, peak RSS MB)."""
+    from etl.bulk_load import copy_dataframe, load_file
+    from etl.schema_registry import read_typed
+
+    start = time.perf_counter()
+    if mode == 'chunked':
+        load_file(DiscardConnection(), path, PRICING_HISTORY_TABLE_NAME, drop_indexes=False)
+    else:
+        copy_dataframe(DiscardConnection(), read_typed(path, PRICING_HISTORY_TABLE_NAME), PRICING_HISTORY_TABLE_NAME)
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{time.perf_counter() - start:.2f} {peak_mb:.0f}")
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == '--measure':
+        return measure(sys.argv[2], sys.argv[3])
+    max_millions = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    sizes = [m * 1_000_000 for m in (1, 2, 4, 8) if m <= max_millions]
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in sizes:
+            path = os.path.join(tmp, f"history_{n_rows}.parquet")
+            make_history(path, n_rows)
+            for mode in ('whole file', 'chunked'):
+                out = subprocess.run([sys.executable, __file__, '--measure', mode.split()[0], path],
+                                     capture_output=True, text=True, check=True).stdout
+                seconds, peak_mb = out.strip().splitlines()[-1].split()
+                results.append((n_rows, mode, float(seconds), float(peak_mb)))
+
+    print(f"\npricing_history load, ETL_LOAD_MEMORY_MB={LOAD_MEMORY_MB}")
+    print(f"{'rows':>10} {'mode':>11} {'time (s)':>9} {'peak RSS (MB)':>14}")
+    for n_rows, mode, seconds, peak_mb in results:
+        print(f"{n_rows:>10,} {mode:>11} {seconds:>9.1f} {peak_mb:>14.0f}")
+
+
+if __name__ == '__main__':
+    main()
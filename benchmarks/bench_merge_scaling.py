@@ -0,0 +1,74 @@
+# bench_merge_scaling.py
+# ----------------------
+# Merge time vs. number of staged history files: the old concat-in-a-loop
+# merge against the streaming `merge_csvs`. Per-file time should stay flat
+# for the streaming merge (linear scaling) and grow for the loop (quadratic).
+# Uses ETL_STAGING_FORMAT (parquet by default); no network, no database.
+#
+# Usage: python benchmarks/bench_merge_scaling.py [max_files]
+
+import os
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+import pandas as pd
+from etl._1_pricing.merge_pricing import merge_csvs, postprocess_pricing_history
+from etl.staging import list_frames, read_frame, staging_path, write_frame, merged_path
+
+N_BARS = 2500                             # Rows per file (~10 years of daily bars)
+
+
+def make_files(input_dir, n_files):
+    dates = pd.date_range('2015-01-01', periods=N_BARS, freq='B').date
+    close = np.linspace(100, 120, N_BARS)
+    for i in range(n_files):
+        ticker = f"T{i:04d}"
+        df = pd.DataFrame({
+            'date': dates, 'ticker': ticker, 'open': close, 'high': close, 'low': close, 'close': close,
+            'adjclose': close, 'volume': 1000, 'dividends': 0.0, 'splits': 0.0,
+        })
+        write_frame(df, staging_path(input_dir, ticker))
+
+
+def legacy_merge(input_dir, output_dir, output_name):
+    # The previous implementation: grow one frame with pd.concat per file
+    merged_df = pd.DataFrame()
+    for path in list_frames(input_dir):
+        merged_df = pd.concat([merged_df, read_frame(path)], ignore_index=True)
+    merged_df = postprocess_pricing_history(merged_df)
+    write_frame(merged_df, merged_path(output_dir, output_name))
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main():
+    max_files = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    sizes = [n for n in (50, 100, 200, 400, 800) if n <= max_files] or [max_files]
+
+    print(f"{'files':>6} {'rows':>10} {'loop (s)':>10} {'ms/file':>8} {'stream (s)':>11} {'ms/file':>8}")
+    for n_files in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            input_dir = os.path.join(tmp, 'history')
+            output_dir = os.path.join(tmp, 'merged')
+            make_files(input_dir, n_files)
+
+            t_loop = timed(legacy_merge, input_dir, output_dir, 'legacy')
+            t_stream = timed(merge_csvs, input_dir, output_dir, 'streamed',
+                             postprocess=postprocess_pricing_history)
+
+            print(f"{n_files:>6} {n_files * N_BARS:>10} {t_loop:>10.2f} {1000 * t_loop / n_files:>8.1f} "
+                  f"{t_stream:>11.2f} {1000 * t_stream / n_files:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,17 +1,47 @@
 import os
-import time
+import sys
+
+# Add project root to sys.path for imports
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
 import pandas as pd
-from yahooquery import Ticker
-from utils import TICKERS_CSV, PRICING_HISTORY_OUTPUT_DIR
+from datetime import date
+from etl.yq_cache import CachedTicker as Ticker, trading_date
+from utils import TICKERS_CSV, PRICING_HISTORY_OUTPUT_DIR, FORCE_FULL_HISTORY
+from etl.fetch_engine import chunk, run_batches
+from etl._1_pricing.watermarks import get_watermarks, read_rebuilds, write_rebuilds
+from etl.run_manifest import get_manifest, HISTORY_MANIFEST_STEP
+from etl.shard_context import load_tickers
+from etl.staging import staging_path, write_frame
 
-# Where to save per-ticker CSVs
+# Where to save per-ticker staging files
 BATCH_SIZE = 5                            # Tickers per API call
-SLEEP_BETWEEN_BATCHES = 2                 # Seconds delay between batches
+MAX_IN_FLIGHT = 4                         # Batches fetched concurrently (paced by the shared rate controller)
+MANIFEST_STEP = HISTORY_MANIFEST_STEP
 
-def download_price_history(tickers: list, output_dir: str):
+def download_price_history(tickers: list, output_dir: str, start=None, rebuilds=()):
+    # start=None pulls the full history, otherwise only bars from `start` (YYYY-MM-DD) onwards.
+    # A full pull of a ticker in `rebuilds` is recorded as 'rebuilt': only those replace their loaded rows.
+    # Returns the tickers whose incremental bars carry a new split or dividend.
+    corporate_actions = []
+    manifest = get_manifest(MANIFEST_STEP)
     t = Ticker(tickers)
     try:
-        full_df = t.history(period='max')
+        full_df = t.history(start=start) if start else t.history(period='max')
+        if isinstance(full_df, dict):
+            # A symbol that errors turns the response into {symbol: DataFrame or error message}
+            frames = {symbol: value.droplevel(0) if isinstance(value.index, pd.MultiIndex) else value
+                      for symbol, value in full_df.items() if isinstance(value, pd.DataFrame) and not value.empty}
+            if frames:
+                full_df = pd.concat(frames, names=['symbol', 'date'])
+        if not isinstance(full_df, pd.DataFrame) or full_df.empty:
+            # An error payload or a batch without any bars is a failed (retryable) pull, not an empty history
+            print(f"⚠️ No data returned for {tickers}: {full_df}")
+            for ticker in tickers:
+                manifest.record(ticker, 'history', 'failed')
+            return corporate_actions
 
         for ticker in tickers:
             try:
@@ -22,43 +52,115 @@ def download_price_history(tickers: list, output_dir: str):
 
                 if df.empty or 'close' not in df.columns:
                     print(f"⚠️ No valid data for {ticker}")
+                    manifest.record(ticker, 'history', 'empty')
                     continue
 
                 df = df.reset_index()
                 df['ticker'] = ticker
+                # Daily bars are dates, but the bar of a session still open is a tz-aware timestamp:
+                # stage the (exchange-local) day of every bar
+                df['date'] = pd.to_datetime(df['date'].astype(str).str[:10]).dt.date
 
                 # ✅ Reorder columns
                 desired_order = ['date', 'ticker', 'open', 'high', 'low', 'close', 'adjclose', 'volume', 'dividends',
                                  'splits']
-                df = df[desired_order]
+                df = df.reindex(columns=desired_order)
+                df[['dividends', 'splits']] = df[['dividends', 'splits']].fillna(0)
+
+                # New split/dividend → adjclose of all earlier bars is stale
+                # (the `start` bar itself was loaded before, its actions already handled)
+                status = 'rebuilt' if start is None and ticker in rebuilds else 'ok'
+                new_bars = df['date'].astype(str).str[:10] > start if start else None
+                if start and (df.loc[new_bars, ['dividends', 'splits']] != 0).any().any():
+                    print(f"🔁 Corporate action detected for {ticker}, scheduling full rebuild")
+                    corporate_actions.append(ticker)
+                    status = 'rebuild_pending'
 
-                output_path = os.path.join(output_dir, f'{ticker}.csv')
-                df.to_csv(output_path, index=False)
+                output_path = write_frame(df, staging_path(output_dir, ticker))
+                manifest.record(ticker, 'history', status, len(df), output_path)
                 print(f"✅ Saved {ticker} to {output_path}")
 
             except KeyError:
                 print(f"❌ No data found for {ticker} in batch response")
+                manifest.record(ticker, 'history', 'empty')
             except Exception as e:
                 print(f"❌ Failed for {ticker}: {e}")
+                manifest.record(ticker, 'history', 'failed')
 
     except Exception as e:
         print(f"❌ Batch failed for tickers {tickers}: {e}")
+        for ticker in tickers:
+            manifest.record(ticker, 'history', 'failed')
+
+    return corporate_actions
 
-def main():
+def plan_history_jobs(tickers: list, watermarks: dict):
+    """Split tickers into (batch, start) jobs.
+
+    Tickers without a watermark get a full-history job (start=None); the rest
+    are grouped by the day of their last loaded bar so each batch shares one
+    `start`. Pulling that day again replaces a bar loaded while its session was
+    still open (the load upserts it). Tickers whose last bar is after the last
+    trading day are skipped.
+    """
+    last_session = trading_date()
+    full, by_start = [], {}
+    for ticker in tickers:
+        watermark = watermarks.get(ticker)
+        if not watermark:
+            full.append(ticker)
+            continue
+        start = date.fromisoformat(str(watermark)[:10])
+        if start > last_session:
+            continue
+        by_start.setdefault(start.isoformat(), []).append(ticker)
+
+    jobs = [(batch, None) for batch in chunk(full, BATCH_SIZE)]
+    for start, group in sorted(by_start.items()):
+        jobs.extend((batch, start) for batch in chunk(group, BATCH_SIZE))
+    return jobs
+
+def main(force_full=FORCE_FULL_HISTORY):
     os.makedirs(PRICING_HISTORY_OUTPUT_DIR, exist_ok=True)
 
     # Step 1: Load tickers
-    df = pd.read_csv(TICKERS_CSV)
-    tickers = df['Symbol'].dropna().unique().tolist()
+    tickers = load_tickers(TICKERS_CSV)
 
     print(f"📄 Loaded {len(tickers)} tickers from CSV")
+    tickers = get_manifest(MANIFEST_STEP).pending(tickers, ['history'])
+
+    # Step 2: Plan full vs incremental pulls from the last loaded date per ticker
+    watermarks = {} if force_full else get_watermarks()
+    # Tickers still queued for a rebuild (load not run yet) need their full history again
+    pending = set(read_rebuilds())
+    watermarks = {ticker: wm for ticker, wm in watermarks.items() if ticker not in pending}
+    jobs = plan_history_jobs(tickers, watermarks)
+    n_full = sum(len(batch) for batch, start in jobs if start is None)
+    n_incr = sum(len(batch) for batch, start in jobs if start is not None)
+    print(f"🧮 Full history: {n_full} tickers | Incremental: {n_incr} tickers | "
+          f"Up to date: {len(tickers) - n_full - n_incr} tickers")
+
+    # Step 3: Fetch batches concurrently under the shared adaptive rate controller
+    results = run_batches(
+        jobs,
+        lambda job: download_price_history(job[0], PRICING_HISTORY_OUTPUT_DIR, start=job[1], rebuilds=pending),
+        max_in_flight=MAX_IN_FLIGHT,
+    )
 
-    # Step 2: Loop in batches
-    for i in range(0, len(tickers), BATCH_SIZE):
-        batch = tickers[i:i+BATCH_SIZE]
-        print(f"\n⏳ Processing batch {i//BATCH_SIZE + 1} / {len(tickers)//BATCH_SIZE + 1}")
-        download_price_history(batch, PRICING_HISTORY_OUTPUT_DIR)
-        time.sleep(SLEEP_BETWEEN_BATCHES)
+    # Step 4: Refetch the full history only for tickers with a new split/dividend;
+    # load_pricing replaces their rows in pricing_history once the refetch is recorded as 'rebuilt'
+    # (a failed refetch leaves the incremental file and the ticker stays queued)
+    rebuilds = sorted({ticker for found in results.values() if found for ticker in found})
+    if rebuilds:
+        print(f"\n🔁 Rebuilding full history for {len(rebuilds)} tickers: {rebuilds}")
+        # Queue first (keeping tickers queued by a previous run whose load has not happened yet),
+        # so a crash before the refetch still forces a full pull next time
+        write_rebuilds(sorted(set(read_rebuilds()) | set(rebuilds)))
+        run_batches(
+            chunk(rebuilds, BATCH_SIZE),
+            lambda batch: download_price_history(batch, PRICING_HISTORY_OUTPUT_DIR, rebuilds=rebuilds),
+            max_in_flight=MAX_IN_FLIGHT,
+        )
 
 if __name__ == '__main__':
     main()
@@ -1,45 +1,118 @@
 import os
+import sys
+
+# Add project root to sys.path for imports
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import time
 import pandas as pd
-from yahooquery import Ticker
-from time import sleep
+from etl.yq_cache import CachedTicker as Ticker
 from utils import TICKERS_CSV, PRICING_OPTION_CHAIN_OUTPUT_DIR
+from etl.fetch_engine import BASE_BACKOFF, chunk, is_throttle_error, run_batches
+from etl.run_manifest import get_manifest
+from etl.shard_context import load_tickers
+from etl.staging import staging_path, write_frame
 
-os.makedirs(PRICING_OPTION_CHAIN_OUTPUT_DIR, exist_ok=True)
+BATCH_SIZE = 10                           # Symbols per Ticker call
+ASYNCHRONOUS = True                       # Let yahooquery fetch a batch's symbols in parallel
+MAX_IN_FLIGHT = 2                         # Batches fetched concurrently (paced by the shared rate controller)
+MAX_RETRIES = 2                           # Per-symbol retries after a batch miss
+MANIFEST_STEP = 'option_chain'
 
-# Load tickers
-tickers = pd.read_csv(TICKERS_CSV)['Symbol'].dropna().unique().tolist()
-
-def main():
+OPTION_COLUMNS = ['symbol', 'expiration', 'optionType', 'contractSymbol', 'strike',
+                  'lastPrice', 'bid', 'ask', 'volume', 'openInterest', 'impliedVolatility',
+                  'inTheMoney']
 
-    for symbol in tickers:
-        print(f"🔄 Processing {symbol}...")
+def save_option_chain(df, symbol):
+    # Reset index (symbol, expiration & optionType are index levels)
+    df = df.reset_index()
+    df['symbol'] = symbol  # Ensure ticker column exists
+    df = df[OPTION_COLUMNS]
 
-        try:
-            tkr = Ticker(symbol)
-            df = tkr.option_chain  # Already flattened multi-index DataFrame
+    file_path = write_frame(df, staging_path(PRICING_OPTION_CHAIN_OUTPUT_DIR, symbol))
+    get_manifest(MANIFEST_STEP).record(symbol, 'option_chain', 'ok', len(df), file_path)
+    print(f"✅ Saved: {file_path}")
 
-            # Reset index (expiration & optionType are index levels)
-            df = df.reset_index()
-            df['symbol'] = symbol  # Ensure ticker column exists
+def record_empty(symbol, reason):
+    print(f"⏭️ No option chain for {symbol}: {reason}")
+    get_manifest(MANIFEST_STEP).record(symbol, 'option_chain', 'empty')
 
-            # Optional: reorder or rename columns
-            cols = ['symbol', 'expiration', 'optionType', 'contractSymbol', 'strike',
-                    'lastPrice', 'bid', 'ask', 'volume', 'openInterest', 'impliedVolatility',
-                    'inTheMoney']
-            df = df[cols]
+def fetch_option_chain_batch(symbols: list, final=False):
+    """Fetch option chains for several symbols in one Ticker call and save one staging file per symbol.
 
-            # Save to CSV
-            file_path = os.path.join(PRICING_OPTION_CHAIN_OUTPUT_DIR, f"{symbol}.csv")
-            df.to_csv(file_path, index=False)
+    Returns the symbols that could not be saved so they can be retried on their own.
+    With `final` (a symbol's own retry), an answer without its chain is recorded
+    as 'empty' instead: the symbol lists no options. Errors and 429s still
+    return it for another attempt.
+    """
+    print(f"🔄 Processing {symbols}...")
+    try:
+        chain = Ticker(symbols, asynchronous=ASYNCHRONOUS).option_chain
+    except Exception as e:
+        print(f"❌ Batch failed for {symbols}: {e}")
+        return list(symbols)
 
-            print(f"✅ Saved: {file_path}")
-            sleep(0.5)  # Prevent rate limit
+    if not isinstance(chain, pd.DataFrame) or not isinstance(chain.index, pd.MultiIndex):
+        if final and not is_throttle_error(chain):
+            for symbol in symbols:
+                record_empty(symbol, chain.get(symbol, chain) if isinstance(chain, dict) else chain)
+            return []
+        print(f"⚠️ No option chain data for {symbols}: {chain}")
+        return list(symbols)
 
+    failed = []
+    found = set(chain.index.get_level_values('symbol'))
+    for symbol in symbols:
+        if symbol not in found:
+            if final:
+                record_empty(symbol, "not in the response")
+                continue
+            print(f"⚠️ No option chain for {symbol} in batch response")
+            failed.append(symbol)
+            continue
+        try:
+            save_option_chain(chain.xs(symbol, level='symbol', drop_level=False), symbol)
         except Exception as e:
             print(f"❌ Failed for {symbol}: {e}")
-            continue
+            failed.append(symbol)
+    return failed
 
-if __name__ == '__main__':
-    main()
+def retry_symbol(symbol: str):
+    # The shared rate controller only slows down on 429s: other misses back off here
+    for attempt in range(1, MAX_RETRIES + 1):
+        time.sleep(BASE_BACKOFF * 2 ** (attempt - 1))
+        print(f"🔁 Retry {attempt}/{MAX_RETRIES} for {symbol}")
+        if not fetch_option_chain_batch([symbol], final=True):
+            return True
+    print(f"❌ Giving up on {symbol} after {MAX_RETRIES} retries")
+    get_manifest(MANIFEST_STEP).record(symbol, 'option_chain', 'failed')
+    return False
+
+def main():
+    os.makedirs(PRICING_OPTION_CHAIN_OUTPUT_DIR, exist_ok=True)
 
+    # Load tickers
+    tickers = load_tickers(TICKERS_CSV)
+    print(f"📄 Loaded {len(tickers)} tickers from CSV")
+    tickers = get_manifest(MANIFEST_STEP).pending(tickers, ['option_chain'])
 
+    results = run_batches(
+        chunk(tickers, BATCH_SIZE),
+        fetch_option_chain_batch,
+        max_in_flight=MAX_IN_FLIGHT,
+    )
+
+    # Retry misses one symbol at a time so a bad symbol never costs a whole batch
+    failed = [symbol for missed in results.values() if missed for symbol in missed]
+    if failed:
+        print(f"\n🔁 Retrying {len(failed)} symbols individually")
+        run_batches(
+            chunk(failed, 1),
+            lambda batch: retry_symbol(batch[0]),
+            max_in_flight=MAX_IN_FLIGHT,
+        )
+
+if __name__ == '__main__':
+    main()
@@ -1,51 +1,105 @@
 import os
 import pandas as pd
-import psycopg2
-from psycopg2.extras import execute_values
 import numpy as np
 import datetime
+from functools import partial
 from utils import (
     MERGED_DIR,
-    DB_PARAMS,
     PRICING_HISTORY_TABLE_NAME,
     OPTION_CHAIN_TABLE_NAME
 )
+from etl.staging import merged_path
+from etl.schema_registry import iter_typed
+from etl.bulk_load import load_file
+from etl.partitions import maintain_partitions
+from etl.load_coordinator import pooled_connection, run_loads
+from etl.run_manifest import get_manifest, HISTORY_MANIFEST_STEP
+from etl._1_pricing.watermarks import get_watermarks, update_file_watermarks, read_rebuilds, remove_rebuilds
 
-# --- Insert DataFrame into Table ---
-def insert_dataframe(conn, df, table_name):
-    if df.empty:
-        print(f"⚠️ Skipping empty DataFrame for {table_name}")
-        return
-    cols = ','.join(df.columns)
-    values = [tuple(x) for x in df.to_numpy()]
-    with conn.cursor() as cur:
-        query = f"INSERT INTO {table_name} ({cols}) VALUES %s ON CONFLICT DO NOTHING"
-        execute_values(cur, query, values)
-    print(f"✅ Inserted into {table_name}: {len(df)} rows")
+# --- Stream a merged file into a table ---
+def load_table(conn, path, table_name, **load_kwargs):
+    rows = load_file(conn, path, table_name, **load_kwargs)
+    if rows:
+        print(f"✅ Inserted into {table_name}: {rows} rows")
+    else:
+        print(f"⚠️ Nothing to insert into {table_name}")
+    return rows
 
-# --- Main Execution ---
-def main():
-    conn = psycopg2.connect(**DB_PARAMS)
-    conn.autocommit = True
+# --- Rebuilt tickers: their full history replaces the loaded rows (in the load's first transaction) ---
+def rebuilt_tickers(path, rebuilds):
+    """Tickers queued for a rebuild that actually have rows in the merged file."""
+    present = set()
+    if rebuilds:
+        for chunk in iter_typed(path, PRICING_HISTORY_TABLE_NAME, columns=['ticker']):
+            present.update(set(chunk['ticker'].dropna().unique()) & rebuilds)
+    return sorted(present)
 
-    # === 1. Load Historical Prices ===
-    try:
-        print("📥 Loading Historical Prices...")
-        df_hist = pd.read_csv(os.path.join(MERGED_DIR, 'merged_history.csv'), parse_dates=['date'])
-        insert_dataframe(conn, df_hist, PRICING_HISTORY_TABLE_NAME)
-    except Exception as e:
-        print(f"❌ Failed to load historical prices: {e}")
+def delete_ticker_history(cur, tickers, table_name):
+    cur.execute(f"DELETE FROM {table_name} WHERE ticker = ANY(%s)", (tickers,))
+    print(f"🗑️ Deleted {cur.rowcount} stale rows for {len(tickers)} rebuilt tickers")
+
+# --- Keep only bars from the last loaded day on (that day is upserted again: it may have been partial) ---
+def drop_loaded_bars(df, watermarks):
+    if df.empty or not watermarks:
+        return df
+    loaded_until = pd.to_datetime(df['ticker'].map(watermarks))
+    keep = loaded_until.isna() | (df['date'] >= loaded_until)
+    return df[keep]
+
+# --- Table loads (each runs on its own pooled connection) ---
+def load_history(conn):
+    print("📥 Loading Historical Prices...")
+    path_hist = merged_path(MERGED_DIR, 'merged_history')
+    # Only a successful full refetch ('rebuilt' in this run's manifest) replaces a queued ticker's rows;
+    # after a failed one the staged file holds incremental bars, so the ticker stays queued
+    queued = set(read_rebuilds())
+    rebuilds = queued & get_manifest(HISTORY_MANIFEST_STEP).with_status('history', 'rebuilt')
+    rebuilt = rebuilt_tickers(path_hist, rebuilds)
+    if len(rebuilt) < len(queued):
+        print(f"⚠️ {len(queued) - len(rebuilt)} queued tickers have no rebuilt history, "
+              f"keeping their rows in {PRICING_HISTORY_TABLE_NAME}")
+    watermarks = {ticker: wm for ticker, wm in get_watermarks().items() if ticker not in rebuilt}
 
-    # === 2. Load Option Chain ===
+    # Per-chunk maxima are enough to advance the watermarks once the load has committed
+    latest, skipped = [], [0]
+    def new_bars(chunk):
+        kept = drop_loaded_bars(chunk, watermarks)
+        skipped[0] += len(chunk) - len(kept)
+        if not kept.empty:
+            latest.append(kept.groupby('ticker', observed=True)['date'].max())
+        return kept
+
+    delete_rebuilt = partial(delete_ticker_history, tickers=rebuilt, table_name=PRICING_HISTORY_TABLE_NAME)
+    rows = load_table(conn, path_hist, PRICING_HISTORY_TABLE_NAME, transform=new_bars,
+                      before=delete_rebuilt if rebuilt else None)
+    if skipped[0]:
+        print(f"⏭️ Skipped {skipped[0]} already-loaded history rows")
+    # Dequeue after the load committed (it raises otherwise) and only if it actually wrote rows
+    if rebuilt and rows:
+        remove_rebuilds(rebuilt)
+    if latest:
+        update_file_watermarks(pd.concat(latest).reset_index())
+    return rows
+
+def load_option_chain(conn):
+    print("📥 Loading Option Chain...")
+    # inTheMoney is read as a nullable boolean (table schema), so missing stays NULL
+    return load_table(conn, merged_path(MERGED_DIR, 'merged_option_chain'), OPTION_CHAIN_TABLE_NAME)
+
+# --- Main Execution ---
+def main():
+    # === 0. Pre-create upcoming partitions (and detach expired ones, if retention is set) ===
     try:
-        print("📥 Loading Option Chain...")
-        df_opt = pd.read_csv(os.path.join(MERGED_DIR, 'merged_option_chain.csv'), parse_dates=['date', 'expiration'])
-        df_opt['inTheMoney'] = df_opt['inTheMoney'].astype(bool)
-        insert_dataframe(conn, df_opt, OPTION_CHAIN_TABLE_NAME)
+        with pooled_connection() as conn:
+            maintain_partitions(conn)
     except Exception as e:
-        print(f"❌ Failed to load option chain: {e}")
+        print(f"⚠️ Partition maintenance failed: {e}")
 
-    conn.close()
+    # === 1-2. Historical prices and option chains load concurrently ===
+    run_loads([
+        (PRICING_HISTORY_TABLE_NAME, load_history),
+        (OPTION_CHAIN_TABLE_NAME, load_option_chain),
+    ], stage='load_pricing')
 
 if __name__ == '__main__':
     main()
@@ -1,10 +1,15 @@
 import os
 import pandas as pd
 from datetime import datetime
+from etl.merge_engine import incremental_merge
+from etl.schema_registry import merge_reader
+from etl.staging import list_frames, merged_path, read_merge_input
 from utils import (
     PRICING_HISTORY_OUTPUT_DIR,
     PRICING_OPTION_CHAIN_OUTPUT_DIR,
-    MERGED_DIR
+    MERGED_DIR,
+    PRICING_HISTORY_TABLE_NAME,
+    OPTION_CHAIN_TABLE_NAME
 )
 
 def postprocess_pricing_history(df):
@@ -27,46 +32,38 @@ def postprocess_pricing_history(df):
 
     return df
 
-def merge_csvs(input_dir, output_dir, output_filename, force_symbol=True, add_today_date=False, file_filter=None, postprocess=None):
+def merge_csvs(input_dir, output_dir, output_name, force_symbol=True, add_today_date=False, file_filter=None, postprocess=None,
+               table=None, rename=None):
+    # Streams files into the merged output in bounded buffers of whole files; `postprocess`
+    # runs per buffer, so it must only need the rows of each ticker's own file.
+    # Only files that changed since the last merge are re-read (see incremental_merge).
+    # With a `table`, CSV inputs are read with that table's column types (schema_registry)
     os.makedirs(output_dir, exist_ok=True)
 
-    all_files = [f for f in os.listdir(input_dir) if f.endswith('.csv')]
+    all_files = list_frames(input_dir)
     if file_filter:
-        all_files = [f for f in all_files if file_filter in f]
+        all_files = [f for f in all_files if file_filter in os.path.basename(f)]
 
-    merged_df = pd.DataFrame()
+    today_str = datetime.today().strftime('%Y-%m-%d')
 
-    for file in all_files:
-        filepath = os.path.join(input_dir, file)
-        try:
-            df = pd.read_csv(filepath)
+    def transform(df):
+        if add_today_date:
+            df.insert(0, 'date', today_str)
+        if postprocess:
+            df = postprocess(df)
+        return df
 
-            # ✅ Drop any unnamed columns (usually extra index columns)
-            df = df.loc[:, ~df.columns.str.startswith('Unnamed')]
+    def report(path, e):
+        print(f"❌ Failed to process {os.path.basename(path)}: {e}")
 
-            # Insert symbol if missing
-            # if force_symbol and 'symbol' not in df.columns:
-            #     symbol = file.replace('.csv', '')
-            #     df.insert(0, 'symbol', symbol)
-
-            merged_df = pd.concat([merged_df, df], ignore_index=True)
-
-        except Exception as e:
-            print(f"❌ Failed to process {file}: {e}")
-
-    if add_today_date:
-        today_str = datetime.today().strftime('%Y-%m-%d')
-        merged_df.insert(0, 'date', today_str)
-
-    if postprocess:
-        merged_df = postprocess(merged_df)
-
-    # ✅ Also ensure final merged_df has no lingering unnamed columns
-    merged_df = merged_df.loc[:, ~merged_df.columns.str.startswith('Unnamed')]
-
-    output_path = os.path.join(output_dir, output_filename)
-    merged_df.to_csv(output_path, index=False)
-    print(f"✅ Merged saved to: {output_path}")
+    output_path = merged_path(output_dir, output_name)
+    # The stamped date is not a merge parameter: rows reused from the last merge are re-stamped
+    params = {'postprocess': getattr(postprocess, '__name__', None)}
+    stamp = {'date': today_str} if add_today_date else None
+    read = merge_reader(table, rename) if table else read_merge_input
+    rows = incremental_merge(all_files, output_path, transform=transform, on_error=report, params=params,
+                             stamp=stamp, read=read)
+    print(f"✅ Merged {len(all_files)} files ({rows} rows) saved to: {output_path}")
 
 def clean_reports_df(df):
     if 'symbol' in df.columns:
@@ -78,7 +75,8 @@ def main():
     merge_csvs(
         input_dir=PRICING_OPTION_CHAIN_OUTPUT_DIR,
         output_dir=MERGED_DIR,
-        output_filename='merged_option_chain.csv',
+        output_name='merged_option_chain',
+        table=OPTION_CHAIN_TABLE_NAME,
         force_symbol=True,
         add_today_date=True
     )
@@ -87,7 +85,8 @@ def main():
     merge_csvs(
         input_dir=PRICING_HISTORY_OUTPUT_DIR,
         output_dir=MERGED_DIR,
-        output_filename='merged_history.csv',
+        output_name='merged_history',
+        table=PRICING_HISTORY_TABLE_NAME,
         force_symbol=True,
         postprocess=postprocess_pricing_history
     )
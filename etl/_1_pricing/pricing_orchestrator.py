@@ -7,6 +7,7 @@ if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
 from etl._1_pricing import _1_history, _2_option_chain, merge_pricing, load_pricing
+from etl.shard_runner import sharded
 
 def run_step(func, name):
     print(f"\n🚀 Running: {name}")
@@ -19,8 +20,8 @@ def run_step(func, name):
 def main():
     print("🔁 Starting PRICING ETL")
 
-    run_step(_1_history.main, '1_history.py')
-    run_step(_2_option_chain.main, '2_option_chain.py')
+    run_step(sharded(_1_history), '1_history.py')
+    run_step(sharded(_2_option_chain), '2_option_chain.py')
     run_step(merge_pricing.main, 'merge_pricing.py')
     run_step(load_pricing.main, 'load_pricing.py')
 
@@ -0,0 +1,84 @@
+import glob
+import json
+import os
+import psycopg2
+from utils import DB_PARAMS, PRICING_HISTORY_TABLE_NAME, PRICING_HISTORY_WATERMARKS, PRICING_HISTORY_REBUILDS
+from etl.shard_context import shard_suffix
+
+# --- Watermarks: last loaded bar date per ticker ---
+def read_db_watermarks():
+    query = f"SELECT ticker, MAX(date) FROM {PRICING_HISTORY_TABLE_NAME} GROUP BY ticker"
+    with psycopg2.connect(**DB_PARAMS) as conn:
+        with conn.cursor() as cur:
+            cur.execute(query)
+            rows = cur.fetchall()
+    conn.close()
+    return {ticker: max_date.isoformat() for ticker, max_date in rows if max_date is not None}
+
+def read_file_watermarks(path=PRICING_HISTORY_WATERMARKS):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def write_file_watermarks(watermarks, path=PRICING_HISTORY_WATERMARKS):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(dict(sorted(watermarks.items())), f, indent=2)
+
+def get_watermarks():
+    try:
+        watermarks = read_db_watermarks()
+        print(f"📌 Loaded watermarks for {len(watermarks)} tickers from {PRICING_HISTORY_TABLE_NAME}")
+        return watermarks
+    except Exception as e:
+        print(f"⚠️ Could not read watermarks from DB ({e}), falling back to {PRICING_HISTORY_WATERMARKS}")
+        return read_file_watermarks()
+
+def update_file_watermarks(df):
+    """Advance the local watermark file with the max loaded date per ticker in `df`."""
+    if df.empty:
+        return
+    watermarks = read_file_watermarks()
+    latest = df.groupby('ticker')['date'].max()
+    for ticker, max_date in latest.items():
+        max_date = str(max_date)[:10]
+        if max_date > watermarks.get(ticker, ''):
+            watermarks[ticker] = max_date
+    write_file_watermarks(watermarks)
+    print(f"📌 Updated watermarks for {len(latest)} tickers in {PRICING_HISTORY_WATERMARKS}")
+
+# --- Rebuild queue: tickers whose full history must replace what is loaded ---
+# Shard processes each keep their own queue file so concurrent writes never race
+def _rebuild_paths(path):
+    stem, ext = os.path.splitext(str(path))
+    return [str(path)] + sorted(glob.glob(f"{stem}.shard*{ext}"))
+
+def read_rebuilds(path=PRICING_HISTORY_REBUILDS):
+    tickers = set()
+    for queue_path in _rebuild_paths(path):
+        if os.path.exists(queue_path):
+            with open(queue_path) as f:
+                tickers.update(json.load(f))
+    return sorted(tickers)
+
+def write_rebuilds(tickers, path=PRICING_HISTORY_REBUILDS):
+    stem, ext = os.path.splitext(str(path))
+    path = f"{stem}{shard_suffix('.')}{ext}"
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(sorted(tickers), f, indent=2)
+
+def remove_rebuilds(tickers, path=PRICING_HISTORY_REBUILDS):
+    """Dequeue `tickers` (rebuilt and loaded); every other queued ticker stays queued."""
+    tickers = set(tickers)
+    for queue_path in _rebuild_paths(path):
+        if not os.path.exists(queue_path):
+            continue
+        with open(queue_path) as f:
+            remaining = sorted(set(json.load(f)) - tickers)
+        if remaining:
+            with open(queue_path, 'w') as f:
+                json.dump(remaining, f, indent=2)
+        else:
+            os.remove(queue_path)
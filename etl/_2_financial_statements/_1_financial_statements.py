@@ -1,7 +1,40 @@
 import os
+import sys
+
+# Add project root to sys.path for imports
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
 import pandas as pd
-from yahooquery import Ticker
+from etl.yq_cache import CachedTicker as Ticker
+from yahooquery.constants import FUNDAMENTALS_OPTIONS
 from utils import TICKERS_CSV, FINANCIAL_STATEMENTS_OUTPUT_DIRS
+from etl.fetch_engine import chunk, run_batches
+from etl.run_manifest import get_manifest
+from etl.shard_context import load_tickers
+from etl.staging import staging_path, write_frame
+
+# 'combined': one get_financial_data call per frequency for a whole batch. yahooquery still sends one
+#   timeseries request per symbol, so this is 2 requests per ticker instead of 6 (3x fewer), not 2 per batch
+# 'per_statement': legacy six calls per ticker
+EXTRACTION_MODE = os.getenv('FINANCIALS_EXTRACTION_MODE', 'combined')
+BATCH_SIZE = 10                           # Tickers per Ticker call in combined mode
+MAX_IN_FLIGHT = 2                         # Batches fetched concurrently (paced by the shared rate controller)
+
+STATEMENT_LABELS = {
+    ('balance_sheet', 'annual'): 'BS_A',
+    ('balance_sheet', 'quarterly'): 'BS_Q',
+    ('income_statement', 'annual'): 'IS_A',
+    ('income_statement', 'quarterly'): 'IS_Q',
+    ('cash_flow', 'annual'): 'CF_A',
+    ('cash_flow', 'quarterly'): 'CF_Q',
+}
+FREQUENCIES = {'annual': 'a', 'quarterly': 'q'}
+STATEMENT_TYPES = {statement: FUNDAMENTALS_OPTIONS[statement] for statement in FINANCIAL_STATEMENTS_OUTPUT_DIRS}
+ALL_STATEMENT_TYPES = sorted({t for types in STATEMENT_TYPES.values() for t in types})
+INDEX_COLS = ['asOfDate', 'periodType', 'currencyCode']
+MANIFEST_STEP = 'financial_statements'
 
 def ensure_all_dirs():
     for category_dict in FINANCIAL_STATEMENTS_OUTPUT_DIRS.values():
@@ -10,8 +43,75 @@ def ensure_all_dirs():
                 os.makedirs(path)
 
 def get_tickers_from_csv(csv_path):
-    df = pd.read_csv(csv_path)
-    return df['Symbol'].dropna().unique().tolist()
+    return load_tickers(csv_path)
+
+def save_statement(df, ticker, statement_type, freq):
+    label = STATEMENT_LABELS[(statement_type, freq)]
+    if isinstance(df, pd.DataFrame) and not df.empty:
+        # Insert ticker symbol as first column
+        df.insert(0, 'symbol', ticker)
+
+        out_dir = FINANCIAL_STATEMENTS_OUTPUT_DIRS[statement_type][freq]
+        file_path = write_frame(df, staging_path(out_dir, f"{ticker}_{label}"))
+        get_manifest(MANIFEST_STEP).record(ticker, label, 'ok', len(df), file_path)
+        print(f"  ✅ Saved {label} to {file_path}")
+    else:
+        get_manifest(MANIFEST_STEP).record(ticker, label, 'empty')
+        print(f"  ⚠️ No data for {ticker} - {label}")
+
+def record_failure(tickers):
+    manifest = get_manifest(MANIFEST_STEP)
+    for ticker in tickers:
+        for label in STATEMENT_LABELS.values():
+            manifest.record(ticker, label, 'failed')
+
+def split_statements(ticker_df):
+    """Split one ticker's combined financial data into {statement_type: DataFrame}.
+
+    Columns match what balance_sheet/income_statement/cash_flow return:
+    the index columns followed by that statement's types in sorted order.
+    """
+    statements = {}
+    for statement_type, types in STATEMENT_TYPES.items():
+        cols = sorted(c for c in types if c in ticker_df.columns)
+        if not cols:
+            statements[statement_type] = None
+            continue
+        df = ticker_df[[c for c in INDEX_COLS if c in ticker_df.columns] + cols]
+        statements[statement_type] = df.dropna(how='all', subset=cols).reset_index(drop=True)
+    return statements
+
+def fetch_and_save_financials_batch(tickers: list):
+    """Fetch all statement types for a batch with one call per frequency and save the six files per ticker.
+
+    Each call is one timeseries request per symbol: 2 requests per ticker in all.
+    """
+    print(f"📡 Fetching financials for {tickers}")
+    try:
+        tkr = Ticker(tickers)
+        for freq, freq_code in FREQUENCIES.items():
+            data = tkr.get_financial_data(ALL_STATEMENT_TYPES, frequency=freq_code, trailing=True)
+
+            if not isinstance(data, pd.DataFrame):
+                if len(tickers) > 1:
+                    # One bad symbol makes yahooquery return raw results for the batch; isolate it
+                    print(f"⚠️ Batch {freq} financials unavailable for {tickers}, fetching one by one")
+                    for ticker in tickers:
+                        fetch_and_save_financials_batch([ticker])
+                    return
+                data = pd.DataFrame()
+
+            for ticker in tickers:
+                if ticker not in data.index:
+                    for statement_type in STATEMENT_TYPES:
+                        save_statement(None, ticker, statement_type, freq)
+                    continue
+                for statement_type, df in split_statements(data.loc[[ticker]]).items():
+                    save_statement(df, ticker, statement_type, freq)
+
+    except Exception as e:
+        print(f"❌ Error fetching financials for {tickers}: {e}")
+        record_failure(tickers)
 
 def fetch_and_save_financials(ticker):
     try:
@@ -29,19 +129,11 @@ def fetch_and_save_financials(ticker):
         }
 
         for label, (statement_type, freq, df) in statements.items():
-            if isinstance(df, pd.DataFrame) and not df.empty:
-                # Insert ticker symbol as first column
-                df.insert(0, 'symbol', ticker)
-
-                out_dir = FINANCIAL_STATEMENTS_OUTPUT_DIRS[statement_type][freq]
-                file_path = os.path.join(out_dir, f"{ticker}_{label}.csv")
-                df.to_csv(file_path, index=False)
-                print(f"  ✅ Saved {label} to {file_path}")
-            else:
-                print(f"  ⚠️ No data for {ticker} - {label}")
+            save_statement(df, ticker, statement_type, freq)
 
     except Exception as e:
         print(f"❌ Error fetching financials for {ticker}: {e}")
+        record_failure([ticker])
 
 
 def main():
@@ -50,9 +142,17 @@ def main():
 
     tickers = get_tickers_from_csv(TICKERS_CSV)
     print(f"📄 Loaded {len(tickers)} tickers")
+    tickers = get_manifest(MANIFEST_STEP).pending(tickers, list(STATEMENT_LABELS.values()))
 
-    for ticker in tickers:
-        fetch_and_save_financials(ticker)
+    if EXTRACTION_MODE == 'per_statement':
+        for ticker in tickers:
+            fetch_and_save_financials(ticker)
+    else:
+        run_batches(
+            chunk(tickers, BATCH_SIZE),
+            fetch_and_save_financials_batch,
+            max_in_flight=MAX_IN_FLIGHT,
+        )
 
     print("✅ Done with _1_financial_statements.main()")
 
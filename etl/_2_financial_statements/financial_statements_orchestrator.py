@@ -12,6 +12,7 @@ from etl._2_financial_statements import (
     merge_financial_statements,
     load_financial_statements
 )
+from etl.shard_runner import sharded
 
 def run_step(func, name):
     print(f"\n🚀 Running: {name}")
@@ -24,7 +25,7 @@ def run_step(func, name):
 def main():
     print("🔁 Starting FINANCIAL STATEMENTS ETL")
 
-    run_step(_1_financial_statements.main, '1_financial_statements.py')
+    run_step(sharded(_1_financial_statements), '1_financial_statements.py')
     run_step(merge_financial_statements.main, 'merge_financial_statements.py')
     run_step(load_financial_statements.main, 'load_financial_statements.py')
 
@@ -1,8 +1,8 @@
-import pandas as pd
-import psycopg2
-from psycopg2.extras import execute_values
 import os
-from utils import MERGED_DIR_CLEAN, conn_params
+from functools import partial
+from utils import MERGED_DIR_CLEAN, STAGING_EXT, conn_params
+from etl.bulk_load import load_file
+from etl.load_coordinator import run_loads
 
 filename_to_table_stub = {
     'cash_flow': 'cashflow',
@@ -10,38 +10,19 @@ filename_to_table_stub = {
     'balance_sheet': 'balance_sheet',
 }
 
-# --- Loader Function ---
-def load_csv_to_postgres(csv_path, table_name):
+# --- Loader Function (runs on a pooled connection) ---
+def load_csv_to_postgres(conn, csv_path, table_name):
     print(f"📄 Loading {os.path.basename(csv_path)} into {table_name}...")
 
-    df = pd.read_csv(csv_path)
-
-    # Convert 'asOfDate' if exists
-    if 'asOfDate' in df.columns:
-        df['asOfDate'] = pd.to_datetime(df['asOfDate'], format='%Y-%m-%d', errors='coerce').dt.date
-
-
-    # Replace NaN with None for SQL compatibility
-    df = df.where(pd.notnull(df), None)
-
-    # Generate insert query
-    cols = df.columns.tolist()
-    insert_query = f"INSERT INTO {table_name} ({', '.join(cols)}) VALUES %s"
-    values = [tuple(row) for row in df.to_numpy()]
-
-    # Insert into DB
-    try:
-        with psycopg2.connect(**conn_params) as conn:
-            with conn.cursor() as cur:
-                execute_values(cur, insert_query, values)
-            conn.commit()
-        print(f"✅ {len(df)} rows inserted into {table_name}")
-    except Exception as e:
-        print(f"❌ Failed to insert into {table_name}: {e}")
+    # Stream into DB in chunks ('asOfDate' is parsed by the typed read; COPY writes NaN/None as NULL)
+    rows = load_file(conn, csv_path, table_name)
+    print(f"✅ {rows} rows inserted into {table_name}")
+    return rows
 
 def main():
+    jobs = []
     for filename in os.listdir(MERGED_DIR_CLEAN):
-        if not filename.endswith('.csv'):
+        if not filename.endswith(STAGING_EXT):
             continue
 
         base = os.path.splitext(filename)[0].lower()
@@ -77,7 +58,10 @@ def main():
             continue  # skip files with unexpected format
 
         full_path = os.path.join(MERGED_DIR_CLEAN, filename)
-        load_csv_to_postgres(csv_path=full_path, table_name=table_name)
+        jobs.append((table_name, partial(load_csv_to_postgres, csv_path=full_path, table_name=table_name)))
+
+    # The statement tables are independent: load them concurrently on pooled connections
+    run_loads(jobs, params=conn_params, stage='load_financial_statements')
 
 if __name__ == '__main__':
     main()
@@ -1,6 +1,22 @@
 import os
-import pandas as pd
 from utils import FINANCIAL_STATEMENTS_DIR, MERGED_DIR_CLEAN
+from etl.merge_engine import incremental_merge
+from etl.schema_registry import merge_reader
+from etl.staging import list_frames, merged_path
+
+# Target table stub per statement folder (see load_financial_statements)
+STATEMENT_TABLES = {'Balance Sheet': 'bs', 'Income Statement': 'is', 'Cash Flow': 'cf'}
+PERIOD_TABLES = {'Annual': 'a', 'Quarterly': 'q'}
+
+def clean_statements(df):
+    # 🔹 Drop rows not in USD
+    if 'currencyCode' in df.columns:
+        df = df[df['currencyCode'] == 'USD']
+
+    # Optional: remove duplicate rows by ticker + date (within a ticker's own statements)
+    if 'ticker' in df.columns and 'date' in df.columns:
+        df = df.drop_duplicates(subset=['ticker', 'date'])
+    return df
 
 def main():
     # Folders to process
@@ -19,34 +35,19 @@ def main():
         folder_path = os.path.join(FINANCIAL_STATEMENTS_DIR, statement_type, period)
         print(f"Merging files in: {folder_path}")
 
-        all_files = [os.path.join(folder_path, f) for f in os.listdir(folder_path) if f.endswith('.csv')]
-
-        # List to hold DataFrames
-        dfs = []
-        for file in all_files:
-            try:
-                df = pd.read_csv(file)
-                dfs.append(df)
-            except Exception as e:
-                print(f"⚠️ Could not read {file}: {e}")
-
-        if dfs:
-            merged_df = pd.concat(dfs, ignore_index=True)
-
-            # 🔹 Drop rows not in USD
-            if 'currencyCode' in merged_df.columns:
-                merged_df = merged_df[merged_df['currencyCode'] == 'USD']
-
-            # Optional: remove duplicate rows by ticker + date
-            if 'ticker' in merged_df.columns and 'date' in merged_df.columns:
-                merged_df.drop_duplicates(subset=['ticker', 'date'], inplace=True)
-
-            # Save merged CSV
-            merged_csv_path = os.path.join(MERGED_DIR_CLEAN, f"{statement_type.replace(' ', '_')}_{period}.csv")
-            merged_df.to_csv(merged_csv_path, index=False)
-            print(f"✅ Saved merged CSV: {merged_csv_path}")
-        else:
-            print(f"⚠️ No files found in {folder_path} or all failed to load.")
+        all_files = list_frames(folder_path)
+        if not all_files:
+            print(f"⚠️ No files found in {folder_path}.")
+            continue
+
+        # Streams the files in order (read in parallel, MERGE_WORKERS) and only re-reads
+        # the ones that changed since the last merge
+        output_path = merged_path(MERGED_DIR_CLEAN, f"{statement_type.replace(' ', '_')}_{period}")
+        table = f"financial_statements_{STATEMENT_TABLES[statement_type]}_{PERIOD_TABLES[period]}"
+        rows = incremental_merge(all_files, output_path, transform=clean_statements,
+                                 on_error=lambda file, e: print(f"⚠️ Could not read {file}: {e}"),
+                                 read=merge_reader(table))
+        print(f"✅ Saved merged file: {output_path} ({rows} rows)")
 
 if __name__ == "__main__":
     main()
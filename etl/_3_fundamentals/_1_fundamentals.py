@@ -7,66 +7,132 @@ if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
 import os
-import time
+import json
 import pandas as pd
-from yahooquery import Ticker
+from etl.yq_cache import CachedTicker as Ticker
 from functools import reduce
 from utils import TICKERS_CSV, FUNDAMENTALS_OUTPUT_DIR
+from etl._3_fundamentals._2_valuations import save_valuations
+from etl._3_fundamentals._3_officers import save_officers
+from etl.run_manifest import get_manifest, FUNDAMENTALS_MANIFEST_STEP
+from etl.shard_context import load_tickers, shard_suffix
+from etl.staging import staging_path, write_frame
 
-BATCH_SIZE = 5
-SLEEP_TIME = 2
+BATCH_SIZE = 5                            # Pacing comes from the shared rate controller
+MANIFEST_STEP = FUNDAMENTALS_MANIFEST_STEP
 
 # --- Flatten JSON per section ---
 def flatten_json(data_dict, section):
+    # Nested values (e.g. profile_companyOfficers) are staged as JSON text, which the loader passes through
     flat = []
     for ticker, content in data_dict.items():
         if isinstance(content, dict):
             row = {'ticker': ticker}
             for k, v in content.items():
-                row[f"{section}_{k}"] = v
+                row[f"{section}_{k}"] = json.dumps(v, default=str) if isinstance(v, (list, dict)) else v
             flat.append(row)
     return pd.DataFrame(flat)
 
+# quoteSummary module behind each segment, fetched together in one request per ticker
+SEGMENT_MODULES = {
+    'summary': 'summaryDetail',
+    'keystats': 'defaultKeyStatistics',
+    'fin': 'financialData',
+    'price': 'price',
+    'profile': 'assetProfile',
+}
+
+def module_data(modules, module):
+    return {ticker: content.get(module) for ticker, content in modules.items() if isinstance(content, dict)}
+
 # --- Get and merge all fundamentals for batch ---
-def get_summary_fundamentals(batch):
-    t = Ticker(batch)
+def get_summary_fundamentals(batch, t=None):
+    t = t or Ticker(batch)
+    modules = t.get_modules(list(SEGMENT_MODULES.values()))
+    if not isinstance(modules, dict):
+        modules = {}
 
     segments = {
-        'summary': flatten_json(t.summary_detail, "summary"),
-        'keystats': flatten_json(t.key_stats, "keystats"),
-        'fin': flatten_json(t.financial_data, "fin"),
-        'price': flatten_json(t.price, "price"),
-        'profile': flatten_json(t.asset_profile, "profile")
+        segment: flatten_json(module_data(modules, module), segment)
+        for segment, module in SEGMENT_MODULES.items()
     }
-    return segments
+    return segments, modules
+
+def get_valuation_measures(t, batch):
+    val = t.valuation_measures
+    if isinstance(val, dict):
+        # One failing symbol turns the whole batch into raw per-symbol results; refetch the rest together
+        ok = [ticker for ticker in batch if val.get(ticker) and not isinstance(val.get(ticker), str)]
+        failed = [ticker for ticker in batch if ticker not in ok]
+        if failed and ok:
+            print(f"⚠️ No valuation data for {failed}, refetching {ok}")
+            val = Ticker(ok).valuation_measures
+    return val
+
+# --- Valuation and officers ride along with the same batch ---
+def save_batch_valuation_and_officers(t, batch, modules):
+    # Returns the tickers without valuation data and without officers
+    missing_valuation = save_valuations(get_valuation_measures(t, batch), batch)
+
+    # Officers come from the assetProfile module already fetched above (dict shape)
+    officers = {ticker: (profile or {}).get('companyOfficers') for ticker, profile in module_data(modules, 'assetProfile').items()}
+    missing_officers = save_officers(officers, batch)
+    return missing_valuation, missing_officers
 
 def save_segment_df(df, segment_name, batch_index):
     os.makedirs(FUNDAMENTALS_OUTPUT_DIR, exist_ok=True)
-    # Filename per segment per batch (no append, overwrite each batch's file)
-    output_path = os.path.join(FUNDAMENTALS_OUTPUT_DIR, f'{segment_name}_batch{batch_index+1}.csv')
+    if df.empty:
+        print(f"⚠️ No data for segment '{segment_name}' in batch {batch_index+1}")
+        return None
+    # Filename per segment per batch (no append, overwrite each batch's file);
+    # shards number their batches independently, hence the shard suffix
+    output_path = staging_path(FUNDAMENTALS_OUTPUT_DIR, f'{segment_name}_batch{batch_index+1}{shard_suffix()}')
     df = df.groupby('ticker').first().reset_index()  # clean duplicates in batch if any
-    df.to_csv(output_path, mode='w', header=True, index=False)
+    write_frame(df, output_path)
     print(f"✅ Saved batch {batch_index+1} segment '{segment_name}' to {output_path}")
+    return output_path
+
+def record_batch(batch, segments, segment_paths, missing_valuation, missing_officers):
+    manifest = get_manifest(MANIFEST_STEP)
+    for ticker in batch:
+        for segment_name, df in segments.items():
+            found = not df.empty and ticker in set(df['ticker'])
+            manifest.record(ticker, segment_name, 'ok' if found else 'empty', int(found), segment_paths.get(segment_name))
+        # Saved valuation/officer files are recorded by save_valuation_df/save_officers_df
+        if ticker in missing_valuation:
+            manifest.record(ticker, 'valuation', 'empty')
+        if ticker in missing_officers:
+            manifest.record(ticker, 'officers', 'empty')
 
 def main():
-    tickers = pd.read_csv(TICKERS_CSV)['Symbol'].dropna().unique().tolist()
+    tickers = load_tickers(TICKERS_CSV)
     total_batches = (len(tickers) + BATCH_SIZE - 1) // BATCH_SIZE
 
+    # Batch numbering follows the full ticker list so resumed batches overwrite their own files
+    manifest = get_manifest(MANIFEST_STEP)
+    pending = set(manifest.pending(tickers, list(SEGMENT_MODULES) + ['valuation', 'officers']))
+
     for i in range(0, len(tickers), BATCH_SIZE):
         batch = tickers[i:i + BATCH_SIZE]
         batch_num = i // BATCH_SIZE + 1
+        if not pending.intersection(batch):
+            continue
         print(f"🔄 Batch {batch_num}/{total_batches}: {batch}")
 
         try:
-            segments = get_summary_fundamentals(batch)
+            t = Ticker(batch)
+            segments, modules = get_summary_fundamentals(batch, t)
+            segment_paths = {}
             for segment_name, df in segments.items():
-                save_segment_df(df, segment_name, batch_num - 1)
+                segment_paths[segment_name] = save_segment_df(df, segment_name, batch_num - 1)
+            missing_valuation, missing_officers = save_batch_valuation_and_officers(t, batch, modules)
+            record_batch(batch, segments, segment_paths, missing_valuation, missing_officers)
         except Exception as e:
             print(f"❌ Failed batch {batch}: {e}")
+            for ticker in batch:
+                manifest.record(ticker, 'summary', 'failed')
 
-        time.sleep(SLEEP_TIME)
-
-    print(f"\n✅ All batches processed. Separate CSVs per segment and batch saved in:\n{FUNDAMENTALS_OUTPUT_DIR}")
+    print(f"\n✅ All batches processed. Separate files per segment and batch saved in:\n{FUNDAMENTALS_OUTPUT_DIR}")
 
 if __name__ == '__main__':
     main()
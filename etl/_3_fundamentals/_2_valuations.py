@@ -8,38 +8,54 @@ if PROJECT_ROOT not in sys.path:
 
 import os
 import pandas as pd
-from yahooquery import Ticker
+from etl.yq_cache import CachedTicker as Ticker
 from utils import TICKERS_CSV, FUNDAMENTALS_OUTPUT_DIR
+from etl.run_manifest import get_manifest, FUNDAMENTALS_MANIFEST_STEP
+from etl.shard_context import load_tickers
+from etl.staging import staging_path, write_frame
 
 os.makedirs(FUNDAMENTALS_OUTPUT_DIR, exist_ok=True)
 
+def save_valuation_df(df, ticker, shape):
+    df['ticker'] = ticker
+    output_path = write_frame(df, staging_path(FUNDAMENTALS_OUTPUT_DIR, f"{ticker}_valuation"))
+    get_manifest(FUNDAMENTALS_MANIFEST_STEP).record(ticker, 'valuation', 'ok', len(df), output_path)
+    print(f"Saved {ticker} valuation ({shape}) to {output_path}")
+
+def save_valuations(val, tickers):
+    """Split a `valuation_measures` result for one or more tickers into per-ticker staging files.
+
+    Returns the tickers that got no valuation data.
+    """
+    missing = []
+    if isinstance(val, pd.DataFrame):
+        # Indexed by symbol, one row per ticker and as-of date
+        for ticker in tickers:
+            if ticker not in val.index:
+                print(f"No valuation data for {ticker} (DataFrame case)")
+                missing.append(ticker)
+                continue
+            save_valuation_df(val.loc[[ticker]].reset_index(drop=True), ticker, 'DataFrame')
+    elif isinstance(val, dict):
+        for ticker in tickers:
+            val_data = val.get(ticker)
+            if isinstance(val_data, dict) and val_data:
+                save_valuation_df(pd.DataFrame([val_data]), ticker, 'dict')
+            else:
+                print(f"No valuation data for {ticker} (dict case)")
+                missing.append(ticker)
+    else:
+        print(f"Unexpected data format for {tickers}: {type(val)}")
+        missing.extend(tickers)
+    return missing
+
 def save_valuation_for_ticker(ticker):
     tkr = Ticker(ticker)
-    val = tkr.valuation_measures
-
-    if isinstance(val, dict):
-        val_data = val.get(ticker)
-        if val_data:
-            df = pd.DataFrame([val_data])
-            df['ticker'] = ticker
-            output_path = os.path.join(FUNDAMENTALS_OUTPUT_DIR, f"{ticker}_valuation.csv")
-            df.to_csv(output_path, index=False)
-            print(f"Saved {ticker} valuation (dict) to {output_path}")
-        else:
-            print(f"No valuation data for {ticker} (dict case)")
-    elif isinstance(val, pd.DataFrame):
-        # val is already a DataFrame
-        df = val.copy()
-        df['ticker'] = ticker
-        output_path = os.path.join(FUNDAMENTALS_OUTPUT_DIR, f"{ticker}_valuation.csv")
-        df.to_csv(output_path, index=False)
-        print(f"Saved {ticker} valuation (DataFrame) to {output_path}")
-    else:
-        print(f"Unexpected data format for {ticker}: {type(val)}")
+    save_valuations(tkr.valuation_measures, [ticker])
 
 
 def main():
-    tickers = pd.read_csv(TICKERS_CSV)['Symbol'].dropna().unique().tolist()
+    tickers = load_tickers(TICKERS_CSV)
     for ticker in tickers:
         save_valuation_for_ticker(ticker)
 
@@ -7,46 +7,64 @@ if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
 import pandas as pd
-from yahooquery import Ticker
+from etl.yq_cache import CachedTicker as Ticker
 from utils import TICKERS_CSV, FUNDAMENTALS_OUTPUT_DIR
+from etl.run_manifest import get_manifest, FUNDAMENTALS_MANIFEST_STEP
+from etl.shard_context import load_tickers
+from etl.staging import staging_path, write_frame
 
 os.makedirs(FUNDAMENTALS_OUTPUT_DIR, exist_ok=True)
 
-def save_officers_for_ticker(ticker):
-    """Fetch company officers for a single ticker and save to individual CSV."""
-    tkr = Ticker(ticker)
-    officers = tkr.company_officers
+def save_officers_df(df, ticker, shape):
+    df.insert(0, 'ticker', ticker)
+    df.insert(1, 'date', pd.Timestamp.today().strftime('%d/%m/%Y'))
 
-    # Case 1: officers is a DataFrame (in rare cases like 'MMM')
-    if isinstance(officers, pd.DataFrame):
-        df = officers.copy()
-        df.insert(0, 'ticker', ticker)
-        df.insert(1, 'date', pd.Timestamp.today().strftime('%d/%m/%Y'))
+    output_path = write_frame(df, staging_path(FUNDAMENTALS_OUTPUT_DIR, f"{ticker}_officers"))
+    get_manifest(FUNDAMENTALS_MANIFEST_STEP).record(ticker, 'officers', 'ok', len(df), output_path)
+    print(f"✅ Saved {ticker} officers ({shape}) to {output_path}")
+
+def save_officers(officers, tickers):
+    """Split a `company_officers` result for one or more tickers into per-ticker staging files.
 
-        output_path = os.path.join(FUNDAMENTALS_OUTPUT_DIR, f"{ticker}_officers.csv")
-        df.to_csv(output_path, index=False)
-        print(f"✅ Saved {ticker} officers (DataFrame) to {output_path}")
-        return
+    Returns the tickers that got no officer list.
+    """
+    missing = []
+    # Case 1: officers is a DataFrame indexed by (symbol, row)
+    if isinstance(officers, pd.DataFrame):
+        for ticker in tickers:
+            if isinstance(officers.index, pd.MultiIndex):
+                if ticker not in officers.index.get_level_values(0):
+                    print(f"⚠️ No officer list for {ticker}")
+                    missing.append(ticker)
+                    continue
+                df = officers.xs(ticker, level=0).reset_index(drop=True)
+            else:
+                df = officers.copy()
+            save_officers_df(df, ticker, 'DataFrame')
+        return missing
 
     # Case 2: officers is a dict {ticker: list}
     if isinstance(officers, dict):
-        officer_list = officers.get(ticker)
-        if isinstance(officer_list, list) and officer_list:
-            df = pd.DataFrame(officer_list)
-            df.insert(0, 'ticker', ticker)
-            df.insert(1, 'date', pd.Timestamp.today().strftime('%d/%m/%Y'))
-
-            output_path = os.path.join(FUNDAMENTALS_OUTPUT_DIR, f"{ticker}_officers.csv")
-            df.to_csv(output_path, index=False)
-            print(f"✅ Saved {ticker} officers (dict) to {output_path}")
-        else:
-            print(f"⚠️ No officer list for {ticker}")
+        for ticker in tickers:
+            officer_list = officers.get(ticker)
+            if isinstance(officer_list, list) and officer_list:
+                save_officers_df(pd.DataFrame(officer_list), ticker, 'dict')
+            else:
+                print(f"⚠️ No officer list for {ticker}")
+                missing.append(ticker)
     else:
-        print(f"❌ Unexpected format for {ticker}: {type(officers)}")
+        print(f"❌ Unexpected format for {tickers}: {type(officers)}")
+        missing.extend(tickers)
+    return missing
+
+def save_officers_for_ticker(ticker):
+    """Fetch company officers for a single ticker and save it to its own staging file."""
+    tkr = Ticker(ticker)
+    save_officers(tkr.company_officers, [ticker])
 
 
 def main():
-    tickers = pd.read_csv(TICKERS_CSV)['Symbol'].dropna().unique().tolist()
+    tickers = load_tickers(TICKERS_CSV)
     for ticker in tickers:
         save_officers_for_ticker(ticker)
 
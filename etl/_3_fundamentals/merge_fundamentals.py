@@ -7,8 +7,26 @@ if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
 import pandas as pd
-from glob import glob
-from utils import FUNDAMENTALS_OUTPUT_DIR, MERGED_DIR_CLEAN
+from utils import (
+    FUNDAMENTALS_OUTPUT_DIR, MERGED_DIR_CLEAN,
+    FUNDAMENTALS_FINANCIAL_DATA_TABLE_NAME, FUNDAMENTALS_KEY_STATS_TABLE_NAME, FUNDAMENTALS_PRICE_DATA_TABLE_NAME,
+    FUNDAMENTALS_PROFILE_DATA_TABLE_NAME, FUNDAMENTALS_SUMMARY_DATA_TABLE_NAME, FUNDAMENTALS_VALUATION_TABLE_NAME,
+    FUNDAMENTALS_OFFICERS_TABLE_NAME
+)
+from etl.merge_engine import incremental_merge
+from etl.schema_registry import merge_reader
+from etl.staging import list_frames, merged_path
+
+# Target table per merged file (CSV staging is read with its column types)
+SEGMENT_TABLES = {
+    'summary': FUNDAMENTALS_SUMMARY_DATA_TABLE_NAME,
+    'keystats': FUNDAMENTALS_KEY_STATS_TABLE_NAME,
+    'fin': FUNDAMENTALS_FINANCIAL_DATA_TABLE_NAME,
+    'price': FUNDAMENTALS_PRICE_DATA_TABLE_NAME,
+    'profile': FUNDAMENTALS_PROFILE_DATA_TABLE_NAME,
+    'valuation': FUNDAMENTALS_VALUATION_TABLE_NAME,
+    'officers': FUNDAMENTALS_OFFICERS_TABLE_NAME,
+}
 
 def reorder_and_add_date(df):
     """Ensure 'ticker' is first column and add 'date' as second column."""
@@ -36,65 +54,59 @@ def reorder_officers_columns(df):
 
     return df
 
+def sorted_columns(df):
+    # Column order of pd.concat(..., sort=True)
+    return df[sorted(df.columns)]
+
+def merge_segment(files, name, reorder):
+    """Stream `files` into <name>_merged with sorted columns, then `reorder` (ticker/date first)."""
+    def transform(df):
+        df = sorted_columns(df)
+        return reorder(df) if 'ticker' in df.columns else df
+
+    def report(path, e):
+        print(f"❌ Failed to process {os.path.basename(path)}: {e}")
+
+    # Only files that changed since the last merge are re-read (see incremental_merge);
+    # rows reused from it get today's date, so the date is a stamp rather than a merge parameter
+    output_path = merged_path(MERGED_DIR_CLEAN, f'{name}_merged')
+    params = {'reorder': reorder.__name__}
+    stamp = {'date': pd.Timestamp.today().strftime('%d/%m/%Y')} if reorder is reorder_and_add_date else None
+    rows = incremental_merge(files, output_path, transform=transform, on_error=report, params=params,
+                             stamp=stamp, read=merge_reader(SEGMENT_TABLES[name]))
+    return output_path, rows
+
 def main():
     os.makedirs(MERGED_DIR_CLEAN, exist_ok=True)
     segments = ['summary', 'keystats', 'fin', 'price', 'profile']
 
     # Merge standard segments batch files
     for segment in segments:
-        files = sorted(glob(os.path.join(FUNDAMENTALS_OUTPUT_DIR, f'{segment}_batch*.csv')))
+        files = list_frames(FUNDAMENTALS_OUTPUT_DIR, f'{segment}_batch*')
         if not files:
             print(f"⚠️ No files found for segment '{segment}', skipping...")
             continue
 
-        dfs = [pd.read_csv(f) for f in files]
-        merged_df = pd.concat(dfs, axis=0, sort=True)
-        merged_output_path = os.path.join(MERGED_DIR_CLEAN, f'{segment}_merged.csv')
-        merged_df.to_csv(merged_output_path, index=False)
-        print(f"✅ Merged {len(files)} batch files for segment '{segment}' into {merged_output_path}")
+        merged_output_path, rows = merge_segment(files, segment, reorder_and_add_date)
+        print(f"✅ Merged {len(files)} batch files for segment '{segment}' into {merged_output_path} ({rows} rows)")
 
     # Merge valuation files (batch or per-ticker)
-    valuation_files = sorted(glob(os.path.join(FUNDAMENTALS_OUTPUT_DIR, '*_valuation*.csv')))
+    valuation_files = list_frames(FUNDAMENTALS_OUTPUT_DIR, '*_valuation*')
     if valuation_files:
-        dfs = [pd.read_csv(f) for f in valuation_files]
-        merged_valuation = pd.concat(dfs, axis=0, sort=True)
-        valuation_merged_path = os.path.join(MERGED_DIR_CLEAN, 'valuation_merged.csv')
-        merged_valuation.to_csv(valuation_merged_path, index=False)
-        print(f"✅ Merged {len(valuation_files)} valuation files into {valuation_merged_path}")
+        valuation_merged_path, rows = merge_segment(valuation_files, 'valuation', reorder_and_add_date)
+        print(f"✅ Merged {len(valuation_files)} valuation files into {valuation_merged_path} ({rows} rows)")
     else:
         print("⚠️ No valuation files found to merge.")
 
     # Merge officers files (per ticker)
-    officer_files = sorted(glob(os.path.join(FUNDAMENTALS_OUTPUT_DIR, '*_officers*.csv')))
+    officer_files = list_frames(FUNDAMENTALS_OUTPUT_DIR, '*_officers*')
     if officer_files:
-        dfs = [pd.read_csv(f) for f in officer_files]
-        merged_officers = pd.concat(dfs, axis=0, sort=True)
-        officers_merged_path = os.path.join(MERGED_DIR_CLEAN, 'officers_merged.csv')
-        merged_officers.to_csv(officers_merged_path, index=False)
-        print(f"✅ Merged {len(officer_files)} officer files into {officers_merged_path}")
+        officers_merged_path, rows = merge_segment(officer_files, 'officers', reorder_officers_columns)
+        print(f"✅ Merged {len(officer_files)} officer files into {officers_merged_path} ({rows} rows)")
     else:
         print("⚠️ No officer files found to merge.")
 
-    # Update all *_merged.csv files
-    for filename in os.listdir(MERGED_DIR_CLEAN):
-        if filename.endswith('_merged.csv'):
-            path = os.path.join(MERGED_DIR_CLEAN, filename)
-            print(f"📄 Processing {filename} ...")
-            df = pd.read_csv(path)
-
-            if 'ticker' not in df.columns:
-                print(f"ℹ️ Skipping {filename} (no 'ticker' column)...")
-                continue
-
-            if filename == 'officers_merged.csv':
-                df = reorder_officers_columns(df)
-            else:
-                df = reorder_and_add_date(df)
-
-            df.to_csv(path, index=False)
-            print(f"✅ Updated {filename}")
-
-    print("\n🎉 All merged CSV files updated!")
+    print("\n🎉 All merged files updated!")
 
 if __name__ == '__main__':
     main()
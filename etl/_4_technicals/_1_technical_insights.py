@@ -1,9 +1,21 @@
-from yahooquery import Ticker
+import os
+import sys
+
+# Add project root to sys.path for imports
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
 import pandas as pd
 import json
-import os
 
+from etl.yq_cache import CachedTicker as Ticker
 from utils import TICKERS_CSV, PRICING_TECHNICAL_INSIGHTS_OUTPUT_DIR
+from etl.run_manifest import get_manifest
+from etl.shard_context import load_tickers
+from etl.staging import staging_path, write_frame
+
+MANIFEST_STEP = 'technical_insights'
 
 def flatten_dict(d, parent_key='', sep='.'):
     items = []
@@ -34,17 +46,16 @@ def ensure_dir(path):
         os.makedirs(path)
 
 def get_tickers_from_csv(csv_path):
-    df = pd.read_csv(csv_path)
-    # Assuming the ticker symbols are in a column named 'ticker' or similar
-    # Adjust the column name if needed
-    tickers = df['Symbol'].dropna().unique().tolist()
-    return tickers
+    # Whole Tickers.csv 'Symbol' column, or only this process's shard in a sharded run
+    return load_tickers(csv_path)
 
 def etl_loop():
     ensure_dir(PRICING_TECHNICAL_INSIGHTS_OUTPUT_DIR)
 
     tickers = get_tickers_from_csv(TICKERS_CSV)
     print(f"Loaded {len(tickers)} tickers from {TICKERS_CSV}")
+    manifest = get_manifest(MANIFEST_STEP)
+    tickers = manifest.pending(tickers, ['technical_insights'])
 
     for symbol in tickers:
         print(f"Processing {symbol}...")
@@ -54,6 +65,7 @@ def etl_loop():
 
             if symbol not in technical_insights:
                 print(f"  ⚠️ No technical insights found for {symbol}")
+                manifest.record(symbol, 'technical_insights', 'empty')
                 continue
 
             raw_data = technical_insights[symbol]
@@ -62,20 +74,21 @@ def etl_loop():
             flat_data = flatten_dict(raw_data)
             df_tech = pd.DataFrame([flat_data])
 
-            tech_path = os.path.join(PRICING_TECHNICAL_INSIGHTS_OUTPUT_DIR, f"{symbol}_technical_insights.csv")
-            df_tech.to_csv(tech_path, index=False)
+            tech_path = write_frame(df_tech, staging_path(PRICING_TECHNICAL_INSIGHTS_OUTPUT_DIR, f"{symbol}_technical_insights"))
+            manifest.record(symbol, 'technical_insights', 'ok', len(df_tech), tech_path)
             print(f"  ✅ Saved technical insights to {tech_path}")
 
             if reports_data:
                 df_reports = flatten_reports_to_df(reports_data)
-                reports_path = os.path.join(PRICING_TECHNICAL_INSIGHTS_OUTPUT_DIR, f"{symbol}_reports.csv")
-                df_reports.to_csv(reports_path, index=False)
+                reports_path = write_frame(df_reports, staging_path(PRICING_TECHNICAL_INSIGHTS_OUTPUT_DIR, f"{symbol}_reports"))
+                manifest.record(symbol, 'reports', 'ok', len(df_reports), reports_path)
                 print(f"  ✅ Saved reports to {reports_path}")
             else:
                 print(f"  ⚠️ No reports data found for {symbol}")
 
         except Exception as e:
             print(f"  ❌ Error processing {symbol}: {e}")
+            manifest.record(symbol, 'technical_insights', 'failed')
 
 def main():
     etl_loop()
@@ -1,91 +1,68 @@
 import os
-import pandas as pd
-import psycopg2
-from psycopg2.extras import execute_values
-import numpy as np
 import datetime
+from functools import partial
 from utils import (
     MERGED_DIR,
-    DB_PARAMS,
     PRICING_TECHNICAL_INSIGHTS_TABLE_NAME,
-    PRICING_TECHNICAL_REPORTS_TABLE_NAME, rename_map
+    PRICING_TECHNICAL_REPORTS_TABLE_NAME, SNAPSHOT_LOAD, rename_map
 )
-
-# --- Insert DataFrame into Table ---
-def insert_dataframe(conn, df, table_name):
-    if df.empty:
-        print(f"⚠️ Skipping empty DataFrame for {table_name}")
-        return
-    cols = ','.join(df.columns)
-    values = [tuple(x) for x in df.to_numpy()]
-    with conn.cursor() as cur:
-        query = f"INSERT INTO {table_name} ({cols}) VALUES %s ON CONFLICT DO NOTHING"
-        execute_values(cur, query, values)
-    print(f"✅ Inserted into {table_name}: {len(df)} rows")
+from etl.staging import merged_path
+from etl.schema_registry import epoch_text, fill_blank, mapped_column
+from etl.bulk_load import load_file
+from etl.load_coordinator import run_loads
+
+# --- Stream a merged file into a table (daily snapshots: published all at once) ---
+def load_table(conn, path, table_name, **load_kwargs):
+    rows = load_file(conn, path, table_name, snapshot=SNAPSHOT_LOAD, **load_kwargs)
+    if rows:
+        print(f"✅ Inserted into {table_name}: {rows} rows")
+    else:
+        print(f"⚠️ Nothing to insert into {table_name}")
+    return rows
+
+# --- Per-chunk cleanup of technical insights ---
+def prepare_insights(df_insights):
+    # Lowercase and replace dots, then rename columns per mapping
+    df_insights.columns = [col.lower().replace('.', '_') for col in df_insights.columns]
+    df_insights.rename(columns=rename_map, inplace=True)
+
+    # Epoch ms -> 'YYYY-MM-DD HH:MM:SS' text (the column is TEXT). Dates, NULLs and empty strings
+    # were already coerced column-wise when the chunk was read (schema_registry.conform)
+    if 'ms_summary_date' in df_insights.columns:
+        df_insights['ms_summary_date'] = epoch_text(df_insights['ms_summary_date'], unit='ms')
+
+    # Fill blanks or None in these two columns with today's date string
+    today_str = datetime.date.today().isoformat()  # 'YYYY-MM-DD'
+    for col in ['ms_summary_date', 'research_date']:
+        if col in df_insights.columns:
+            df_insights[col] = fill_blank(df_insights[col], today_str)
+    return df_insights
+
+def prepare_reports(df_reports):
+    # Cleanup: lowercase and rename dot notation
+    df_reports.columns = [col.lower().replace('.', '_') for col in df_reports.columns]
+    return df_reports
+
+# --- Table loads (each runs on its own pooled connection) ---
+def load_insights(conn):
+    print("📥 Loading Technical Insights...")
+    path_insights = merged_path(MERGED_DIR, 'merged_technical_insights')
+    # Typed from the table definition (ms_summary_date is TEXT), so no low_memory/dtype guessing
+    return load_table(conn, path_insights, PRICING_TECHNICAL_INSIGHTS_TABLE_NAME, transform=prepare_insights,
+                      rename=partial(mapped_column, rename_map))
+
+def load_reports(conn):
+    print("📥 Loading Technical Reports...")
+    path_reports = merged_path(MERGED_DIR, 'merged_reports')
+    return load_table(conn, path_reports, PRICING_TECHNICAL_REPORTS_TABLE_NAME, transform=prepare_reports)
 
 # --- Main Execution ---
 def main():
-    conn = psycopg2.connect(**DB_PARAMS)
-    conn.autocommit = True
-
-    # === 3. Load Technical Insights ===
-    try:
-        print("📥 Loading Technical Insights...")
-        path_insights = os.path.join(MERGED_DIR, 'merged_technical_insights.csv')
-        df_insights = pd.read_csv(path_insights, parse_dates=['date'], low_memory=False, dtype={'ms_summary_date': str})
-
-        # Lowercase and replace dots, then rename columns per mapping
-        df_insights.columns = [col.lower().replace('.', '_') for col in df_insights.columns]
-        df_insights.rename(columns=rename_map, inplace=True)
-
-        # Convert epoch ms column to datetime if exists
-        if 'ms_summary_date' in df_insights.columns:
-            df_insights['ms_summary_date'] = pd.to_datetime(
-                df_insights['ms_summary_date'], unit='ms', errors='coerce'
-            )
-            df_insights['ms_summary_date'] = df_insights['ms_summary_date'].apply(
-                lambda x: x.to_pydatetime() if pd.notnull(x) else None
-            )
-
-        # Convert all other datetime64 columns properly and handle NaT
-        for col in df_insights.select_dtypes(include=['datetime64[ns]']).columns:
-            df_insights[col] = df_insights[col].apply(lambda x: x.to_pydatetime() if pd.notnull(x) else None)
-
-        # Replace NaN and empty strings in all object columns with None
-        for col in df_insights.select_dtypes(include='object').columns:
-            df_insights[col] = df_insights[col].replace({pd.NA: None, np.nan: None, "": None})
-
-        # Fill blanks or None in these two columns with today's date string
-        today_str = datetime.date.today().isoformat()  # 'YYYY-MM-DD'
-        for col in ['ms_summary_date', 'research_date']:
-            if col in df_insights.columns:
-                df_insights[col] = df_insights[col].fillna(today_str)
-                df_insights.loc[df_insights[col].astype(str).str.strip() == '', col] = today_str
-
-        # Also replace any remaining NaN with None in entire dataframe
-        df_insights = df_insights.where(pd.notnull(df_insights), None)
-
-        print("Final columns before insert:")
-        print(df_insights.columns.tolist())
-
-        insert_dataframe(conn, df_insights, PRICING_TECHNICAL_INSIGHTS_TABLE_NAME)
-    except Exception as e:
-        print(f"❌ Failed to load technical insights: {e}")
-
-    # === 4. Load Technical Reports ===
-    try:
-        print("📥 Loading Technical Reports...")
-        path_reports = os.path.join(MERGED_DIR, 'merged_reports.csv')
-        df_reports = pd.read_csv(path_reports, parse_dates=['date', 'reportDate'], low_memory=False)
-
-        # Cleanup: lowercase and rename dot notation
-        df_reports.columns = [col.lower().replace('.', '_') for col in df_reports.columns]
-
-        insert_dataframe(conn, df_reports, PRICING_TECHNICAL_REPORTS_TABLE_NAME)
-    except Exception as e:
-        print(f"❌ Failed to load technical reports: {e}")
-
-    conn.close()
+    # === 3-4. Technical insights and reports load concurrently ===
+    run_loads([
+        (PRICING_TECHNICAL_INSIGHTS_TABLE_NAME, load_insights),
+        (PRICING_TECHNICAL_REPORTS_TABLE_NAME, load_reports),
+    ], stage='load_technicals')
 
 if __name__ == '__main__':
     main()
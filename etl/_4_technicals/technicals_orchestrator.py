@@ -7,6 +7,7 @@ if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
 from etl._4_technicals import _1_technical_insights, merge_technicals, load_technicals
+from etl.shard_runner import sharded
 
 def run_step(func, name):
     print(f"\n🚀 Running: {name}")
@@ -18,7 +19,7 @@ def run_step(func, name):
 
 def main():
     print("🔁 Starting PRICING ETL")
-    run_step(_1_technical_insights.main, '1_technical_insights.py')
+    run_step(sharded(_1_technical_insights), '1_technical_insights.py')
     run_step(merge_technicals.main, 'merge_technicals.py')
     run_step(load_technicals.main, 'load_technicals.py')
 
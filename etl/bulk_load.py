@@ -0,0 +1,480 @@
+import os
+import struct
+from functools import partial
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from setup.table_definitions import SCHEMA
+from etl.indexes import indexes_dropped
+from etl.load_ledger import file_digest, loaded_entry, record_load
+from etl.partitions import ensure_partitions, partition_column, prepare_partitions
+from etl.schema_registry import iter_typed, normalize_column, sql_kind, table_columns, table_key
+from utils import (
+    COPY_FORMAT, INDEX_DROP_ROWS, LOAD_CHUNK_ROWS, LOAD_COMMIT, LOAD_LEDGER, LOAD_MEMORY_MB, SNAPSHOT_MIN_RATIO
+)
+
+COPY_CHUNK_ROWS = 50_000                  # Rows encoded per chunk streamed to COPY
+COPY_READ_BYTES = 1 << 20                 # Bytes psycopg2 pulls from the stream per read
+
+PGCOPY_HEADER = b'PGCOPY\n\xff\r\n\x00' + struct.pack('>ii', 0, 0)
+PGCOPY_TRAILER = struct.pack('>h', -1)
+PG_EPOCH_DAYS = 10_957                    # 2000-01-01 (Postgres epoch) in days since 1970-01-01
+PG_EPOCH_US = PG_EPOCH_DAYS * 86_400 * 1_000_000
+NULL_FIELD = struct.pack('>i', -1)
+
+LOAD_SAMPLE_ROWS = 1_000                  # Rows read to estimate the in-memory size of a row
+LOAD_MEMORY_OVERHEAD = 4                  # Frame + converted columns + encoded COPY text, per chunk row
+LOAD_MIN_CHUNK_ROWS = 1_000
+LOAD_PROGRESS_TABLE = f"{SCHEMA}.load_progress"
+
+# Types of the temporary table binary COPY writes to (each maps to one fixed wire encoding)
+BINARY_TYPES = {'int': 'BIGINT', 'float': 'DOUBLE PRECISION', 'bool': 'BOOLEAN', 'date': 'DATE',
+                'timestamp': 'TIMESTAMP', 'text': 'TEXT'}
+_BINARY_WIDTHS = {'int': '>i8', 'float': '>f8', 'bool': '?', 'date': '>i4', 'timestamp': '>i8'}
+
+
+# --- Column kinds and values ---
+def _target_types(df, table):
+    """{column: SQL type or None} for the DataFrame columns, from the table definition."""
+    try:
+        schema = table_columns(table)
+    except KeyError:
+        schema = {}
+    return {column: schema.get(normalize_column(column)) for column in df.columns}
+
+def _column_kind(values, sql_type):
+    if sql_type:
+        kind = sql_kind(sql_type)
+        if kind == 'date' and sql_type.upper().startswith('TIMESTAMP'):
+            return 'timestamp'
+        return 'text' if kind == 'json' else kind
+    if pd.api.types.is_bool_dtype(values):
+        return 'bool'
+    if pd.api.types.is_integer_dtype(values):
+        return 'int'
+    if pd.api.types.is_float_dtype(values):
+        return 'float'
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return 'timestamp'
+    return 'text'
+
+def _prepare(values, kind):
+    """(numpy values, missing mask) for a column; NaN, NaT, pd.NA and ±inf all become NULL."""
+    if kind == 'int' and pd.api.types.is_integer_dtype(values):
+        return values.to_numpy(dtype='int64', na_value=0), values.isna().to_numpy()
+    if kind in ('int', 'float'):
+        numbers = pd.to_numeric(values, errors='coerce').astype('float64').to_numpy()
+        missing = ~np.isfinite(numbers)
+        if kind == 'int':
+            return np.where(missing, 0, np.round(numbers)).astype('int64'), missing
+        return np.where(missing, 0.0, numbers), missing
+    if kind == 'bool':
+        flags = values if pd.api.types.is_bool_dtype(values) else values.astype('boolean')
+        missing = flags.isna().to_numpy()
+        return flags.fillna(False).to_numpy(dtype=bool), missing
+    if kind in ('date', 'timestamp'):
+        stamps = values if pd.api.types.is_datetime64_any_dtype(values) else pd.to_datetime(values, errors='coerce')
+        if getattr(stamps.dt, 'tz', None) is not None:
+            stamps = stamps.dt.tz_convert('UTC').dt.tz_localize(None)
+        missing = stamps.isna().to_numpy()
+        unit = 'datetime64[D]' if kind == 'date' else 'datetime64[us]'
+        return stamps.to_numpy(dtype=unit, na_value=np.datetime64(0, 'D')), missing
+    missing = values.isna().to_numpy()
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Format each category once and pick by code (missing values, code -1, are masked as NULL)
+        labels = np.append(values.cat.categories.astype(str).to_numpy(dtype=object), '')
+        return labels[values.cat.codes.to_numpy()], missing
+    return values.astype(str).fillna('').to_numpy(dtype=object), missing
+
+
+# --- Text format: tab separated, \N for NULL, backslash escapes ---
+def _escape(strings):
+    # Scan and escape the whole column as one string (NUL cannot occur in Postgres text, so it separates fields)
+    joined = '\0'.join(strings)
+    if not any(c in joined for c in '\\\t\n\r'):
+        return strings
+    escaped = joined.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r').split('\0')
+    if len(escaped) == len(strings):
+        return escaped
+    return [s.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+            for s in strings]
+
+def _text_column(values, kind):
+    data, missing = _prepare(values, kind)
+    if kind == 'bool':
+        strings = np.where(data, 't', 'f').tolist()
+    elif kind == 'text':
+        strings = _escape(data.tolist())
+    elif kind in ('int', 'float'):
+        # repr() of Python floats is the shortest round-trip form, about twice as fast as numpy's str
+        strings = list(map(repr, data.tolist()))
+    else:
+        # numpy formats dates (YYYY-MM-DD) and timestamps (ISO 8601)
+        strings = data.astype(str).tolist()
+    if missing.any():
+        strings = np.array(strings, dtype=object)
+        strings[missing] = '\\N'
+        strings = strings.tolist()
+    return strings
+
+def encode_text(df, kinds):
+    columns = [_text_column(df[column], kind) for column, kind in kinds.items()]
+    return ('\n'.join(map('\t'.join, zip(*columns))) + '\n').encode('utf-8')
+
+
+# --- Binary format: PGCOPY rows of (length, big-endian value) fields ---
+def _binary_column(values, kind):
+    data, missing = _prepare(values, kind)
+    if kind == 'text':
+        fields = []
+        for text in data:
+            raw = text.encode('utf-8')
+            fields.append(struct.pack('>i', len(raw)) + raw)
+    else:
+        if kind == 'date':
+            data = data.astype('int64') - PG_EPOCH_DAYS
+        elif kind == 'timestamp':
+            data = data.astype('int64') - PG_EPOCH_US
+        packed = np.empty(len(data), dtype=[('length', '>i4'), ('value', _BINARY_WIDTHS[kind])])
+        packed['length'] = packed.dtype['value'].itemsize
+        packed['value'] = data
+        raw, width = packed.tobytes(), packed.dtype.itemsize
+        fields = [raw[i:i + width] for i in range(0, len(raw), width)]
+    for i in np.flatnonzero(missing):
+        fields[i] = NULL_FIELD
+    return fields
+
+def encode_binary(df, kinds):
+    row_header = struct.pack('>h', len(kinds))
+    columns = [_binary_column(df[column], kind) for column, kind in kinds.items()]
+    return b''.join(row_header + b''.join(fields) for fields in zip(*columns))
+
+
+class _ChunkStream:
+    """File-like object over encoded chunks, so COPY never needs the whole payload in memory."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = bytearray()
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        size = len(self._buffer) if size < 0 else size
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+
+def _chunks(df, kinds, fmt, chunk_rows):
+    encode = encode_binary if fmt == 'binary' else encode_text
+    if fmt == 'binary':
+        yield PGCOPY_HEADER
+    for start in range(0, len(df), chunk_rows):
+        yield encode(df.iloc[start:start + chunk_rows], kinds)
+    if fmt == 'binary':
+        yield PGCOPY_TRAILER
+
+
+# --- Staging and upsert on the natural key ---
+def _without_missing_keys(df, table, key_columns):
+    missing = df[key_columns].isna().any(axis=1)
+    if missing.any():
+        print(f"⚠️ {table}: skipping {int(missing.sum())} rows without a value for key {key_columns}")
+        return df[~missing]
+    return df
+
+def _upsert_sql(table, stage, columns, select, key, changed_only=False):
+    # Last row wins when a chunk repeats a key (ON CONFLICT cannot touch the same row twice in one statement)
+    key_list = ', '.join(key)
+    values = [column for column in columns if normalize_column(column) not in key]
+    updates = [f"{column} = EXCLUDED.{column}" for column in values]
+    action = f"DO UPDATE SET {', '.join(updates)}" if updates else "DO NOTHING"
+    if updates and changed_only:
+        # Rows that did not change are not rewritten (no dead tuple, no WAL); JSON has no equality operator
+        types = _target_types(pd.DataFrame(columns=values), table)
+        cast = {c: '::text' if types[c] and sql_kind(types[c]) == 'json' else '' for c in values}
+        current = ', '.join(f"t.{c}{cast[c]}" for c in values)
+        incoming = ', '.join(f"EXCLUDED.{c}{cast[c]}" for c in values)
+        action += f" WHERE ({current}) IS DISTINCT FROM ({incoming})"
+    return f"""
+        INSERT INTO {table} AS t ({', '.join(columns)})
+        SELECT DISTINCT ON ({key_list}) {select} FROM {stage} ORDER BY {key_list}, ctid DESC
+        ON CONFLICT ({key_list}) {action}
+    """
+
+
+# --- Public API ---
+def copy_dataframe(conn, df, table, fmt=COPY_FORMAT, chunk_rows=COPY_CHUNK_ROWS, into=None):
+    """Load `df` into `table` with COPY FROM STDIN and return the number of rows written.
+
+    Rows are COPYed into a temporary staging table and upserted on the
+    table's natural key (table_key) with INSERT ... ON CONFLICT DO UPDATE,
+    so reloading the same data is idempotent; rows without a key value are
+    skipped. Text format lets Postgres parse each field into the target
+    types. Binary format sends typed values (no server-side parsing) into
+    wire-friendly staging types that are cast on insert (Postgres has no
+    compact binary form for NUMERIC). NaN, NaT, pd.NA, None and ±inf are
+    NULL; booleans, dates and timestamps use the column types of the table
+    definition. Tables without a key are COPYed into directly (text) or
+    appended from staging (binary). Missing partitions of range-partitioned
+    tables are created first, in the caller's transaction (load_file creates
+    them beforehand in a transaction of their own), and rows older than
+    their retention are skipped. With `into`, the rows are appended to that table instead (same
+    columns, e.g. a snapshot staging table), typed and keyed as `table`. The
+    caller owns the transaction.
+    """
+    key = table_key(table)
+    if key:
+        by_name = {normalize_column(column): column for column in df.columns}
+        absent = [k for k in key if k not in by_name]
+        if absent:
+            raise ValueError(f"{table}: key column(s) {absent} are not in the data")
+        df = _without_missing_keys(df, table, [by_name[k] for k in key])
+    if df.empty:
+        return 0
+    targets = _target_types(df, table)
+    kinds = {column: _column_kind(df[column], sql_type) for column, sql_type in targets.items()}
+    column_list = ', '.join(df.columns)
+
+    with conn.cursor() as cur:
+        df = ensure_partitions(cur, table, df)
+        if df.empty:
+            return 0
+        if into:
+            table, key = into, ()
+        if not key and fmt != 'binary':
+            stream = _ChunkStream(_chunks(df, kinds, 'text', chunk_rows))
+            cur.copy_expert(f"COPY {table} ({column_list}) FROM STDIN", stream, size=COPY_READ_BYTES)
+            return len(df)
+
+        stage = f"_stage_{table.split('.')[-1]}"
+        if fmt == 'binary':
+            stage_types = {column: BINARY_TYPES[kinds[column]] for column in df.columns}
+            select = ', '.join(f"{c}::{targets[c]}" if targets[c] else c for c in df.columns)
+            copy_options = " WITH (FORMAT binary)"
+        else:
+            stage_types = {column: targets[column] or BINARY_TYPES[kinds[column]] for column in df.columns}
+            select, copy_options = column_list, ""
+        # A staging table left by a failed load in this session is dropped first
+        stage_columns = ', '.join(f"{column} {sql_type}" for column, sql_type in stage_types.items())
+        cur.execute(f"DROP TABLE IF EXISTS pg_temp.{stage}; CREATE TEMP TABLE {stage} ({stage_columns})")
+        stream = _ChunkStream(_chunks(df, kinds, fmt, chunk_rows))
+        cur.copy_expert(f"COPY {stage} ({column_list}) FROM STDIN{copy_options}", stream, size=COPY_READ_BYTES)
+        if key:
+            cur.execute(_upsert_sql(table, stage, df.columns, select, key))
+        else:
+            cur.execute(f"INSERT INTO {table} ({column_list}) SELECT {select} FROM {stage}")
+        rows = cur.rowcount
+        cur.execute(f"DROP TABLE pg_temp.{stage}")
+    return rows
+
+def chunk_rows_for(path, memory_mb=LOAD_MEMORY_MB, max_rows=LOAD_CHUNK_ROWS):
+    """Rows per load chunk so that one chunk stays under `memory_mb`, from a sample of `path`."""
+    path = str(path)
+    if path.endswith('.parquet'):
+        parquet = pq.ParquetFile(path)
+        batches = parquet.iter_batches(batch_size=LOAD_SAMPLE_ROWS, row_groups=[0]) if parquet.num_row_groups else []
+        batch = next(iter(batches), None)
+        sample = batch.to_pandas() if batch is not None else pd.DataFrame()
+    else:
+        sample = pd.read_csv(path, nrows=LOAD_SAMPLE_ROWS)
+    if sample.empty:
+        return max_rows
+    row_bytes = sample.memory_usage(deep=True).sum() / len(sample) * LOAD_MEMORY_OVERHEAD
+    return int(min(max_rows, max(LOAD_MIN_CHUNK_ROWS, memory_mb * 2**20 // row_bytes)))
+
+def source_rows(path):
+    """Rows in a merged file: exact for Parquet (footer), line count for CSV."""
+    path = str(path)
+    if path.endswith('.parquet'):
+        return pq.ParquetFile(path).metadata.num_rows
+    with open(path, 'rb') as f:
+        return max(0, sum(block.count(b'\n') for block in iter(lambda: f.read(COPY_READ_BYTES), b'')) - 1)
+
+
+# --- Resumable loads: rows committed so far per (table, file), saved in the same transaction as the rows ---
+def _file_version(path):
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+def _resume_point(cur, table, path):
+    cur.execute(f"""
+        CREATE TABLE IF NOT EXISTS {LOAD_PROGRESS_TABLE} (
+            target_table TEXT, path TEXT, version TEXT, rows_done BIGINT, updated_at TIMESTAMP,
+            PRIMARY KEY (target_table, path)
+        )""")
+    cur.execute(f"SELECT version, rows_done FROM {LOAD_PROGRESS_TABLE} WHERE target_table = %s AND path = %s",
+                (table, path))
+    row = cur.fetchone()
+    if row is None:
+        return 0
+    if row[0] != _file_version(path):
+        print(f"⚠️ {table}: {os.path.basename(path)} changed since {row[1]} rows were committed, "
+              f"loading it from the start")
+        return 0
+    return row[1]
+
+def _save_progress(cur, table, path, rows_done):
+    cur.execute(f"""
+        INSERT INTO {LOAD_PROGRESS_TABLE} (target_table, path, version, rows_done, updated_at)
+        VALUES (%s, %s, %s, %s, now())
+        ON CONFLICT (target_table, path) DO UPDATE
+        SET version = EXCLUDED.version, rows_done = EXCLUDED.rows_done, updated_at = EXCLUDED.updated_at
+    """, (table, path, _file_version(path), rows_done))
+
+def _clear_progress(cur, table, path):
+    cur.execute(f"DELETE FROM {LOAD_PROGRESS_TABLE} WHERE target_table = %s AND path = %s", (table, path))
+
+
+def load_file(conn, path, table, transform=None, before=None, commit=LOAD_COMMIT, fmt=COPY_FORMAT,
+              chunk_rows=None, drop_indexes=None, snapshot=False, **read_kwargs):
+    """Stream a merged file into `table` chunk by chunk and return the number of rows loaded.
+
+    Each chunk is read typed (iter_typed), passed through `transform(df)`
+    and COPYed, so memory stays at one chunk (`chunk_rows`, by default sized
+    from LOAD_MEMORY_MB) whatever the file size. `commit='table'` loads the
+    whole file in one transaction. `commit='chunk'` commits after every
+    chunk together with its position in `load_progress`, so a failed load
+    resumes after the last committed chunk. `before(cursor)` runs in the
+    first transaction of a fresh (not resumed) load, e.g. to delete rows the
+    file replaces. Files of at least INDEX_DROP_ROWS rows (or any file with
+    `drop_indexes=True`) load with the table's secondary indexes dropped,
+    then rebuilt (indexes_dropped). `snapshot=True` stages the whole file
+    first and publishes it in one short transaction (load_snapshot; `commit`
+    does not apply). Every finished load is recorded in `load_ledger` with
+    the file's content hash, in the load's last transaction; a file whose
+    content was already loaded into `table` is skipped (returns 0) unless
+    ETL_LOAD_LEDGER is off. `read_kwargs` go to iter_typed (rename, dayfirst).
+    """
+    path = str(path)
+    digest = file_digest(path)
+    entry = loaded_entry(conn, table, path)
+    if LOAD_LEDGER and entry and entry[0] == digest:
+        print(f"⏭️ {table}: {os.path.basename(path)} already loaded ({entry[1]} rows at {entry[2]:%Y-%m-%d %H:%M})")
+        return 0
+    if entry:
+        print(f"🔁 {table}: {os.path.basename(path)} changed since its last load, reloading it")
+    ledger = partial(record_load, table=table, path=path, digest=digest)
+
+    column = partition_column(table)
+    if column:
+        # Created and committed before the load: inside it, CREATE ... PARTITION OF would lock out readers
+        prepare_partitions(conn, table, iter_typed(path, table, columns=[column], **read_kwargs))
+
+    if drop_indexes is None:
+        drop_indexes = INDEX_DROP_ROWS > 0 and source_rows(path) >= INDEX_DROP_ROWS
+    with indexes_dropped(conn, table, drop_indexes):
+        if snapshot:
+            return load_snapshot(conn, path, table, transform, before, fmt, chunk_rows, ledger=ledger,
+                                 previous_rows=entry[1] if entry else None, **read_kwargs)
+        return _load_chunks(conn, path, table, transform, before, commit, fmt, chunk_rows, ledger, read_kwargs)
+
+def _load_chunks(conn, path, table, transform, before, commit, fmt, chunk_rows, ledger, read_kwargs):
+    chunk_rows = chunk_rows or chunk_rows_for(path)
+    resumable = commit == 'chunk'
+    autocommit = conn.autocommit
+    conn.autocommit = False
+    rows = 0
+    try:
+        with conn.cursor() as cur:
+            start = _resume_point(cur, table, path) if resumable else 0
+            if start:
+                print(f"⏩ {table}: resuming {os.path.basename(path)} after {start} committed rows")
+            elif before:
+                before(cur)
+        for df in iter_typed(path, table, chunk_rows=chunk_rows, start=start, **read_kwargs):
+            start += len(df)
+            if transform:
+                df = transform(df)
+            rows += copy_dataframe(conn, df, table, fmt)
+            if resumable:
+                with conn.cursor() as cur:
+                    _save_progress(cur, table, path, start)
+                conn.commit()
+        with conn.cursor() as cur:
+            if resumable:
+                _clear_progress(cur, table, path)
+            ledger(cur, rows=start)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.autocommit = autocommit
+    return rows
+
+
+# --- Daily snapshots: stage the whole file unlogged, validate, publish in one transaction ---
+def _snapshot_counts(cur, stage, key, date_column):
+    """(staged rows, distinct keys, snapshot date)."""
+    key_list = ', '.join(key)
+    latest = f"max({date_column})" if date_column else "NULL"
+    cur.execute(f"SELECT count(*), count(DISTINCT ({key_list})), {latest} FROM {stage}")
+    return cur.fetchone()
+
+def load_snapshot(conn, path, table, transform=None, before=None, fmt=COPY_FORMAT, chunk_rows=None,
+                  min_ratio=SNAPSHOT_MIN_RATIO, ledger=None, previous_rows=None, **read_kwargs):
+    """Load a daily snapshot file so that readers see all of it or none of it; returns rows written.
+
+    The file is COPYed chunk by chunk into an UNLOGGED staging table (no
+    WAL), then checked: every COPYed row must be in staging, and the file
+    must have at least `min_ratio` times `previous_rows`, the rows of the
+    last published snapshot (its load_ledger row_count). A truncated extract
+    is refused and the live table left untouched; the staging table stays
+    (committed) for inspection until the next load of `table` replaces it.
+    `before(cursor)` and the upsert from staging then run in one short
+    transaction; rows identical to the live ones are not rewritten.
+    `ledger(cursor, rows)` runs in that transaction too.
+    """
+    key = table_key(table)
+    stage = f"{SCHEMA}._snapshot_{table.split('.')[-1]}"
+    date_column = 'date' if 'date' in table_columns(table) else None
+    chunk_rows = chunk_rows or chunk_rows_for(path)
+    autocommit = conn.autocommit
+    conn.autocommit = False
+    copied, columns = 0, None
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"DROP TABLE IF EXISTS {stage}; CREATE UNLOGGED TABLE {stage} (LIKE {table})")
+        conn.commit()
+        for df in iter_typed(path, table, chunk_rows=chunk_rows, **read_kwargs):
+            if transform:
+                df = transform(df)
+            copied += copy_dataframe(conn, df, table, fmt, into=stage)
+            columns = columns if columns is not None or df.empty else list(df.columns)
+            conn.commit()
+
+        with conn.cursor() as cur:
+            staged, keys, day = _snapshot_counts(cur, stage, key, date_column)
+            # A refused snapshot rolls back only this transaction: the committed staging table stays
+            if staged != copied:
+                raise ValueError(f"{table}: {copied} rows were copied but {staged} are staged")
+            if previous_rows and staged < previous_rows * min_ratio:
+                raise ValueError(f"{table}: snapshot {day} has {staged} rows, fewer than {min_ratio:.0%} "
+                                 f"of the last published snapshot ({previous_rows}); not published, "
+                                 f"staged rows kept in {stage}")
+            if keys < staged:
+                print(f"⚠️ {table}: {staged - keys} staged rows repeat a key, the last one wins")
+
+            if before:
+                before(cur)
+            rows = 0
+            if columns:
+                select = ', '.join(columns)
+                cur.execute(_upsert_sql(table, stage, columns, select, key, changed_only=True))
+                rows = cur.rowcount
+            cur.execute(f"DROP TABLE {stage}")
+            if ledger:
+                ledger(cur, rows=staged)
+        conn.commit()
+        print(f"🧩 {table}: snapshot {day} published, {rows} of {staged} staged rows new or changed")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.autocommit = autocommit
+    return rows
@@ -0,0 +1,168 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+MAX_IN_FLIGHT = 4                         # Batches fetched concurrently
+REQUESTS_PER_SECOND = 5                   # Shared API budget across all workers
+BURST = 10                                # Requests allowed back-to-back before throttling
+
+# Adaptive rate control (shared by every extract module)
+MIN_RATE = 0.5                            # Requests/second floor while throttled
+MAX_RATE = 20                             # Requests/second ceiling while healthy
+INCREASE_STEP = 0.25                      # Additive increase per successful call
+DECREASE_FACTOR = 0.5                     # Multiplicative decrease per throttled call
+BASE_BACKOFF = 1.0                        # Seconds, doubled per consecutive throttle
+MAX_BACKOFF = 60.0                        # Backoff ceiling in seconds
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by every worker of a fetch run.
+
+    Tokens refill continuously at `rate` per second up to `capacity`.
+    `acquire` blocks until enough tokens are available, so the overall
+    request rate never exceeds the budget regardless of concurrency.
+    """
+
+    def __init__(self, rate=REQUESTS_PER_SECOND, capacity=BURST):
+        self.rate = float(rate)
+        self.capacity = float(max(capacity, 1))
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self, tokens=1):
+        # Requests larger than the bucket are clamped so they can still go through
+        tokens = min(float(tokens), self.capacity)
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class AdaptiveRateController(TokenBucket):
+    """Token bucket whose rate follows API health (AIMD).
+
+    Every successful call adds INCREASE_STEP requests/second up to MAX_RATE.
+    A throttled call (HTTP 429) multiplies the rate by
+    DECREASE_FACTOR and pauses all workers for an exponentially growing,
+    jittered backoff. `current_rate` exposes the live rate.
+    """
+
+    def __init__(self, rate=REQUESTS_PER_SECOND, capacity=BURST, min_rate=MIN_RATE, max_rate=MAX_RATE,
+                 increase_step=INCREASE_STEP, decrease_factor=DECREASE_FACTOR,
+                 base_backoff=BASE_BACKOFF, max_backoff=MAX_BACKOFF):
+        super().__init__(rate, capacity)
+        self.min_rate = float(min_rate)
+        self.max_rate = float(max_rate)
+        self.increase_step = float(increase_step)
+        self.decrease_factor = float(decrease_factor)
+        self.base_backoff = float(base_backoff)
+        self.max_backoff = float(max_backoff)
+        self.successes = 0
+        self.throttles = 0
+        self._streak = 0
+        self._blocked_until = 0.0
+
+    @property
+    def current_rate(self):
+        return self.rate
+
+    def acquire(self, tokens=1):
+        while True:
+            with self._lock:
+                wait = self._blocked_until - time.monotonic()
+            if wait <= 0:
+                break
+            time.sleep(wait)
+        super().acquire(tokens)
+
+    def on_success(self):
+        with self._lock:
+            self._refill()
+            self.successes += 1
+            self._streak = 0
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def on_throttle(self):
+        with self._lock:
+            self._refill()
+            self.throttles += 1
+            self._streak += 1
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            backoff = min(self.max_backoff, self.base_backoff * 2 ** (self._streak - 1))
+            backoff *= random.uniform(0.5, 1.5)
+            self._blocked_until = max(self._blocked_until, time.monotonic() + backoff)
+            # Drain the bucket so the resumed workers ramp up at the new rate
+            self._tokens = 0.0
+        print(f"🐢 Throttled, backing off {backoff:.1f}s (rate now {self.rate:.2f} req/s)")
+
+    def __repr__(self):
+        return (f"rate={self.rate:.2f} req/s, successes={self.successes}, "
+                f"throttles={self.throttles}")
+
+
+def is_throttle_error(error):
+    text = str(error)
+    return '429' in text or 'Too Many Requests' in text
+
+
+_controller = None
+_controller_lock = threading.Lock()
+
+def get_rate_controller():
+    """Process-wide controller shared by all extract modules."""
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = AdaptiveRateController()
+        return _controller
+
+def set_rate_controller(controller):
+    # Shard processes swap in a proxy to the controller hosted by etl.shard_runner
+    global _controller
+    with _controller_lock:
+        _controller = controller
+
+
+def chunk(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def run_batches(batches, worker, max_in_flight=MAX_IN_FLIGHT, limiter=None, cost=len):
+    """Run `worker(batch)` for every batch with up to `max_in_flight` in flight.
+
+    Before each batch is dispatched, `cost(batch)` tokens are taken from
+    `limiter` (yahooquery issues one request per symbol, hence `len`).
+    Returns {batch_index: result}; a failing batch is reported and mapped
+    to None so the remaining batches keep going.
+    """
+    results = {}
+    total = len(batches)
+
+    def _run(index, batch):
+        if limiter is not None:
+            limiter.acquire(cost(batch))
+        print(f"\n⏳ Processing batch {index + 1} / {total}")
+        return worker(batch)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_in_flight)) as pool:
+        futures = {pool.submit(_run, i, batch): i for i, batch in enumerate(batches)}
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                results[index] = future.result()
+            except Exception as e:
+                print(f"❌ Batch {index + 1} failed: {e}")
+                results[index] = None
+
+    return results
@@ -0,0 +1,141 @@
+import argparse
+import os
+import sys
+from contextlib import contextmanager
+
+# Add project root to sys.path for imports
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import psycopg2
+from setup.table_definitions import INDEXES, SCHEMA
+from etl.partitions import _table_name, is_partitioned, list_partitions
+from utils import DB_PARAMS
+
+
+def index_name(table, method, columns):
+    """pricing_option_chain_symbol_date_btree."""
+    return f"{table}_{'_'.join(columns)}_{method}"
+
+def _index_valid(cur, name):
+    """True/False for an existing (valid/invalid) index, None when there is none."""
+    cur.execute("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)", (f"{SCHEMA}.{name}",))
+    row = cur.fetchone()
+    return None if row is None else row[0]
+
+def _create_concurrently(cur, name, table, method, columns):
+    # An interrupted CONCURRENTLY build leaves an invalid index behind: drop it and start over
+    if _index_valid(cur, name) is False:
+        cur.execute(f"DROP INDEX CONCURRENTLY {SCHEMA}.{name}")
+    cur.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {SCHEMA}.{table} "
+                f"USING {method} ({', '.join(columns)})")
+
+
+# --- Build / drop (autocommit: CONCURRENTLY cannot run inside a transaction) ---
+def create_index(cur, table, method, columns):
+    """Build one declared index without blocking writes; returns False when it already existed.
+
+    A partitioned table cannot be indexed CONCURRENTLY as a whole: each
+    partition is indexed concurrently, then attached to an index created
+    ON ONLY the parent (which becomes valid once every partition is attached
+    and is inherited by partitions created later).
+    """
+    name = index_name(table, method, columns)
+    if _index_valid(cur, name):
+        return False
+    if not is_partitioned(cur, table):
+        _create_concurrently(cur, name, table, method, columns)
+        return True
+    cur.execute(f"CREATE INDEX IF NOT EXISTS {name} ON ONLY {SCHEMA}.{table} USING {method} ({', '.join(columns)})")
+    for partition in sorted(list_partitions(cur, table)):
+        child = index_name(partition, method, columns)
+        _create_concurrently(cur, child, partition, method, columns)
+        cur.execute(f"ALTER INDEX {SCHEMA}.{name} ATTACH PARTITION {SCHEMA}.{child}")
+    return True
+
+def create_indexes(conn, tables=None):
+    """Build the missing declared indexes of `tables` (default: all) and return their names."""
+    conn.commit()
+    autocommit = conn.autocommit
+    conn.autocommit = True
+    created = []
+    try:
+        with conn.cursor() as cur:
+            for table in tables or INDEXES:
+                table = _table_name(table)
+                for method, columns in INDEXES.get(table, ()):
+                    if create_index(cur, table, method, columns):
+                        created.append(index_name(table, method, columns))
+    finally:
+        conn.autocommit = autocommit
+    if created:
+        print(f"🗂️ Built {len(created)} indexes: {', '.join(created)}")
+    return created
+
+def drop_indexes(conn, table):
+    """Drop the declared secondary indexes of `table` (the primary key stays for the upserts)."""
+    table = _table_name(table)
+    names = [index_name(table, method, columns) for method, columns in INDEXES.get(table, ())]
+    with conn.cursor() as cur:
+        for name in names:
+            # Dropping a partitioned index drops its partitions' indexes with it
+            cur.execute(f"DROP INDEX IF EXISTS {SCHEMA}.{name}")
+    conn.commit()
+    if names:
+        print(f"🗂️ {SCHEMA}.{table}: dropped {len(names)} secondary indexes for a bulk load")
+    return names
+
+def analyze(conn, tables):
+    conn.commit()
+    autocommit = conn.autocommit
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            for table in tables:
+                cur.execute(f"ANALYZE {SCHEMA}.{_table_name(table)}")
+    finally:
+        conn.autocommit = autocommit
+
+
+# --- Around bulk loads ---
+@contextmanager
+def indexes_dropped(conn, table, active=True):
+    """Load `table` without its secondary indexes: drop them, then rebuild them concurrently and ANALYZE.
+
+    Maintaining an index row by row during a backfill costs more than one
+    sorted build afterwards. The indexes are rebuilt even if the load fails.
+    CONCURRENTLY waits for transactions already open elsewhere (e.g. another
+    table's load) to finish, so a rebuild may end after them.
+    """
+    if not active or not INDEXES.get(_table_name(table)):
+        yield
+        return
+    drop_indexes(conn, table)
+    try:
+        yield
+    finally:
+        create_indexes(conn, [table])
+        analyze(conn, [table])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the declared secondary indexes and ANALYZE their tables.")
+    parser.add_argument('tables', nargs='*', help="tables to index (default: every table in INDEXES)")
+    parser.add_argument('--drop', action='store_true', help="drop the declared indexes instead (before a backfill)")
+    args = parser.parse_args()
+
+    tables = [_table_name(t) for t in args.tables] or list(INDEXES)
+    conn = psycopg2.connect(**DB_PARAMS)
+    try:
+        if args.drop:
+            for table in tables:
+                drop_indexes(conn, table)
+        else:
+            create_indexes(conn, tables)
+            analyze(conn, tables)
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    main()
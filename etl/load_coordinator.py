@@ -0,0 +1,89 @@
+import atexit
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from psycopg2.pool import ThreadedConnectionPool
+from utils import DB_PARAMS, LOAD_WORKERS
+
+# One pool per set of connection parameters, shared by every load stage of the process
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+# --- Connection pool ---
+def get_pool(params=DB_PARAMS, workers=LOAD_WORKERS):
+    """The shared pool for `params`; it is sized on first use and holds at most `workers` connections."""
+    key = tuple(sorted(params.items()))
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ThreadedConnectionPool(1, max(1, workers), **params)
+        return _pools[key]
+
+@contextmanager
+def pooled_connection(params=DB_PARAMS):
+    """A connection from the shared pool, handed back (autocommit, no open transaction) afterwards."""
+    pool = get_pool(params)
+    conn = pool.getconn()
+    try:
+        yield conn
+    finally:
+        if conn.closed:
+            pool.putconn(conn, close=True)
+        else:
+            conn.rollback()
+            conn.autocommit = True
+            pool.putconn(conn)
+
+def close_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.closeall()
+        _pools.clear()
+
+atexit.register(close_pools)
+
+
+# --- Coordinator ---
+def _run_job(load, params):
+    start = time.perf_counter()
+    with pooled_connection(params) as conn:
+        rows = load(conn)
+    return rows, time.perf_counter() - start
+
+def run_loads(jobs, params=DB_PARAMS, workers=LOAD_WORKERS, stage='load'):
+    """Run independent table loads concurrently on pooled connections and report per-table timings.
+
+    `jobs` is a list of (name, load) pairs where `load(conn)` loads one
+    table (committing its own work) and returns its row count. Up to
+    `workers` jobs run at once, each on its own connection, so the stage
+    takes about as long as its largest table rather than the sum. A failing
+    job is reported and does not stop the others. Returns
+    {name: (rows, seconds, error)}.
+    """
+    results = {}
+    if not jobs:
+        return results
+    start = time.perf_counter()
+    # Never more jobs in flight than the pool has connections
+    workers = max(1, min(workers, get_pool(params, workers).maxconn, len(jobs)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_run_job, load, params): name for name, load in jobs}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                rows, seconds = future.result()
+                results[name] = (rows, seconds, None)
+            except Exception as e:
+                print(f"❌ Failed to load {name}: {e}")
+                results[name] = (0, None, e)
+    wall = time.perf_counter() - start
+
+    print(f"\n⏱️ {stage}: {len(jobs)} tables in {wall:.1f}s with {workers} workers")
+    for name, _ in jobs:
+        rows, seconds, error = results[name]
+        timing = f"{seconds:8.1f}s" if error is None else "  failed"
+        print(f"   {name:<45} {timing} {rows or 0:>12,} rows")
+    total = sum(seconds for _, seconds, error in results.values() if error is None)
+    print(f"   sum of table times {total:.1f}s, wall {wall:.1f}s")
+    return results
@@ -0,0 +1,53 @@
+import hashlib
+import os
+import threading
+from setup.table_definitions import SCHEMA
+
+LOAD_LEDGER_TABLE = f"{SCHEMA}.load_ledger"
+HASH_READ_BYTES = 1 << 20                 # Bytes hashed per read
+
+_created = set()                          # Databases (DSNs) the ledger table is known to exist in
+_create_lock = threading.Lock()
+
+
+def file_digest(path):
+    """sha256 of the file's content."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_READ_BYTES), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _ensure_ledger(conn):
+    # Created once per process and database (concurrent CREATE TABLE IF NOT EXISTS can still collide in the catalog)
+    dsn = getattr(conn, 'dsn', None)
+    with _create_lock:
+        if dsn in _created:
+            return
+        with conn.cursor() as cur:
+            cur.execute(f"""
+                CREATE TABLE IF NOT EXISTS {LOAD_LEDGER_TABLE} (
+                    path TEXT, content_hash TEXT, target_table TEXT, row_count BIGINT, loaded_at TIMESTAMP,
+                    PRIMARY KEY (target_table, path)
+                )""")
+        conn.commit()
+        _created.add(dsn)
+
+def loaded_entry(conn, table, path):
+    """(content_hash, row_count, loaded_at) of the last load of `path` into `table`, or None."""
+    _ensure_ledger(conn)
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT content_hash, row_count, loaded_at FROM {LOAD_LEDGER_TABLE} "
+                    f"WHERE target_table = %s AND path = %s", (table, os.path.abspath(path)))
+        row = cur.fetchone()
+    conn.commit()
+    return row
+
+def record_load(cur, table, path, digest, rows):
+    """Record a finished load of `rows` file rows; runs in the load's last transaction, so it commits with them."""
+    cur.execute(f"""
+        INSERT INTO {LOAD_LEDGER_TABLE} (path, content_hash, target_table, row_count, loaded_at)
+        VALUES (%s, %s, %s, %s, now())
+        ON CONFLICT (target_table, path) DO UPDATE
+        SET content_hash = EXCLUDED.content_hash, row_count = EXCLUDED.row_count, loaded_at = EXCLUDED.loaded_at
+    """, (os.path.abspath(path), digest, table, rows))
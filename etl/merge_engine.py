@@ -0,0 +1,468 @@
+import base64
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from etl.staging import PARQUET_COMPRESSION, arrow_safe, parallel_map, read_merge_input, write_frame
+from utils import MERGE_WORKERS, MERGE_EXECUTOR
+
+MERGE_BUFFER_ROWS = 250_000               # Rows buffered per write (about one Parquet row group)
+SOURCE_COLUMN = '__merge_source'          # Input file index carried through `transform`, never written
+HASH_CHUNK_BYTES = 1 << 20
+MANIFEST_VERSION = 2                      # Bump to force a full rebuild of every merged output
+
+
+# --- Input schemas ---
+def read_columns(path):
+    """Column names of a staged file without reading its rows."""
+    if str(path).endswith('.parquet'):
+        return pq.read_schema(path).names
+    return pd.read_csv(path, nrows=0).columns.tolist()
+
+def _skip(path, e):
+    pass
+
+def _read_fields(path):
+    # [(column, arrow type or None for CSV)] without 'Unnamed' index columns
+    if str(path).endswith('.parquet'):
+        fields = [(f.name, f.type) for f in pq.read_schema(path)]
+    else:
+        fields = [(name, None) for name in read_columns(path)]
+    return [(name, t) for name, t in fields if not name.startswith('Unnamed')]
+
+def _unify_types(types):
+    types = [t for t in types if not pa.types.is_null(t)]
+    if not types:
+        return pa.null()
+    if all(t == types[0] for t in types):
+        return types[0]
+    if all(pa.types.is_integer(t) or pa.types.is_floating(t) for t in types):
+        return pa.float64()
+    if all(pa.types.is_timestamp(t) and t.tz == types[0].tz for t in types):
+        return pa.timestamp('us', tz=types[0].tz)
+    return pa.string()
+
+def _scan_fields(files, on_error, workers, executor):
+    # Merged column set (first-seen order, like pd.concat), arrow types per column and the readable files
+    columns, seen, types, readable = [], set(), {}, []
+    for path, fields in parallel_map(_read_fields, files, on_error or _skip, workers, executor):
+        for name, arrow_type in fields:
+            if arrow_type is not None:
+                types.setdefault(name, []).append(arrow_type)
+        names = [name for name, _ in fields]
+        columns.extend(c for c in names if c not in seen)
+        seen.update(names)
+        readable.append(path)
+    return columns, types, readable
+
+def _to_arrow(df, schema):
+    # Missing columns become nulls, mismatched ones are cast to the merged type
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    arrays = []
+    for field in schema:
+        column = table.column(field.name) if field.name in table.column_names else None
+        if column is None or column.null_count == len(column):
+            arrays.append(pa.nulls(len(table), type=field.type))
+        else:
+            arrays.append(column if column.type == field.type else column.cast(field.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+# --- Input fingerprints and the merge manifest ---
+def file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def fingerprint(path, previous=None):
+    """{'size', 'mtime', 'sha1'} of a file; the hash is only recomputed when size or mtime moved."""
+    stat = os.stat(path)
+    fp = {'size': stat.st_size, 'mtime': stat.st_mtime_ns}
+    if previous and previous['size'] == fp['size'] and previous['mtime'] == fp['mtime']:
+        fp['sha1'] = previous['sha1']
+    else:
+        fp['sha1'] = file_hash(path)
+    return fp
+
+def input_key(path):
+    """Manifest key of an input: its path without the run date partition, so it matches across runs."""
+    head, name = os.path.split(str(path))
+    if os.path.basename(head).startswith('date='):
+        head = os.path.dirname(head)
+    return os.path.join(head, name)
+
+def manifest_path(output_path):
+    return f"{output_path}.manifest.json"
+
+def _params_key(params):
+    return json.dumps([MANIFEST_VERSION, params], sort_keys=True, default=str)
+
+def _output_stat(output_path):
+    stat = os.stat(output_path)
+    return {'size': stat.st_size, 'mtime': stat.st_mtime_ns}
+
+def load_manifest(output_path):
+    """Manifest of a merged output, or None when missing, unreadable or out of step with the output."""
+    path = manifest_path(output_path)
+    if not (os.path.exists(path) and os.path.exists(output_path)):
+        return None
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    # A merged file rewritten by anything else no longer matches the recorded row ranges
+    return manifest if manifest.get('output') == _output_stat(output_path) else None
+
+def _save_manifest(output_path, params, stamp, columns, input_schema, rows, files, fingerprints, ranges):
+    entries = {}
+    for index, path in enumerate(files):
+        if index in ranges and path in fingerprints:
+            start, n_rows = ranges[index]
+            entries[input_key(path)] = dict(fingerprints[path], start=start, rows=n_rows)
+    manifest = {
+        'params': _params_key(params),
+        'stamp': stamp,
+        'columns': columns,
+        'input_schema': base64.b64encode(input_schema.serialize().to_pybytes()).decode('ascii'),
+        'rows': rows,
+        'output': _output_stat(output_path),
+        'files': entries,
+    }
+    path = manifest_path(output_path)
+    with open(f"{path}.tmp", 'w') as f:
+        json.dump(manifest, f)
+    os.replace(f"{path}.tmp", path)
+
+def _input_schema(manifest):
+    return pa.ipc.read_schema(pa.py_buffer(base64.b64decode(manifest['input_schema'])))
+
+def _drop_manifest(output_path):
+    if os.path.exists(manifest_path(output_path)):
+        os.remove(manifest_path(output_path))
+
+
+# --- Writing ---
+class MergeWriter:
+    """Appends merged rows to `<output>.tmp` and records where each input file's rows land.
+
+    `ranges` maps input file index -> (first row, row count) in the output.
+    Parquet rows are written in row groups of about `buffer_rows`.
+    """
+
+    def __init__(self, output_path, types=None, schema=None, buffer_rows=MERGE_BUFFER_ROWS):
+        self.output_path = output_path
+        self.tmp_path = f"{output_path}.tmp"
+        self.is_parquet = output_path.endswith('.parquet')
+        self.types = types or {}
+        self.schema = schema
+        self.buffer_rows = buffer_rows
+        self.rows = 0
+        self.ranges = {}
+        self._writer = None
+        self._csv_columns = None
+        self._pending, self._pending_rows = [], 0
+
+    def _set_schema(self, df):
+        # Columns added by `transform` keep the type they have in the first buffer
+        first = pa.Table.from_pandas(df, preserve_index=False).schema
+        merged_types = {name: _unify_types(self.types.get(name, [])) for name in df.columns}
+        self.schema = pa.schema([
+            pa.field(name, first.field(name).type if pa.types.is_null(t) else t)
+            for name, t in merged_types.items()
+        ])
+
+    def _track(self, source, n_rows):
+        self.ranges[source] = (self.rows, n_rows)
+        self.rows += n_rows
+
+    def _append(self, table):
+        self._pending.append(table)
+        self._pending_rows += table.num_rows
+        if self._pending_rows >= self.buffer_rows:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.tmp_path, self.schema, compression=PARQUET_COMPRESSION)
+        self._writer.write_table(pa.concat_tables(self._pending))
+        self._pending, self._pending_rows = [], 0
+
+    def add_frame(self, df, sources):
+        """Append a transformed buffer built from the input files `sources` (ascending indices)."""
+        df = df.sort_values(SOURCE_COLUMN, kind='stable')
+        counts = df[SOURCE_COLUMN].value_counts()
+        df = df.drop(columns=SOURCE_COLUMN).reset_index(drop=True)
+        if self.is_parquet:
+            df = arrow_safe(df)
+            if self.schema is None:
+                self._set_schema(df)
+            self._append(_to_arrow(df, self.schema))
+        elif self._csv_columns is None:
+            self._csv_columns = list(df.columns)
+            df.to_csv(self.tmp_path, index=False)
+        else:
+            df.reindex(columns=self._csv_columns).to_csv(self.tmp_path, mode='a', header=False, index=False)
+        for source in sources:
+            self._track(source, int(counts.get(source, 0)))
+
+    def add_table(self, table, source):
+        """Append rows copied from the previous output (already in the output schema)."""
+        self._append(table)
+        self._track(source, table.num_rows)
+
+    def commit(self, empty_columns):
+        """Move the output into place and return the rows written.
+
+        With nothing written, an empty file is left so loaders see "no rows"
+        rather than last run's data.
+        """
+        if self.is_parquet:
+            self._flush()
+            if self._writer is None and self.schema is not None:
+                self._writer = pq.ParquetWriter(self.tmp_path, self.schema, compression=PARQUET_COMPRESSION)
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        elif self._csv_columns is None:
+            write_frame(pd.DataFrame(columns=empty_columns), self.output_path)
+            return 0
+        os.replace(self.tmp_path, self.output_path)
+        return self.rows
+
+    def abort(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+def _restamp(table, stamp):
+    # Rows copied from the previous output get this run's value of each stamped column
+    for name, value in stamp.items():
+        index = table.schema.get_field_index(name)
+        if index >= 0:
+            field = table.schema.field(index)
+            table = table.set_column(index, field, pa.repeat(pa.scalar(value, field.type), table.num_rows))
+    return table
+
+
+class _OutputRows:
+    """Row-range reads from a previous merged Parquet output, one row group in memory at a time."""
+
+    def __init__(self, path):
+        self._file = pq.ParquetFile(path)
+        self.schema = self._file.schema_arrow
+        self._groups, start = [], 0
+        for i in range(self._file.num_row_groups):
+            n_rows = self._file.metadata.row_group(i).num_rows
+            self._groups.append((start, start + n_rows))
+            start += n_rows
+        self._cached = (None, None)
+
+    def _group(self, i):
+        if self._cached[0] != i:
+            self._cached = (i, self._file.read_row_group(i))
+        return self._cached[1]
+
+    def read(self, start, n_rows):
+        stop = start + n_rows
+        pieces = []
+        for i, (lo, hi) in enumerate(self._groups):
+            if lo < stop and hi > start:
+                first = max(start, lo)
+                pieces.append(self._group(i).slice(first - lo, min(stop, hi) - first))
+        return pa.concat_tables(pieces) if pieces else self.schema.empty_table()
+
+    def close(self):
+        self._cached = (None, None)
+        self._file.close()
+
+
+def _merge(writer, files, to_read, columns, transform, on_error, buffer_rows, workers, executor,
+           copies=None, previous=None, read=read_merge_input, stamp=None):
+    """Write `files` in order: `to_read` are read and transformed, `copies` ({path: (start, rows)})
+    are copied from the `previous` output (with the `stamp` columns set). Returns the files whose
+    transform/write failed."""
+    copies = copies or {}
+    failed = []
+    frames, sources, paths, buffered = [], [], [], 0
+
+    def flush():
+        if not frames:
+            return
+        try:
+            df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+            df[SOURCE_COLUMN] = np.repeat(sources, [len(frame) for frame in frames])
+            if transform:
+                df = transform(df)
+            writer.add_frame(df, list(sources))
+        except Exception as e:
+            failed.extend(paths)
+            if on_error:
+                for path in paths:
+                    on_error(path, e)
+        frames.clear()
+        sources.clear()
+        paths.clear()
+
+    reads = parallel_map(read, to_read, on_error or _skip, workers, executor)
+    pending = next(reads, None)
+    for index, path in enumerate(files):
+        if path in copies:
+            flush()
+            buffered = 0
+            table = previous.read(*copies[path])
+            writer.add_table(_restamp(table, stamp) if stamp else table, index)
+            continue
+        if pending is None or pending[0] != path:
+            continue  # Not readable (already reported)
+        df = pending[1].reindex(columns=columns)
+        pending = next(reads, None)
+        frames.append(df)
+        sources.append(index)
+        paths.append(path)
+        buffered += len(df)
+        if buffered >= buffer_rows:
+            flush()
+            buffered = 0
+    flush()
+    return failed
+
+
+# --- Public entry points ---
+def stream_merge(files, output_path, transform=None, on_error=None, params=None, stamp=None, fingerprints=None,
+                 read=read_merge_input, buffer_rows=MERGE_BUFFER_ROWS, workers=MERGE_WORKERS,
+                 executor=MERGE_EXECUTOR):
+    """Concatenate staged files into `output_path` without holding them all in memory.
+
+    A cheap first pass reads only the headers/schemas to fix the merged column
+    set (first-seen order, like pd.concat) and, for Parquet, one type per
+    column. Whole files are then read in parallel (kept in input order),
+    aligned to those columns, buffered up to `buffer_rows`, passed through
+    `transform(df)` and appended to the writer. `transform` must only need the
+    rows of the files it is given and keep columns it does not know about.
+    `read(path)` loads one input (e.g. a schema_registry.merge_reader). Peak
+    memory is one buffer plus the read-ahead; total work grows linearly with
+    the number of files. Parquet outputs also get a manifest for
+    `incremental_merge`. Returns the number of rows written.
+    """
+    files = list(files)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    columns, types, readable = _scan_fields(files, on_error, workers, executor)
+
+    writer = MergeWriter(output_path, types=types, buffer_rows=buffer_rows)
+    try:
+        _merge(writer, files, readable, columns, transform, on_error, buffer_rows, workers, executor,
+               read=read)
+        rows = writer.commit(columns)
+    except BaseException:
+        writer.abort()
+        raise
+
+    if not writer.is_parquet:
+        _drop_manifest(output_path)
+        return rows
+    if fingerprints is None:
+        fingerprints = dict(parallel_map(fingerprint, readable, _skip, workers, 'thread'))
+    input_schema = pa.schema([pa.field(name, _unify_types(types.get(name, []))) for name in columns])
+    _save_manifest(output_path, params, stamp, columns, input_schema, rows, files, fingerprints, writer.ranges)
+    return rows
+
+def _compatible(paths, manifest, on_error, workers, executor):
+    # Changed files may only bring columns and types the previous output already has
+    input_schema = _input_schema(manifest)
+    for _, fields in parallel_map(_read_fields, paths, on_error or _skip, workers, executor):
+        for name, arrow_type in fields:
+            if name not in input_schema.names:
+                return False
+            known = input_schema.field(name).type
+            if arrow_type is not None and _unify_types([known, arrow_type]) != known:
+                return False
+    return True
+
+def incremental_merge(files, output_path, transform=None, on_error=None, params=None, stamp=None,
+                      read=read_merge_input, buffer_rows=MERGE_BUFFER_ROWS, workers=MERGE_WORKERS,
+                      executor=MERGE_EXECUTOR):
+    """stream_merge that only re-reads the inputs that changed since the last merge.
+
+    The manifest next to the output (`<output>.manifest.json`) keeps each
+    input's size, mtime and SHA-1 and the row range its rows occupy in the
+    output, keyed by `input_key` so a file staged under a new run date still
+    matches. Unchanged files are copied from the previous output by row range;
+    changed and new files are read and transformed; removed files are dropped.
+    `params` (anything JSON-serializable that changes what `transform` does)
+    must match the previous merge. `stamp` ({column: value}) names columns
+    the transform sets to a per-run constant, e.g. the merge date: copied rows
+    get the new value instead of forcing a full merge (only columns the inputs
+    do not have themselves). A different `params`, new columns or types, an
+    output edited elsewhere or CSV output fall back to a full stream_merge.
+    Returns the number of rows written.
+    """
+    files = list(files)
+    full = dict(transform=transform, on_error=on_error, params=params, stamp=stamp, read=read,
+                buffer_rows=buffer_rows, workers=workers, executor=executor)
+    name = os.path.basename(output_path)
+    if not output_path.endswith('.parquet'):
+        return stream_merge(files, output_path, **full)
+
+    manifest = load_manifest(output_path)
+    previous = {}
+    if manifest:
+        # Keyed by input_key: files keep their entry when the run date partition moves
+        previous = {path: manifest['files'][input_key(path)] for path in files if input_key(path) in manifest['files']}
+    fingerprints = dict(parallel_map(lambda path: fingerprint(path, previous.get(path)),
+                                     files, on_error or _skip, workers, 'thread'))
+    if manifest is None or manifest['params'] != _params_key(params):
+        return stream_merge(files, output_path, fingerprints=fingerprints, **full)
+
+    unchanged = {path for path, fp in fingerprints.items()
+                 if path in previous and fp['sha1'] == previous[path]['sha1']}
+    changed = [path for path in files if path in fingerprints and path not in unchanged]
+    removed = set(manifest['files']) - {input_key(path) for path in fingerprints}
+    restamp = {name: value for name, value in (stamp or {}).items() if name not in manifest['columns']}
+
+    if not changed and not removed and manifest.get('stamp') == stamp:
+        if any(fingerprints[path]['mtime'] != previous[path]['mtime'] for path in unchanged):
+            ranges = {i: (previous[p]['start'], previous[p]['rows']) for i, p in enumerate(files) if p in unchanged}
+            _save_manifest(output_path, params, stamp, manifest['columns'], _input_schema(manifest),
+                           manifest['rows'], files, fingerprints, ranges)
+        print(f"♻️ {name}: no input changes, kept {len(unchanged)} files ({manifest['rows']} rows)")
+        return manifest['rows']
+
+    if not _compatible(changed, manifest, on_error, workers, executor):
+        print(f"🔄 {name}: input schema changed, full rebuild")
+        return stream_merge(files, output_path, fingerprints=fingerprints, **full)
+
+    copies = {path: (previous[path]['start'], previous[path]['rows']) for path in unchanged}
+    old_rows = _OutputRows(output_path)
+    writer = MergeWriter(output_path, schema=old_rows.schema, buffer_rows=buffer_rows)
+    try:
+        failed = _merge(writer, files, changed, manifest['columns'], transform, on_error,
+                        buffer_rows, workers, executor, copies=copies, previous=old_rows, read=read,
+                        stamp=restamp)
+        old_rows.close()
+        if failed:
+            # Rows that no longer fit the previous output's schema: rebuild everything with a fresh one
+            writer.abort()
+            print(f"🔄 {name}: {len(failed)} changed files did not fit the merged schema, full rebuild")
+            return stream_merge(files, output_path, fingerprints=fingerprints, **full)
+        rows = writer.commit(manifest['columns'])
+    except BaseException:
+        old_rows.close()
+        writer.abort()
+        raise
+
+    _save_manifest(output_path, params, stamp, manifest['columns'], _input_schema(manifest), rows,
+                   files, fingerprints, writer.ranges)
+    print(f"♻️ {name}: re-merged {len(changed)} changed files, dropped {len(removed)}, "
+          f"reused {len(unchanged)} from the previous merge")
+    return rows
@@ -0,0 +1,231 @@
+import argparse
+import datetime
+import gzip
+import os
+import sys
+
+# Add project root to sys.path for imports
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import pandas as pd
+import psycopg2
+from setup.table_definitions import KEYS, PARTITIONS, SCHEMA, TABLES
+from utils import (
+    DB_PARAMS, PARTITION_PREMAKE, HISTORY_RETAIN_YEARS, OPTION_CHAIN_RETAIN_MONTHS,
+    PARTITION_ARCHIVE, PARTITION_ARCHIVE_DIR
+)
+
+# Periods kept per partitioned table before maintenance detaches older partitions (0 = keep all)
+RETAIN = {'pricing_history': HISTORY_RETAIN_YEARS, 'pricing_option_chain': OPTION_CHAIN_RETAIN_MONTHS}
+
+
+# --- Periods ---
+def period_start(day, period):
+    return datetime.date(day.year, 1, 1) if period == 'year' else datetime.date(day.year, day.month, 1)
+
+def shift_period(start, period, n=1):
+    if period == 'year':
+        return datetime.date(start.year + n, 1, 1)
+    months = start.year * 12 + start.month - 1 + n
+    return datetime.date(months // 12, months % 12 + 1, 1)
+
+def partition_name(table, start, period):
+    """pricing_history_y2024, pricing_option_chain_m2024_06."""
+    return f"{table}_y{start:%Y}" if period == 'year' else f"{table}_m{start:%Y_%m}"
+
+def _table_name(table):
+    return table.split('.', 1)[1] if table.startswith(f"{SCHEMA}.") else table
+
+
+# --- Catalog ---
+def table_exists(cur, table):
+    cur.execute("SELECT to_regclass(%s)", (f"{SCHEMA}.{table}",))
+    return cur.fetchone()[0] is not None
+
+def is_partitioned(cur, table):
+    cur.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", (f"{SCHEMA}.{table}",))
+    row = cur.fetchone()
+    return row is not None and row[0] == 'p'
+
+def list_partitions(cur, table):
+    cur.execute("""
+        SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = %s::regclass
+    """, (f"{SCHEMA}.{table}",))
+    return {row[0] for row in cur.fetchall()}
+
+
+# --- Creation ---
+def create_partitions(cur, table, first_day, last_day):
+    """Create the missing partitions of `table` covering first_day..last_day; returns their names."""
+    period = PARTITIONS[table][1]
+    existing = list_partitions(cur, table)
+    created = []
+    start, last = period_start(first_day, period), period_start(last_day, period)
+    while start <= last:
+        name = partition_name(table, start, period)
+        if name not in existing:
+            cur.execute(f"CREATE TABLE IF NOT EXISTS {SCHEMA}.{name} PARTITION OF {SCHEMA}.{table} "
+                        f"FOR VALUES FROM ('{start}') TO ('{shift_period(start, period)}')")
+            created.append(name)
+        start = shift_period(start, period)
+    if created:
+        print(f"🧩 {SCHEMA}.{table}: created partitions {created[0]}..{created[-1]} ({len(created)})")
+    return created
+
+def retention_start(table, today=None, retain=RETAIN):
+    """First day `table` keeps under its retention setting, or None when it keeps everything."""
+    if not retain.get(table):
+        return None
+    period = PARTITIONS[table][1]
+    return shift_period(period_start(today or datetime.date.today(), period), period, -retain[table] + 1)
+
+def partition_column(table):
+    """Partition column of a range-partitioned table, None for other tables."""
+    return PARTITIONS[_table_name(table)][0] if _table_name(table) in PARTITIONS else None
+
+def _retained(table, df, report=False):
+    # (`df` without rows older than the retention, their partition dates); dates are None for rows to keep as is
+    column = partition_column(table)
+    values = next((df[c] for c in df.columns if c.lower() == column), None) if column else None
+    if values is None:
+        return df, None
+    dates = pd.to_datetime(values, errors='coerce')
+    cutoff = retention_start(_table_name(table))
+    if cutoff is not None:
+        expired = dates < pd.Timestamp(cutoff)
+        if expired.any():
+            if report:
+                print(f"⏭️ {SCHEMA}.{_table_name(table)}: skipping {int(expired.sum())} rows "
+                      f"before the retention start {cutoff}")
+            df, dates = df[~expired], dates[~expired]
+    return df, dates.dropna()
+
+def ensure_partitions(cur, table, df):
+    """Create the partitions the rows of `df` fall into and return `df` without rows older than the retention.
+
+    Rows whose partition would already have been detached are dropped (with
+    a message) instead of re-creating it. Other tables are returned as is.
+    Partitions are created in the caller's transaction: loads create them
+    beforehand with prepare_partitions, so this only finds them missing for
+    direct copy_dataframe calls.
+    """
+    df, dates = _retained(table, df, report=True)
+    if dates is not None and not dates.empty:
+        create_partitions(cur, _table_name(table), dates.min().date(), dates.max().date())
+    return df
+
+def prepare_partitions(conn, table, frames):
+    """Create the partitions the rows of `frames` need in a short transaction of their own; returns their names.
+
+    CREATE TABLE ... PARTITION OF holds an ACCESS EXCLUSIVE lock on the
+    parent until commit: inside a load it would block every reader of the
+    table for the whole COPY and upsert, so it is committed before the load.
+    """
+    table = _table_name(table)
+    first = last = None
+    for df in frames:
+        _, dates = _retained(table, df)
+        if dates is not None and not dates.empty:
+            first = dates.min() if first is None else min(first, dates.min())
+            last = dates.max() if last is None else max(last, dates.max())
+    if first is None:
+        return []
+    with conn.cursor() as cur:
+        created = create_partitions(cur, table, first.date(), last.date())
+    conn.commit()
+    return created
+
+def create_partitioned_table(cur, table, ahead=PARTITION_PREMAKE):
+    """Create `table` partitioned by PARTITIONS, converting an existing plain table (its rows are moved)."""
+    column, period = PARTITIONS[table]
+    if is_partitioned(cur, table):
+        return
+    plain = table_exists(cur, table)
+    if plain:
+        # Free the table and primary key names for the partitioned parent
+        old = f"{table}_unpartitioned"
+        cur.execute(f"ALTER TABLE {SCHEMA}.{table} RENAME TO {old}")
+        cur.execute(f"ALTER INDEX IF EXISTS {SCHEMA}.{table}_pkey RENAME TO {old}_pkey")
+    cur.execute(f"CREATE TABLE {SCHEMA}.{table} ({TABLES[table].rstrip()},\n"
+                f"        PRIMARY KEY ({', '.join(KEYS[table])})) PARTITION BY RANGE ({column})")
+    # Partitions from the oldest loaded row (or today) through `ahead` periods past the newest
+    first = last = datetime.date.today()
+    if plain:
+        cur.execute(f"SELECT min({column}), max({column}) FROM {SCHEMA}.{old}")
+        low, high = cur.fetchone()
+        first, last = min(low or first, first), max(high or last, last)
+    create_partitions(cur, table, first, shift_period(period_start(last, period), period, ahead))
+    if plain:
+        cur.execute(f"INSERT INTO {SCHEMA}.{table} SELECT * FROM {SCHEMA}.{old} WHERE {column} IS NOT NULL")
+        print(f"🧩 {SCHEMA}.{table}: moved {cur.rowcount} rows into partitions")
+        cur.execute(f"DROP TABLE {SCHEMA}.{old}")
+
+
+# --- Retention ---
+def archive_partition(cur, name, archive_dir=PARTITION_ARCHIVE_DIR):
+    """Export a detached partition to <archive_dir>/<name>.csv.gz and drop it."""
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"{name}.csv.gz")
+    with gzip.open(path, 'wb') as f:
+        cur.copy_expert(f"COPY {SCHEMA}.{name} TO STDOUT WITH (FORMAT csv, HEADER)", f)
+    cur.execute(f"DROP TABLE {SCHEMA}.{name}")
+    print(f"📦 Archived {SCHEMA}.{name} to {path}")
+
+def detach_partitions(cur, table, before, archive=PARTITION_ARCHIVE):
+    """Detach the partitions of `table` that end on or before `before`; archive (export + drop) them if asked."""
+    period = PARTITIONS[table][1]
+    detached = []
+    for name in sorted(list_partitions(cur, table)):
+        try:
+            start = datetime.datetime.strptime(name[len(table) + 2:], '%Y' if period == 'year' else '%Y_%m').date()
+        except ValueError:
+            continue  # Not one of ours
+        if shift_period(start, period) > before:
+            continue
+        cur.execute(f"ALTER TABLE {SCHEMA}.{table} DETACH PARTITION {SCHEMA}.{name}")
+        detached.append(name)
+        if archive:
+            archive_partition(cur, name)
+    if detached:
+        print(f"✂️ {SCHEMA}.{table}: detached {len(detached)} partitions ending by {before}")
+    return detached
+
+def maintain_partitions(conn, ahead=PARTITION_PREMAKE, retain=RETAIN, archive=PARTITION_ARCHIVE):
+    """Pre-create `ahead` periods past today for every partitioned table and detach those older than `retain`."""
+    today = datetime.date.today()
+    with conn.cursor() as cur:
+        for table, (_, period) in PARTITIONS.items():
+            if not is_partitioned(cur, table):
+                print(f"⚠️ {SCHEMA}.{table} is not partitioned yet, run the setup step")
+                continue
+            current = period_start(today, period)
+            create_partitions(cur, table, current, shift_period(current, period, ahead))
+            cutoff = retention_start(table, today, retain)
+            if cutoff is not None:
+                detach_partitions(cur, table, cutoff, archive)
+    conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-create upcoming partitions and detach/archive old ones.")
+    parser.add_argument('--ahead', type=int, default=PARTITION_PREMAKE, help="periods to create ahead of today")
+    parser.add_argument('--retain-years', type=int, default=HISTORY_RETAIN_YEARS,
+                        help="yearly pricing_history partitions to keep (0 = all)")
+    parser.add_argument('--retain-months', type=int, default=OPTION_CHAIN_RETAIN_MONTHS,
+                        help="monthly pricing_option_chain partitions to keep (0 = all)")
+    parser.add_argument('--archive', action='store_true', default=PARTITION_ARCHIVE,
+                        help=f"export detached partitions to {PARTITION_ARCHIVE_DIR} and drop them")
+    args = parser.parse_args()
+
+    retain = {'pricing_history': args.retain_years, 'pricing_option_chain': args.retain_months}
+    conn = psycopg2.connect(**DB_PARAMS)
+    try:
+        maintain_partitions(conn, args.ahead, retain, args.archive)
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    main()
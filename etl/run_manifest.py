@@ -0,0 +1,93 @@
+import csv
+import glob
+import os
+import threading
+from datetime import datetime
+from utils import MANIFEST_DIR, ETL_RUN_ID, ETL_RESUME
+from etl.shard_context import shard_suffix
+
+FIELDS = ['ticker', 'module', 'status', 'rows', 'bytes', 'timestamp']
+FUNDAMENTALS_MANIFEST_STEP = 'fundamentals'   # Shared by _1_fundamentals, _2_valuations and _3_officers
+HISTORY_MANIFEST_STEP = 'history'         # _1_history extraction, read by load_pricing for rebuilds
+DONE_STATUSES = {'ok', 'empty', 'rebuilt'}  # 'empty' = API had nothing for this ticker, nothing to retry;
+                                          # 'rebuilt' = full history refetched for a queued rebuild
+
+_resume = ETL_RESUME
+
+
+def set_resume(enabled=True):
+    global _resume
+    _resume = enabled
+
+def resume_enabled():
+    return _resume
+
+
+class RunManifest:
+    """Append-only CSV of per-ticker extraction outcomes for one step of one run.
+
+    Lives at output/manifests/<run_id>/<step>.csv. The last row recorded for a
+    (ticker, module) pair wins, so a resumed run simply appends new outcomes.
+    Shard processes write <step>.shard<N>.csv; reads merge all of a step's files.
+    """
+
+    def __init__(self, step, run_id=ETL_RUN_ID):
+        self.step = step
+        self.run_dir = os.path.join(MANIFEST_DIR, str(run_id))
+        self.path = os.path.join(self.run_dir, f"{step}{shard_suffix('.')}.csv")
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+    def record(self, ticker, module, status, rows=0, path=None):
+        size = os.path.getsize(path) if path and os.path.exists(path) else 0
+        row = [ticker, module, status, int(rows), size, datetime.now().isoformat(timespec='seconds')]
+        with self._lock:
+            is_new = not os.path.exists(self.path)
+            with open(self.path, 'a', newline='') as f:
+                writer = csv.writer(f)
+                if is_new:
+                    writer.writerow(FIELDS)
+                writer.writerow(row)
+
+    def latest(self):
+        """{(ticker, module): status} from the last row per pair."""
+        paths = [os.path.join(self.run_dir, f"{self.step}.csv")]
+        paths += sorted(glob.glob(os.path.join(self.run_dir, f"{self.step}.shard*.csv")))
+        latest = {}
+        with self._lock:
+            for path in paths:
+                if not os.path.exists(path):
+                    continue
+                with open(path, newline='') as f:
+                    latest.update({(row['ticker'], row['module']): row['status'] for row in csv.DictReader(f)})
+        return latest
+
+    def with_status(self, module, status):
+        """Tickers whose last outcome for `module` is `status`."""
+        return {ticker for (ticker, m), s in self.latest().items() if m == module and s == status}
+
+    def completed(self, modules):
+        """Tickers whose every module in `modules` finished with a done status."""
+        latest = self.latest()
+        tickers = {ticker for ticker, _ in latest}
+        return {t for t in tickers if all(latest.get((t, m)) in DONE_STATUSES for m in modules)}
+
+    def pending(self, tickers, modules):
+        """Tickers still to extract: everything normally, only failed/missing ones on --resume."""
+        if not _resume:
+            return list(tickers)
+        done = self.completed(modules)
+        remaining = [t for t in tickers if t not in done]
+        print(f"⏯️ Resuming {self.step}: {len(done & set(tickers))} tickers already done, "
+              f"{len(remaining)} to go ({self.run_dir})")
+        return remaining
+
+
+_manifests = {}
+_manifests_lock = threading.Lock()
+
+def get_manifest(step):
+    with _manifests_lock:
+        if step not in _manifests:
+            _manifests[step] = RunManifest(step)
+        return _manifests[step]
@@ -0,0 +1,320 @@
+import json
+import re
+import warnings
+from functools import partial
+import pandas as pd
+import pyarrow.parquet as pq
+from setup.table_definitions import KEYS, SCHEMA, TABLES
+from etl.merge_engine import read_columns
+from etl.staging import MERGE_CSV_ENGINE, read_frame, read_merge_input
+from utils import LOAD_CHUNK_ROWS
+
+# Low-cardinality TEXT columns (tickers, codes, labels, providers, directions) are read as categoricals
+CATEGORICAL_TEXT = re.compile(
+    r'^(ticker|symbol|sector|optiontype|currencycode|periodtype|provider)$'
+    r'|(_direction|_desc|_provider|_color|_discount|_relative|_rating|currency|_exchange|exchangename'
+    r'|_marketstate|source|_quotetype|_country|_state|_sector|_sectordisp|_sectorkey|_industry'
+    r'|_industrydisp|_industrykey|_category|_fundfamily|_legaltype|_algorithm|_lastmarket'
+    r'|recommendationkey|_type)$'
+)
+MISMATCH_SAMPLES = 3                      # Offending values shown per column in mismatch warnings
+JSON_START = re.compile(r'\s*([\[{"\d-]|true\b|false\b|null\b)')
+PYTHON_REPR = re.compile(r"[\[{,:]\s*'|\bNone\b|\bTrue\b|\bFalse\b")   # Marks of str(list/dict), not JSON
+UTC_OFFSET = re.compile(r'[T ]\d\d:\d\d.*([+-])(\d\d):?(\d\d)$')        # Timestamp ending in +hh:mm / -hhmm
+
+_KINDS = [
+    ('int', ('SMALLINT', 'INTEGER', 'INT', 'BIGINT')),
+    ('float', ('NUMERIC', 'DECIMAL', 'FLOAT', 'REAL', 'DOUBLE PRECISION')),
+    ('bool', ('BOOLEAN',)),
+    ('date', ('DATE', 'TIMESTAMP')),
+    ('json', ('JSON', 'JSONB')),
+]
+
+
+def sql_kind(sql_type):
+    """'int', 'float', 'bool', 'date', 'json' or 'text' for a column's SQL type."""
+    base = sql_type.upper().split('(')[0].strip()
+    for kind, prefixes in _KINDS:
+        if any(base == p or base.startswith(f"{p} ") for p in prefixes):
+            return kind
+    return 'text'
+
+def parse_columns(definition):
+    """{lowercase column: SQL type} from a table's column definitions."""
+    columns = {}
+    for line in definition.split('\n'):
+        line = line.strip().rstrip(',')
+        if not line or line.startswith('--'):
+            continue
+        name, sql_type = line.split(None, 1)
+        columns[name.lower()] = sql_type
+    return columns
+
+_registry = {name: parse_columns(definition) for name, definition in TABLES.items()}
+
+def _table_name(table):
+    return table.split('.', 1)[1] if table.startswith(f"{SCHEMA}.") else table
+
+def table_columns(table):
+    """{lowercase column: SQL type} for 'pricing_history' or 'yahooquery.pricing_history'."""
+    return _registry[_table_name(table)]
+
+def table_key(table):
+    """Natural key columns of a table (its primary key), or () for tables outside the registry."""
+    return KEYS.get(_table_name(table), ())
+
+def normalize_column(name):
+    # How the loaders map a file column to its table column (Postgres folds unquoted names to lowercase)
+    return name.lower().replace('.', '_')
+
+
+def read_options(table, columns, rename=None):
+    """Reader options for a file with `columns` that is loaded into `table`.
+
+    `rename(column)` maps a file column to its table column when that is more
+    than lowercasing. Returns {'usecols', 'dtype', 'parse_dates', 'kinds',
+    'ignored'}: columns the table does not have are left out (and listed in
+    'ignored'); TEXT columns are read as str, or as categoricals when
+    low-cardinality; numbers as float64 (integers are checked and narrowed
+    after the read); DATE/TIMESTAMP columns are parsed.
+    """
+    rename = rename or normalize_column
+    schema = table_columns(table)
+    usecols, dtype, parse_dates, kinds, ignored = [], {}, [], {}, []
+    for column in columns:
+        target = rename(column).lower()
+        if target not in schema:
+            ignored.append(column)
+            continue
+        kind = sql_kind(schema[target])
+        usecols.append(column)
+        kinds[column] = kind
+        if kind == 'date':
+            parse_dates.append(column)
+        elif kind in ('int', 'float'):
+            dtype[column] = 'float64'
+        elif kind == 'bool':
+            dtype[column] = 'boolean'
+        else:
+            dtype[column] = 'category' if kind == 'text' and CATEGORICAL_TEXT.search(target) else 'str'
+    return {'usecols': usecols, 'dtype': dtype, 'parse_dates': parse_dates, 'kinds': kinds, 'ignored': ignored}
+
+
+# --- Post-read checks: values that do not fit the declared type are reported before the insert ---
+def _report(table, column, kind, bad):
+    samples = bad.drop_duplicates().head(MISMATCH_SAMPLES).tolist()
+    print(f"⚠️ {table}.{column}: {len(bad)} values are not {kind.upper()}, loading them as NULL (e.g. {samples})")
+
+def _local_times(values, **kwargs):
+    # Timestamps with differing UTC offsets parse only to UTC; adding each offset back gives
+    # the local (exchange) wall-clock time, naive like the values without an offset
+    parsed = pd.to_datetime(values, errors='coerce', utc=True, **kwargs).dt.tz_localize(None)
+    offset = values.astype(str).str.extract(UTC_OFFSET)
+    minutes = offset[1].astype(float) * 60 + offset[2].astype(float)
+    minutes = minutes.where(offset[0] == '+', -minutes).fillna(0)
+    return parsed + pd.to_timedelta(minutes, unit='min')
+
+def _to_dates(values, dayfirst):
+    if pd.api.types.is_numeric_dtype(values):
+        # Yahoo epoch fields: seconds, or milliseconds for the larger values
+        unit = 'ms' if values.abs().max() > 1e11 else 's'
+        return pd.to_datetime(values, unit=unit, errors='coerce')
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', UserWarning)
+        # One format inferred for the whole column (fast); values in another format are parsed one by one
+        try:
+            converted = pd.to_datetime(values, errors='coerce', dayfirst=dayfirst)
+        except ValueError:
+            converted = _local_times(values, dayfirst=dayfirst)    # Mixed UTC offsets (a DST change)
+        if isinstance(converted.dtype, pd.DatetimeTZDtype):
+            converted = converted.dt.tz_localize(None)             # One offset: keep the local time
+        retry = values.notna() & converted.isna()
+        if retry.any():
+            converted[retry] = _local_times(values[retry], dayfirst=dayfirst, format='mixed')
+    return converted
+
+def _is_json(text):
+    try:
+        json.loads(text)
+        return True
+    except ValueError:
+        return False
+
+def _json_text(values, present):
+    # Staged JSON is passed through as text; only values that look like Python reprs
+    # (or not like JSON at all) are parsed to check them
+    text = values if pd.api.types.is_string_dtype(values) else values.astype(str).where(present)
+    text = _without_empty(text)
+    filled = text.fillna('')
+    suspect = text.notna() & (~filled.str.match(JSON_START) | filled.str.contains(PYTHON_REPR))
+    if not suspect.any():
+        return text, values.iloc[:0]
+    bad = suspect.copy()
+    bad[suspect] = ~text[suspect].map(_is_json).astype(bool)
+    return text.mask(bad), values[bad]
+
+def _conform_column(values, kind, categorical, dayfirst):
+    """(converted column, values that did not convert)."""
+    present = values.notna()
+    if kind in ('int', 'float'):
+        converted = values if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values) \
+            else pd.to_numeric(values, errors='coerce')
+        bad = values[present & converted.isna()]
+        if kind == 'int':
+            fractional = converted.notna() & (converted % 1 != 0)
+            bad = pd.concat([bad, values[fractional]])
+            converted = converted.where(~fractional).astype('Int64')
+        elif not pd.api.types.is_float_dtype(converted):
+            converted = converted.astype('float64')
+        return converted, bad
+    if kind == 'bool':
+        if pd.api.types.is_bool_dtype(values):
+            return values.astype('boolean'), values.iloc[:0]
+        mapped = values.astype(str).str.strip().str.lower().map(
+            {'true': True, 'false': False, '1': True, '0': False, '1.0': True, '0.0': False})
+        return mapped.where(present).astype('boolean'), values[present & mapped.isna()]
+    if kind == 'date':
+        if isinstance(values.dtype, pd.DatetimeTZDtype):
+            return values.dt.tz_localize(None), values.iloc[:0]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return values, values.iloc[:0]
+        converted = _to_dates(values, dayfirst)
+        return converted, values[present & converted.isna()]
+    if kind == 'json':
+        return _json_text(values, present)
+    if isinstance(values.dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(values):
+        converted = values
+    else:
+        converted = values.astype(str).where(present)
+    if categorical and not isinstance(converted.dtype, pd.CategoricalDtype):
+        converted = converted.astype('category')
+    return _without_empty(converted), values.iloc[:0]
+
+def _without_empty(values):
+    # Empty text is NULL, as read_csv already makes empty CSV fields (Parquet keeps them as '')
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.remove_categories(['']) if '' in values.cat.categories else values
+    empty = values.eq('').fillna(False).astype(bool)
+    return values.mask(empty) if empty.any() else values
+
+def conform(df, table, kinds, rename=None, dayfirst=()):
+    """Convert the columns of `df` to their declared kinds in place, reporting values that do not fit.
+
+    Every conversion works on whole columns: numbers become float64/Int64,
+    booleans the nullable 'boolean' dtype, dates datetime64, and empty text
+    NULL, so the COPY encoder (etl/bulk_load.py) needs no per-cell cleanup.
+    JSON columns are staged as JSON text and passed through; values that are
+    not JSON (e.g. a Python repr) are reported and loaded as NULL.
+    `dayfirst` lists the date columns written as dd/mm/yyyy.
+    """
+    rename = rename or normalize_column
+    for column, kind in kinds.items():
+        if column not in df.columns:
+            continue
+        categorical = kind == 'text' and bool(CATEGORICAL_TEXT.search(rename(column).lower()))
+        converted, bad = _conform_column(df[column], kind, categorical, column in dayfirst)
+        if len(bad):
+            _report(table, column, kind, bad)
+        df[column] = converted
+    return df
+
+
+# --- Column coercions for loader transforms (whole columns, no object round trip) ---
+def epoch_text(values, unit='ms'):
+    """'YYYY-MM-DD HH:MM:SS' for epoch numbers kept in a TEXT column; anything else becomes NULL."""
+    stamps = pd.to_datetime(pd.to_numeric(values, errors='coerce'), unit=unit, errors='coerce')
+    return stamps.dt.strftime('%Y-%m-%d %H:%M:%S')
+
+def fill_blank(values, value):
+    """`values` with NULL and whitespace-only text replaced by `value`."""
+    if isinstance(values.dtype, pd.CategoricalDtype) and value not in values.cat.categories:
+        values = values.cat.add_categories([value])
+    blank = values.isna() | values.astype(str).str.strip().eq('')
+    return values.mask(blank, value) if blank.any() else values
+
+
+def read_typed(path, table, rename=None, dayfirst=()):
+    """Read a merged file for `table` with the dtypes, dates and columns its definition declares.
+
+    Columns the table does not have are dropped (with a warning), and values
+    that do not fit their column's type are reported and become NULL, so a
+    bad value shows up here instead of failing the whole INSERT. `dayfirst`
+    lists the date columns written as dd/mm/yyyy.
+    """
+    path = str(path)
+    options = read_options(table, read_columns(path), rename)
+    if options['ignored']:
+        print(f"⚠️ {table}: ignoring columns not in the table: {options['ignored']}")
+    csv_kwargs = {} if path.endswith('.parquet') else {'dtype': options['dtype']}
+    try:
+        parse_dates = [column for column in options['parse_dates'] if column not in dayfirst]
+        df = read_frame(path, parse_dates=parse_dates, usecols=options['usecols'], **csv_kwargs)
+    except (ValueError, TypeError) as e:
+        # A value the declared dtype cannot hold: re-read untyped and let conform() point at it
+        print(f"⚠️ {table}: typed read failed ({e}), checking values column by column")
+        df = read_frame(path, usecols=options['usecols'])
+    return conform(df, table, options['kinds'], rename, dayfirst)
+
+def _parquet_chunks(path, columns, chunk_rows, start):
+    parquet = pq.ParquetFile(path)
+    # Skip whole row groups before `start`, then slice into the first one that is kept
+    first, skip = 0, start
+    while first < parquet.num_row_groups and skip >= parquet.metadata.row_group(first).num_rows:
+        skip -= parquet.metadata.row_group(first).num_rows
+        first += 1
+    if first == parquet.num_row_groups:
+        return
+    # One row group per iter_batches call: iterating all of them at once pre-buffers the whole file
+    for group in range(first, parquet.num_row_groups):
+        for batch in parquet.iter_batches(batch_size=chunk_rows, columns=columns, row_groups=[group]):
+            if skip >= batch.num_rows:
+                skip -= batch.num_rows
+                continue
+            yield batch.slice(skip).to_pandas()
+            skip = 0
+
+def iter_typed(path, table, rename=None, dayfirst=(), chunk_rows=LOAD_CHUNK_ROWS, start=0, columns=None):
+    """read_typed() in chunks of at most `chunk_rows` rows, starting at row `start`.
+
+    Memory is bounded by the chunk (and, for Parquet, row group) size, not
+    the file. `columns` restricts the read to some of the table's columns.
+    CSV chunks only pin TEXT columns to str, so a value that does not fit
+    its type is reported by conform() instead of aborting the stream.
+    """
+    path = str(path)
+    options = read_options(table, read_columns(path), rename)
+    if options['ignored'] and columns is None and not start:
+        print(f"⚠️ {table}: ignoring columns not in the table: {options['ignored']}")
+    usecols = [column for column in options['usecols'] if columns is None or column in columns]
+    kinds = {column: options['kinds'][column] for column in usecols}
+    if path.endswith('.parquet'):
+        chunks = _parquet_chunks(path, usecols, chunk_rows, start)
+    else:
+        dtype = {column: 'str' for column, kind in kinds.items() if kind == 'text'}
+        chunks = pd.read_csv(path, usecols=usecols, dtype=dtype, chunksize=chunk_rows,
+                             skiprows=range(1, start + 1))
+    for df in chunks:
+        yield conform(df, table, kinds, rename, dayfirst)
+
+
+# --- Typed merge inputs (CSV staging only; Parquet already stores its types) ---
+def _read_typed_input(table, rename, path):
+    path = str(path)
+    if path.endswith('.parquet'):
+        return read_merge_input(path)
+    options = read_options(table, read_columns(path), rename)
+    # Keep every column (the merged file is not trimmed to the table) and leave dates as text
+    dtype = {column: ('str' if t == 'category' else t) for column, t in options['dtype'].items()}
+    try:
+        return read_frame(path, dtype=dtype, engine=MERGE_CSV_ENGINE)
+    except (ValueError, TypeError):
+        return read_merge_input(path)
+
+def mapped_column(rename_map, name):
+    """rename() for files whose normalized columns are renamed further, e.g. partial(mapped_column, rename_map)."""
+    column = normalize_column(name)
+    return rename_map.get(column, column)
+
+def merge_reader(table, rename=None):
+    """read_merge_input replacement that applies `table`'s column types to CSV inputs."""
+    return partial(_read_typed_input, table, rename)
@@ -0,0 +1,24 @@
+import pandas as pd
+
+# Set inside a shard worker process by etl.shard_runner; None in a normal (unsharded) run
+_shard = None
+_shard_tickers = None
+
+
+def set_shard(index, tickers):
+    global _shard, _shard_tickers
+    _shard = index
+    _shard_tickers = list(tickers)
+
+def current_shard():
+    return _shard
+
+def shard_suffix(sep='_'):
+    """'' in an unsharded run, e.g. '_shard2' inside shard 2 (keeps per-shard files apart)."""
+    return '' if _shard is None else f"{sep}shard{_shard}"
+
+def load_tickers(csv_path):
+    """Ticker universe for an extract step: the whole Tickers.csv, or only this process's shard."""
+    if _shard_tickers is not None:
+        return list(_shard_tickers)
+    return pd.read_csv(csv_path)['Symbol'].dropna().unique().tolist()
@@ -0,0 +1,116 @@
+import os
+import sys
+
+# Add project root to sys.path for imports
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import argparse
+import importlib
+import multiprocessing as mp
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing.managers import BaseManager
+from utils import TICKERS_CSV, ETL_SHARDS
+from etl.fetch_engine import AdaptiveRateController, chunk, set_rate_controller
+from etl.run_manifest import resume_enabled, set_resume
+from etl.shard_context import load_tickers, set_shard
+
+# Extract steps that can be sharded, by short name
+EXTRACT_STEPS = {
+    'history': 'etl._1_pricing._1_history',
+    'option_chain': 'etl._1_pricing._2_option_chain',
+    'financial_statements': 'etl._2_financial_statements._1_financial_statements',
+    'fundamentals': 'etl._3_fundamentals._1_fundamentals',
+    'technical_insights': 'etl._4_technicals._1_technical_insights',
+}
+
+_shards = ETL_SHARDS
+
+
+def set_shards(n_shards):
+    global _shards
+    _shards = max(1, int(n_shards))
+
+def shards_enabled():
+    return _shards > 1
+
+
+class RateManager(BaseManager):
+    """Hosts one AdaptiveRateController that every shard process calls through a proxy."""
+
+RateManager.register('AdaptiveRateController', AdaptiveRateController,
+                     exposed=('acquire', 'on_success', 'on_throttle', '__repr__'))
+
+
+def split_shards(tickers, n_shards):
+    # Contiguous slices keep each shard's batches in Tickers.csv order
+    size = max(1, -(-len(tickers) // max(1, n_shards)))
+    return chunk(tickers, size)
+
+def _run_shard(module_name, index, tickers, controller, resume):
+    # Runs in a fresh spawned process: scope it to its shard before the step loads tickers
+    set_shard(index, tickers)
+    set_rate_controller(controller)
+    set_resume(resume)
+    print(f"🧩 Shard {index}: {len(tickers)} tickers → {module_name}")
+    importlib.import_module(module_name).main()
+    return len(tickers)
+
+def run_sharded(step, n_shards=None, tickers=None):
+    """Run an extract step's main() over K ticker shards in a process pool.
+
+    Every shard writes to the step's usual output directories and shares one
+    global rate budget through the manager-hosted controller. Returns the
+    indices of the shards that failed.
+    """
+    module_name = EXTRACT_STEPS.get(step, step)
+    tickers = load_tickers(TICKERS_CSV) if tickers is None else list(tickers)
+    shards = split_shards(tickers, n_shards or _shards)
+    print(f"🧩 Running {module_name} over {len(tickers)} tickers in {len(shards)} shards")
+
+    start = time.time()
+    failed = []
+    ctx = mp.get_context('spawn')
+    with RateManager(ctx=ctx) as manager:
+        controller = manager.AdaptiveRateController()
+        with ProcessPoolExecutor(max_workers=len(shards) or 1, mp_context=ctx) as pool:
+            futures = {
+                pool.submit(_run_shard, module_name, index, shard, controller, resume_enabled()): index
+                for index, shard in enumerate(shards, 1)
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    future.result()
+                    print(f"✅ Shard {index}/{len(shards)} done")
+                except Exception as e:
+                    print(f"❌ Shard {index}/{len(shards)} failed: {e}")
+                    failed.append(index)
+        print(f"🚦 Shared rate controller: {controller}")
+
+    print(f"⏱️ {module_name} finished in {time.time() - start:.1f}s across {len(shards)} shards")
+    return sorted(failed)
+
+def sharded(module):
+    """Orchestrator hook: run `module.main` in-process, or across shards when sharding is on."""
+    def run():
+        if not shards_enabled():
+            return module.main()
+        failed = run_sharded(module.__name__)
+        if failed:
+            raise RuntimeError(f"shards {failed} failed (rerun with --resume to retry them)")
+    return run
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run one extract step across ticker shards")
+    parser.add_argument('step', help=f"one of {sorted(EXTRACT_STEPS)} or a module path")
+    parser.add_argument('--shards', type=int, default=max(2, ETL_SHARDS), help="number of shard processes")
+    parser.add_argument('--resume', action='store_true',
+                        help="skip tickers already extracted in this run, retry failed/missing ones")
+    args = parser.parse_args()
+    if args.resume:
+        set_resume(True)
+    sys.exit(1 if run_sharded(args.step, args.shards) else 0)
@@ -0,0 +1,113 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from glob import glob
+from itertools import islice
+import pandas as pd
+from utils import STAGING_EXT, ETL_RUN_ID, MERGE_WORKERS, MERGE_EXECUTOR
+
+PARQUET_COMPRESSION = 'zstd'
+PARTITION = f"date={ETL_RUN_ID}"          # Run date partition (ETL_RUN_ID defaults to today)
+MERGE_CSV_ENGINE = 'pyarrow'              # Multi-threaded CSV parser for merge reads (Parquet reads are already threaded)
+
+
+def partition_dir(segment_dir):
+    return os.path.join(str(segment_dir), PARTITION)
+
+def staging_path(segment_dir, name):
+    """<segment dir>/date=<run>/<name>.<ext> for one ticker (or batch) of an extract step."""
+    return os.path.join(partition_dir(segment_dir), f"{name}{STAGING_EXT}")
+
+def list_frames(segment_dir, pattern='*'):
+    """Staged files of this run for a segment, in a stable order."""
+    return sorted(glob(os.path.join(partition_dir(segment_dir), f"{pattern}{STAGING_EXT}")))
+
+def merged_path(merged_dir, name):
+    return os.path.join(str(merged_dir), f"{name}{STAGING_EXT}")
+
+
+def arrow_safe(df):
+    # Nested (list/dict) or mixed-type object columns are stored as text, exactly as CSV would
+    for col in df.columns[df.dtypes == object]:
+        values = df[col].dropna()
+        types = set(map(type, values))
+        if len(types) > 1 or types & {list, dict, tuple}:
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+def write_frame(df, path):
+    """Write a staged/merged DataFrame in the format given by its extension."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if path.endswith('.parquet'):
+        arrow_safe(df.copy()).to_parquet(path, index=False, compression=PARQUET_COMPRESSION)
+    else:
+        df.to_csv(path, index=False)
+    return path
+
+def read_frame(path, parse_dates=None, usecols=None, **csv_kwargs):
+    """Read a staged/merged file.
+
+    Parquet keeps its stored dtypes (CSV-only options such as `dtype` or
+    `low_memory` are ignored); CSV goes through read_csv as before.
+    """
+    path = str(path)
+    if not path.endswith('.parquet'):
+        return pd.read_csv(path, parse_dates=parse_dates, usecols=usecols, **csv_kwargs)
+    df = pd.read_parquet(path, columns=usecols)
+    for col in parse_dates or []:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            try:
+                df[col] = pd.to_datetime(df[col])
+            except (ValueError, TypeError):
+                pass  # Leave unparseable columns as they are, like read_csv does
+    return df
+
+
+# --- Parallel, ordered file ingestion for merges ---
+def parallel_map(func, items, on_error=None, workers=MERGE_WORKERS, executor=MERGE_EXECUTOR):
+    """Yield (item, func(item)) in input order, running up to `workers` calls at once.
+
+    Results are prefetched at most 2 x `workers` ahead so memory stays bounded.
+    A failing item is passed to `on_error(item, exception)` and skipped; with no
+    `on_error` the exception is raised. `executor` is 'thread' or 'process'
+    (process pools need a picklable top-level `func`).
+    """
+    items = list(items)
+    if workers <= 1 or len(items) <= 1:
+        for item in items:
+            try:
+                result = func(item)
+            except Exception as e:
+                if on_error is None:
+                    raise
+                on_error(item, e)
+                continue
+            yield item, result
+        return
+
+    pool_cls = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+    with pool_cls(max_workers=workers) as pool:
+        queue = iter(items)
+        pending = deque((item, pool.submit(func, item)) for item in islice(queue, 2 * workers))
+        while pending:
+            item, future = pending.popleft()
+            for next_item in islice(queue, 1):
+                pending.append((next_item, pool.submit(func, next_item)))
+            try:
+                result = future.result()
+            except Exception as e:
+                if on_error is None:
+                    raise
+                on_error(item, e)
+                continue
+            yield item, result
+
+def read_merge_input(path):
+    """read_frame for merge inputs, with the multi-threaded CSV parser when pyarrow is installed."""
+    if str(path).endswith('.parquet'):
+        return read_frame(path)
+    return read_frame(path, engine=MERGE_CSV_ENGINE)
+
+def read_frames(paths, on_error=None, workers=MERGE_WORKERS, executor=MERGE_EXECUTOR):
+    """Read staged files in parallel; frames come back in the order of `paths`."""
+    return [df for _, df in parallel_map(read_merge_input, paths, on_error, workers, executor)]
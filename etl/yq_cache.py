@@ -0,0 +1,254 @@
+import hashlib
+import os
+import pickle
+import threading
+import time
+from datetime import date, timedelta
+from utils import YQ_CACHE_DIR, YQ_CACHE_ENABLED, YQ_CACHE_MAX_MB, YQ_SOURCE
+from etl.fetch_engine import get_rate_controller, is_throttle_error
+from etl.yq_source import PROPERTY_MODULES, get_source, split_by_symbol, combine_parts
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# TTL per yahooquery module (property or method name), in seconds
+MODULE_TTLS = {
+    # Pricing: intraday
+    'history': 6 * HOUR,
+    'option_chain': 1 * HOUR,
+    # Fundamentals / technicals: daily
+    'get_modules': DAY,
+    'summary_detail': DAY,
+    'key_stats': DAY,
+    'financial_data': DAY,
+    'price': DAY,
+    'asset_profile': DAY,
+    'valuation_measures': DAY,
+    'company_officers': DAY,
+    'technical_insights': DAY,
+    # Financial statements: weekly
+    'get_financial_data': 7 * DAY,
+    'all_financial_data': 7 * DAY,
+    'balance_sheet': 7 * DAY,
+    'income_statement': 7 * DAY,
+    'cash_flow': 7 * DAY,
+}
+CACHED_PROPERTIES = PROPERTY_MODULES
+EVICT_EVERY = 50                          # Size check after this many writes
+
+
+def trading_date(today=None):
+    # Weekend runs share Friday's key
+    today = today or date.today()
+    return today - timedelta(days=max(0, today.weekday() - 4))
+
+
+class CacheStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {'hits': 0, 'misses': 0, 'expired': 0, 'stores': 0, 'evictions': 0}
+
+    def incr(self, name, n=1):
+        with self._lock:
+            self.counts[name] += n
+
+    def __repr__(self):
+        total = self.counts['hits'] + self.counts['misses']
+        ratio = self.counts['hits'] / total if total else 0.0
+        return ", ".join(f"{k}={v}" for k, v in self.counts.items()) + f", hit_ratio={ratio:.1%}"
+
+
+class ResponseCache:
+    """Pickle-per-entry disk cache with per-module TTLs and size-bounded LRU eviction.
+
+    Entry recency is tracked through file mtimes (touched on every hit), so the
+    least recently used entries are evicted first once the directory grows past
+    `max_bytes`.
+    """
+
+    def __init__(self, cache_dir=YQ_CACHE_DIR, max_bytes=YQ_CACHE_MAX_MB * 1024 * 1024):
+        self.cache_dir = str(cache_dir)
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._writes = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def key(self, module, ticker, params):
+        # Statements (TTL > 1 day) are not bucketed by trading date so the weekly TTL applies
+        day = trading_date().isoformat() if MODULE_TTLS.get(module, DAY) <= DAY else ''
+        raw = repr((module, ticker, params, day))
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.pkl")
+
+    def get(self, module, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                created_at, value = pickle.load(f)
+        except Exception:
+            # Missing, truncated or unreadable entry: refetch it
+            self.stats.incr('misses')
+            return None
+        if time.time() - created_at > MODULE_TTLS.get(module, DAY):
+            self.stats.incr('expired')
+            self.stats.incr('misses')
+            return None
+        os.utime(path)  # LRU recency
+        self.stats.incr('hits')
+        return value
+
+    def put(self, key, value):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((time.time(), value), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self.stats.incr('stores')
+        with self._lock:
+            self._writes += 1
+            check = self._writes % EVICT_EVERY == 0
+        if check:
+            self.evict()
+
+    def evict(self):
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith('.pkl'):
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            self.stats.incr('evictions')
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
+
+def cache_stats():
+    return get_cache().stats if _cache is not None else CacheStats()
+
+def _error_text(result):
+    # Error messages of a response: the whole of a string, the per-symbol strings of a dict
+    if isinstance(result, str):
+        return result
+    if isinstance(result, dict):
+        return ' '.join(value for value in result.values() if isinstance(value, str))
+    return ''
+
+
+class CachedTicker:
+    """Drop-in for `yahooquery.Ticker` that serves module results from the on-disk cache.
+
+    Results are cached per (module, ticker, parameters, trading date); only the
+    symbols missing from the cache are requested live, and the live `Ticker`
+    is built lazily so a full cache hit makes no HTTP call at all. Live
+    requests are paced by the shared adaptive rate controller and go to the
+    data source selected by YQ_SOURCE; the cache is only used against the
+    live source, so recordings and replays always see every request.
+    """
+
+    def __init__(self, symbols, **kwargs):
+        self.symbols = list(symbols) if isinstance(symbols, (list, tuple)) else [symbols]
+        self._kwargs = kwargs
+        self._live = None
+
+    def _live_ticker(self, symbols=None):
+        if symbols is not None and symbols != self.symbols:
+            return get_source().ticker(symbols, **self._kwargs)
+        if self._live is None:
+            self._live = get_source().ticker(self.symbols, **self._kwargs)
+        return self._live
+
+    def _call_live(self, module, symbols, args, kwargs, is_property):
+        """Request `module` for `symbols` under the shared adaptive rate controller.
+
+        Returns (result, {symbol: part}). A 429, raised or in an error payload,
+        counts as throttling; only a response with usable symbols counts as a
+        success. Empty and other error responses report neither: a throttled
+        history() comes back as an empty DataFrame.
+        """
+        controller = get_rate_controller()
+        controller.acquire(len(symbols))
+        try:
+            attr = getattr(self._live_ticker(symbols), module)
+            result = attr if is_property else attr(*args, **kwargs)
+        except Exception as e:
+            if is_throttle_error(e):
+                controller.on_throttle()
+            raise
+        parts = split_by_symbol(module, result, symbols)
+        errors = _error_text(result)
+        if errors and is_throttle_error(errors):
+            controller.on_throttle()
+        elif parts:
+            controller.on_success()
+        return result, parts
+
+    def _fetch(self, module, args=(), kwargs=None, is_property=False):
+        kwargs = kwargs or {}
+        if not YQ_CACHE_ENABLED or YQ_SOURCE != 'live':
+            result, _ = self._call_live(module, self.symbols, args, kwargs, is_property)
+            return result
+
+        cache = get_cache()
+        params = (args, tuple(sorted(kwargs.items())))
+        keys = {symbol: cache.key(module, symbol, params) for symbol in self.symbols}
+
+        parts, misses = {}, []
+        for symbol in self.symbols:
+            value = cache.get(module, keys[symbol])
+            if value is None:
+                misses.append(symbol)
+            else:
+                parts[symbol] = value
+
+        live_result = None
+        if misses:
+            live_result, fresh = self._call_live(module, misses, args, kwargs, is_property)
+            for symbol, part in fresh.items():
+                cache.put(keys[symbol], part)
+                parts[symbol] = part
+        if not parts:
+            return live_result
+
+        combined = combine_parts(parts, self.symbols)
+        # Keep per-symbol error messages from the live response visible to callers
+        if isinstance(combined, dict) and isinstance(live_result, dict):
+            for symbol in misses:
+                if symbol in live_result and symbol not in combined:
+                    combined[symbol] = live_result[symbol]
+        return combined
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if name in CACHED_PROPERTIES:
+            return self._fetch(name, is_property=True)
+        if name in MODULE_TTLS:
+            return lambda *args, **kwargs: self._fetch(name, args, kwargs)
+        return getattr(self._live_ticker(), name)
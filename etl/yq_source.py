@@ -0,0 +1,236 @@
+import os
+import sys
+
+# Add project root to sys.path for imports
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import argparse
+import hashlib
+import pickle
+import random
+import threading
+import time
+import zlib
+import pandas as pd
+from yahooquery import Ticker as LiveTicker
+from utils import (TICKERS_CSV, YQ_SOURCE, YQ_RECORD_DIR, YQ_REPLAY_LATENCY_MS,
+                   YQ_REPLAY_ERROR_RATE, YQ_REPLAY_SEED)
+
+# yahooquery modules exposed as properties (everything else used by the ETL is a method)
+PROPERTY_MODULES = {
+    'option_chain', 'summary_detail', 'key_stats', 'financial_data', 'price', 'asset_profile',
+    'valuation_measures', 'company_officers', 'technical_insights',
+}
+# Modules whose only valid shape is a DataFrame; any dict they return is an error payload
+DATAFRAME_MODULES = {
+    'history', 'option_chain', 'valuation_measures', 'company_officers', 'get_financial_data',
+    'all_financial_data', 'balance_sheet', 'income_statement', 'cash_flow',
+}
+
+
+# --- Per-symbol split / reassembly of yahooquery results ---
+def split_by_symbol(module, result, symbols):
+    """Return {symbol: part} for the symbols present in `result`; errors and unknown shapes give {}."""
+    if module in DATAFRAME_MODULES and not isinstance(result, pd.DataFrame):
+        return {}
+    if isinstance(result, pd.DataFrame):
+        if result.empty:
+            return {}
+        level0 = result.index.get_level_values(0)
+        return {symbol: result[level0 == symbol] for symbol in symbols if symbol in set(level0)}
+    if isinstance(result, dict):
+        # Per-symbol strings are error messages, never cache them
+        return {symbol: result[symbol] for symbol in symbols
+                if symbol in result and not isinstance(result[symbol], str)}
+    return {}
+
+def combine_parts(parts, symbols):
+    values = [parts[symbol] for symbol in symbols if symbol in parts]
+    if all(isinstance(v, pd.DataFrame) for v in values):
+        return pd.concat(values, sort=False)
+    return {symbol: parts[symbol] for symbol in symbols if symbol in parts}
+
+def params_key(args, kwargs):
+    raw = repr((tuple(args), tuple(sorted(kwargs.items()))))
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:12]
+
+
+# --- Data sources: what CachedTicker builds its "live" Ticker from ---
+class LiveSource:
+    """Yahoo Finance through yahooquery."""
+
+    def ticker(self, symbols, **kwargs):
+        return LiveTicker(symbols, **kwargs)
+
+
+class RecordingTicker:
+    """yahooquery Ticker that saves every module response it returns."""
+
+    def __init__(self, live, symbols, source):
+        self._live = live
+        self._symbols = symbols
+        self._source = source
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if name in PROPERTY_MODULES:
+            return self._source.save(name, self._symbols, (), {}, getattr(self._live, name))
+        attr = getattr(self._live, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            return self._source.save(name, self._symbols, args, kwargs, attr(*args, **kwargs))
+        return call
+
+
+class RecordingSource(LiveSource):
+    """Live source that also saves every raw per-symbol response for later replay.
+
+    Layout: <record_dir>/<module>/<params key>/<symbol>.pkl. Per-symbol error
+    messages are recorded as well so a replay fails the same symbols.
+    """
+
+    def __init__(self, record_dir=YQ_RECORD_DIR):
+        self.record_dir = str(record_dir)
+
+    def ticker(self, symbols, **kwargs):
+        symbols = list(symbols) if isinstance(symbols, (list, tuple)) else [symbols]
+        return RecordingTicker(LiveTicker(symbols, **kwargs), symbols, self)
+
+    def save(self, module, symbols, args, kwargs, result):
+        parts = split_by_symbol(module, result, symbols)
+        if isinstance(result, dict):
+            parts.update({s: result[s] for s in symbols if isinstance(result.get(s), str)})
+        out_dir = os.path.join(self.record_dir, module, params_key(args, kwargs))
+        os.makedirs(out_dir, exist_ok=True)
+        for symbol, part in parts.items():
+            path = os.path.join(out_dir, f"{symbol}.pkl")
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(part, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        return result
+
+
+class ReplayTicker:
+    """Offline stand-in for a yahooquery Ticker, answered by a ReplaySource."""
+
+    def __init__(self, symbols, source):
+        self._symbols = symbols
+        self._source = source
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if name in PROPERTY_MODULES:
+            return self._source.fetch(name, self._symbols, (), {})
+        return lambda *args, **kwargs: self._source.fetch(name, self._symbols, args, kwargs)
+
+
+class ReplaySource:
+    """Serves recorded responses offline with simulated latency and error rates.
+
+    Symbols that were never recorded borrow a recorded symbol's data
+    (deterministically, renamed to the requested symbol), so a 500-ticker
+    recording can drive a 5,000-ticker run. A call with no recording for its
+    exact parameters falls back to any recording of the same module; a
+    `start` argument trims history rows as the live API would.
+    """
+
+    def __init__(self, record_dir=YQ_RECORD_DIR, latency_ms=YQ_REPLAY_LATENCY_MS,
+                 error_rate=YQ_REPLAY_ERROR_RATE, seed=YQ_REPLAY_SEED):
+        self.record_dir = str(record_dir)
+        self.latency = latency_ms / 1000.0
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._index = {}
+
+    def ticker(self, symbols, **kwargs):
+        symbols = list(symbols) if isinstance(symbols, (list, tuple)) else [symbols]
+        return ReplayTicker(symbols, self)
+
+    def _recorded(self, module, key):
+        """(params dir, sorted recorded symbols) for a module call."""
+        with self._lock:
+            if module not in self._index:
+                module_dir = os.path.join(self.record_dir, module)
+                dirs = sorted(os.listdir(module_dir)) if os.path.isdir(module_dir) else []
+                self._index[module] = {
+                    d: sorted(name[:-4] for name in os.listdir(os.path.join(module_dir, d)) if name.endswith('.pkl'))
+                    for d in dirs
+                }
+            recorded = self._index[module]
+        if key in recorded:
+            return key, recorded[key]
+        if recorded:
+            fallback = max(recorded, key=lambda d: len(recorded[d]))
+            return fallback, recorded[fallback]
+        return None, []
+
+    def _load(self, module, params_dir, symbol, recorded):
+        source = symbol
+        if symbol not in recorded:
+            source = recorded[zlib.crc32(symbol.encode('utf-8')) % len(recorded)]
+        with open(os.path.join(self.record_dir, module, params_dir, f"{source}.pkl"), 'rb') as f:
+            part = pickle.load(f)
+        if source != symbol and isinstance(part, pd.DataFrame):
+            part = part.rename(index={source: symbol}, level=0)
+        return part
+
+    def fetch(self, module, symbols, args, kwargs):
+        with self._lock:
+            delay = self.latency * self._random.uniform(0.5, 1.5)
+            fail = self._random.random() < self.error_rate
+        time.sleep(delay)
+        if fail:
+            raise Exception("Simulated HTTP 429 Too Many Requests")
+
+        params_dir, recorded = self._recorded(module, params_key(args, kwargs))
+        if not recorded:
+            return {symbol: f"No recorded {module} data" for symbol in symbols}
+        parts = {symbol: self._load(module, params_dir, symbol, recorded) for symbol in symbols}
+
+        start = kwargs.get('start')
+        if module == 'history' and start:
+            for symbol, part in parts.items():
+                if isinstance(part, pd.DataFrame) and 'date' in part.index.names:
+                    dates = pd.to_datetime(part.index.get_level_values('date').astype(str).str[:10])
+                    parts[symbol] = part[dates >= pd.Timestamp(start)]
+        return combine_parts(parts, symbols)
+
+
+_source = None
+_source_lock = threading.Lock()
+
+def get_source():
+    """Process-wide data source selected by YQ_SOURCE (live, record or replay)."""
+    global _source
+    with _source_lock:
+        if _source is None:
+            _source = {'record': RecordingSource, 'replay': ReplaySource}.get(YQ_SOURCE, LiveSource)()
+        return _source
+
+
+def write_universe(n_tickers, out_path, record_dir=YQ_RECORD_DIR):
+    """Tickers.csv-style file of `n_tickers`: recorded symbols first, then synthetic ones."""
+    recorded = set()
+    for root, _, files in os.walk(str(record_dir)):
+        recorded.update(name[:-4] for name in files if name.endswith('.pkl'))
+    symbols = sorted(recorded)[:n_tickers]
+    symbols += [f"SYN{i:05d}" for i in range(n_tickers - len(symbols))]
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    pd.DataFrame({'Symbol': symbols}).to_csv(out_path, index=False)
+    print(f"✅ Wrote {len(symbols)} tickers ({min(len(recorded), n_tickers)} recorded) to {out_path}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build a ticker universe for offline replay runs")
+    parser.add_argument('n_tickers', type=int, help="number of tickers, e.g. 500 or 5000")
+    parser.add_argument('--out', default=os.path.join(os.path.dirname(str(TICKERS_CSV)), 'Tickers_replay.csv'))
+    args = parser.parse_args()
+    write_universe(args.n_tickers, args.out)
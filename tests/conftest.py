@@ -0,0 +1,135 @@
+import datetime
+import os
+import sys
+
+# Tests import the ETL modules the way the scripts do, from the project root
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import pytest
+from etl.load_ledger import LOAD_LEDGER_TABLE
+
+
+def normalized(sql):
+    return ' '.join(sql.split())
+
+
+# --- Postgres stand-in: records statements, keeps the load ledger in memory ---
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.rowcount = conn.rowcount
+        self.query, self.params = '', None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def execute(self, query, params=None):
+        self.query, self.params = query, params
+        self.conn.statements.append(normalized(query))
+        self.conn.params.append(params)
+        if query.lstrip().startswith(f"INSERT INTO {LOAD_LEDGER_TABLE}"):
+            path, digest, table, rows = params
+            self.conn.pending[(table, path)] = (digest, rows, datetime.datetime.now())
+        elif ' PARTITION OF ' in query:
+            self.conn.partitions.add(query.split()[5].split('.')[-1])
+
+    def fetchone(self):
+        if f"FROM {LOAD_LEDGER_TABLE}" in self.query:
+            return self.conn.ledger.get(tuple(self.params))
+        if 'count(DISTINCT' in self.query:
+            return self.conn.staged
+        return None
+
+    def fetchall(self):
+        if 'pg_inherits' in self.query:
+            return [(name,) for name in sorted(self.conn.partitions)]
+        return []
+
+    def copy_expert(self, query, stream, size=8192):
+        self.conn.statements.append(normalized(query))
+        self.conn.params.append(None)
+        while stream.read(size):
+            pass
+
+
+class FakeConnection:
+    """Connection whose commits and rollbacks show up as COMMIT/ROLLBACK in `statements`."""
+
+    autocommit = True
+    dsn = None
+
+    def __init__(self):
+        self.statements, self.params = [], []
+        self.ledger, self.pending = {}, {}
+        self.partitions = set()
+        self.staged = None                # (rows, distinct keys, max date) of a snapshot staging table
+        self.rowcount = 3
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.statements.append('COMMIT')
+        self.params.append(None)
+        self.ledger.update(self.pending)
+        self.pending.clear()
+
+    def rollback(self):
+        self.statements.append('ROLLBACK')
+        self.params.append(None)
+        self.pending.clear()
+
+    def executed(self, prefix):
+        """(statement, params) pairs of the statements starting with `prefix`."""
+        return [(s, p) for s, p in zip(self.statements, self.params) if s.startswith(prefix)]
+
+
+@pytest.fixture
+def conn():
+    return FakeConnection()
+
+
+# --- Run manifest stand-in ---
+class FakeManifest:
+    def __init__(self, statuses=None):
+        self.statuses = dict(statuses or {})
+
+    def record(self, ticker, module, status, rows=0, path=None):
+        self.statuses[ticker] = status
+
+    def with_status(self, module, status):
+        return {ticker for ticker, s in self.statuses.items() if s == status}
+
+
+@pytest.fixture
+def manifest():
+    return FakeManifest()
+
+
+# --- Adaptive rate controller stand-in ---
+class FakeController:
+    def __init__(self):
+        self.events = []
+
+    def acquire(self, tokens=1):
+        pass
+
+    def on_success(self):
+        self.events.append('success')
+
+    def on_throttle(self):
+        self.events.append('throttle')
+
+
+@pytest.fixture
+def controller_events(monkeypatch):
+    """Events ('success'/'throttle') reported to the shared rate controller by yq_cache."""
+    from etl import yq_cache
+    controller = FakeController()
+    monkeypatch.setattr(yq_cache, 'get_rate_controller', lambda: controller)
+    return controller.events
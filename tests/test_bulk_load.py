@@ -0,0 +1,94 @@
+import datetime
+import os
+import pandas as pd
+import pytest
+from etl.bulk_load import _upsert_sql, load_file
+from etl.load_ledger import file_digest
+
+REPORTS = 'yahooquery.pricing_technical_reports'
+
+
+def normalized(sql):
+    return ' '.join(sql.split())
+
+
+# --- Upsert statement ---
+def test_upsert_updates_non_key_columns_and_keeps_the_last_duplicate():
+    sql = normalized(_upsert_sql('yahooquery.pricing_history', 'stage', ['date', 'ticker', 'close'],
+                                 'date, ticker, close', ('ticker', 'date')))
+    assert 'INSERT INTO yahooquery.pricing_history AS t (date, ticker, close)' in sql
+    assert 'SELECT DISTINCT ON (ticker, date) date, ticker, close FROM stage ORDER BY ticker, date, ctid DESC' in sql
+    assert sql.endswith('ON CONFLICT (ticker, date) DO UPDATE SET close = EXCLUDED.close')
+
+
+def test_upsert_of_key_columns_only_does_nothing_on_conflict():
+    sql = normalized(_upsert_sql('yahooquery.pricing_history', 'stage', ['date', 'ticker'],
+                                 'date, ticker', ('ticker', 'date')))
+    assert sql.endswith('ON CONFLICT (ticker, date) DO NOTHING')
+
+
+def test_changed_only_upsert_skips_identical_rows_comparing_json_as_text():
+    columns = ['ticker', 'date', 'profile_city', 'profile_companyOfficers']
+    sql = normalized(_upsert_sql('yahooquery.fundamentals_profile_data', 'stage', columns, ', '.join(columns),
+                                 ('ticker', 'date'), changed_only=True))
+    assert sql.endswith(
+        'WHERE (t.profile_city, t.profile_companyOfficers::text) '
+        'IS DISTINCT FROM (EXCLUDED.profile_city, EXCLUDED.profile_companyOfficers::text)')
+
+
+def write_reports(path, symbols):
+    pd.DataFrame({'date': '2026-10-16', 'symbol': list(symbols), 'id': range(len(symbols))}).to_csv(path, index=False)
+    return str(path)
+
+
+def published(conn):
+    return conn.executed(f"INSERT INTO {REPORTS}")
+
+
+# --- Snapshots: the size guard compares with the last published snapshot ---
+def test_snapshot_smaller_than_the_last_published_one_is_refused(tmp_path, conn):
+    conn.staged = (3, 3, datetime.date(2026, 10, 16))
+    path = write_reports(tmp_path / 'reports.csv', 'ABC')
+    conn.ledger[(REPORTS, os.path.abspath(path))] = ('previous content', 10, datetime.datetime.now())
+
+    with pytest.raises(ValueError, match='last published snapshot'):
+        load_file(conn, path, REPORTS, drop_indexes=False, snapshot=True)
+    assert conn.ledger[(REPORTS, os.path.abspath(path))][:2] == ('previous content', 10)
+    assert not published(conn)
+    # The staging table is left for inspection
+    assert not conn.executed('DROP TABLE yahooquery._snapshot')
+
+
+def test_snapshot_is_published_and_recorded(tmp_path, conn):
+    conn.staged = (3, 3, datetime.date(2026, 10, 16))
+    path = write_reports(tmp_path / 'reports.csv', 'ABC')
+    conn.ledger[(REPORTS, os.path.abspath(path))] = ('previous content', 4, datetime.datetime.now())
+
+    assert load_file(conn, path, REPORTS, drop_indexes=False, snapshot=True) == 3
+    assert published(conn)
+    assert conn.executed('DROP TABLE yahooquery._snapshot')
+    assert conn.ledger[(REPORTS, os.path.abspath(path))][:2] == (file_digest(path), 3)
+
+
+# --- Load ledger: skip unchanged files, reload changed ones ---
+def test_unchanged_file_is_skipped_and_changed_file_reloaded(tmp_path, conn):
+    path = write_reports(tmp_path / 'reports.csv', 'ABC')
+
+    assert load_file(conn, path, REPORTS, drop_indexes=False) == 3
+    assert conn.ledger[(REPORTS, os.path.abspath(path))][:2] == (file_digest(path), 3)
+
+    copies = len(conn.executed('COPY'))
+    assert load_file(conn, path, REPORTS, drop_indexes=False) == 0
+    assert len(conn.executed('COPY')) == copies
+
+    write_reports(path, 'ABD')
+    assert load_file(conn, path, REPORTS, drop_indexes=False) == 3
+    assert len(conn.executed('COPY')) > copies
+    assert conn.ledger[(REPORTS, os.path.abspath(path))][0] == file_digest(path)
+
+
+def test_ledger_off_reloads_unchanged_files(tmp_path, monkeypatch, conn):
+    monkeypatch.setattr('etl.bulk_load.LOAD_LEDGER', False)
+    path = write_reports(tmp_path / 'reports.csv', 'ABC')
+    load_file(conn, path, REPORTS, drop_indexes=False)
+    assert load_file(conn, path, REPORTS, drop_indexes=False) == 3
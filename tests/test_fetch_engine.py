@@ -0,0 +1,62 @@
+import time
+import pytest
+from etl import fetch_engine
+from etl.fetch_engine import AdaptiveRateController, is_throttle_error
+
+
+@pytest.fixture
+def controller(monkeypatch):
+    monkeypatch.setattr(fetch_engine.random, 'uniform', lambda low, high: 1.0)  # No jitter
+    return AdaptiveRateController(rate=4, capacity=4, min_rate=1, max_rate=5, increase_step=0.5,
+                                  decrease_factor=0.5, base_backoff=0.01, max_backoff=0.04)
+
+
+def backoff_after_throttle(controller):
+    before = time.monotonic()
+    controller.on_throttle()
+    return controller._blocked_until - before
+
+
+def test_success_raises_rate_up_to_max(controller):
+    for _ in range(3):
+        controller.on_success()
+    assert controller.current_rate == 5
+    assert controller.successes == 3
+
+
+def test_throttle_cuts_rate_down_to_min_and_drains_tokens(controller):
+    controller.on_throttle()
+    assert controller.current_rate == 2
+    assert controller._tokens == 0
+    controller.on_throttle()
+    controller.on_throttle()
+    assert controller.current_rate == 1
+    assert controller.throttles == 3
+
+
+def test_backoff_doubles_per_consecutive_throttle_up_to_max(controller):
+    backoffs = [backoff_after_throttle(controller) for _ in range(4)]
+    assert backoffs == pytest.approx([0.01, 0.02, 0.04, 0.04], abs=0.005)
+
+
+def test_success_resets_backoff_streak(controller):
+    backoff_after_throttle(controller)
+    backoff_after_throttle(controller)
+    controller.on_success()
+    controller._blocked_until = 0.0  # The earlier pause has run out
+    assert backoff_after_throttle(controller) == pytest.approx(0.01, abs=0.005)
+
+
+def test_acquire_waits_out_the_backoff(controller):
+    controller.on_success()
+    controller._tokens = controller.capacity
+    controller._blocked_until = time.monotonic() + 0.05
+    start = time.monotonic()
+    controller.acquire(1)
+    assert time.monotonic() - start >= 0.04
+
+
+def test_is_throttle_error():
+    assert is_throttle_error(Exception("HTTP 429"))
+    assert is_throttle_error("Too Many Requests")
+    assert not is_throttle_error(Exception("No fundamentals data found for symbol: XYZ"))
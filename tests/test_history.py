@@ -0,0 +1,183 @@
+import json
+from datetime import date
+from functools import partial
+import pandas as pd
+import pytest
+from etl._1_pricing import _1_history as history
+from etl._1_pricing import load_pricing, watermarks
+from etl.staging import list_frames, read_frame
+
+FRIDAY = date(2026, 10, 16)
+
+
+def bars(ticker, days, dividends=None):
+    dividends = dividends or {}
+    return pd.DataFrame({
+        'date': [date.fromisoformat(d) for d in days], 'ticker': ticker,
+        'open': 1.0, 'high': 1.0, 'low': 1.0, 'close': 1.0, 'adjclose': 1.0, 'volume': 100,
+        'dividends': [dividends.get(d, 0.0) for d in days], 'splits': 0.0,
+    })
+
+
+class FakeTicker:
+    response = None
+
+    def __init__(self, symbols):
+        self.symbols = symbols
+
+    def history(self, **kwargs):
+        if isinstance(self.response, Exception):
+            raise self.response
+        return self.response
+
+
+@pytest.fixture
+def extract(monkeypatch, tmp_path, manifest):
+    """download_price_history against a canned yahooquery response; returns (corporate actions, statuses)."""
+    monkeypatch.setattr(history, 'get_manifest', lambda step: manifest)
+    monkeypatch.setattr(history, 'Ticker', FakeTicker)
+
+    def run(response, tickers, **kwargs):
+        FakeTicker.response = response
+        found = history.download_price_history(tickers, str(tmp_path), **kwargs)
+        return found, manifest.statuses
+    return run
+
+
+# --- Planning: incremental pulls start at the watermark day ---
+def test_plan_starts_at_the_watermark_day_and_skips_future_starts(monkeypatch):
+    monkeypatch.setattr(history, 'trading_date', lambda: FRIDAY)
+    jobs = history.plan_history_jobs(
+        ['NEW', 'FRI', 'THU', 'LATER'],
+        {'FRI': '2026-10-16', 'THU': '2026-10-15', 'LATER': '2026-10-17'},
+    )
+    assert jobs == [(['NEW'], None), (['THU'], '2026-10-15'), (['FRI'], '2026-10-16')]
+
+
+def test_plan_batches_tickers_sharing_a_start(monkeypatch):
+    monkeypatch.setattr(history, 'trading_date', lambda: FRIDAY)
+    tickers = [f"T{i}" for i in range(history.BATCH_SIZE + 1)]
+    jobs = history.plan_history_jobs(tickers, dict.fromkeys(tickers, '2026-10-15'))
+    assert [len(batch) for batch, _ in jobs] == [history.BATCH_SIZE, 1]
+    assert {start for _, start in jobs} == {'2026-10-15'}
+
+
+def test_drop_loaded_bars_keeps_the_watermark_day():
+    df = bars('A', ['2026-10-14', '2026-10-15', '2026-10-16'])
+    df['date'] = pd.to_datetime(df['date'])
+    kept = load_pricing.drop_loaded_bars(df, {'A': '2026-10-15'})
+    assert kept['date'].dt.strftime('%Y-%m-%d').tolist() == ['2026-10-15', '2026-10-16']
+
+
+def test_dividend_on_the_overlap_bar_does_not_trigger_a_rebuild(extract):
+    response = bars('A', ['2026-10-15', '2026-10-16'], {'2026-10-15': 0.5}).set_index(['ticker', 'date'])
+    found, statuses = extract(response, ['A'], start='2026-10-15')
+    assert found == [] and statuses == {'A': 'ok'}
+
+
+# --- Rebuilds: only a successful full refetch is 'rebuilt' ---
+def test_new_dividend_schedules_a_rebuild(extract):
+    response = bars('A', ['2026-10-15', '2026-10-16'], {'2026-10-16': 0.5}).set_index(['ticker', 'date'])
+    found, statuses = extract(response, ['A'], start='2026-10-15')
+    assert found == ['A'] and statuses == {'A': 'rebuild_pending'}
+
+
+def test_full_refetch_of_a_queued_ticker_is_recorded_as_rebuilt(extract):
+    response = pd.concat([bars('A', ['2026-10-15']), bars('B', ['2026-10-15'])]).set_index(['ticker', 'date'])
+    _, statuses = extract(response, ['A', 'B'], rebuilds={'A'})
+    assert statuses == {'A': 'rebuilt', 'B': 'ok'}
+
+
+def test_failed_refetch_is_not_recorded_as_rebuilt(extract):
+    _, statuses = extract(Exception("connection reset"), ['A'], rebuilds={'A'})
+    assert statuses == {'A': 'failed'}
+
+
+# --- Empty vs failed: only a symbol missing from a good response is 'empty' ---
+@pytest.mark.parametrize('response', [
+    'Too Many Requests',
+    {'A': 'Too Many Requests', 'B': 'Too Many Requests'},
+    pd.DataFrame(),
+])
+def test_error_payload_or_empty_batch_is_failed(extract, response):
+    _, statuses = extract(response, ['A', 'B'])
+    assert statuses == {'A': 'failed', 'B': 'failed'}
+
+
+def test_bar_of_an_open_session_is_staged_as_its_local_day(extract, tmp_path):
+    response = bars('A', ['2026-10-15', '2026-10-16'])
+    response['date'] = [date(2026, 10, 15), pd.Timestamp('2026-10-16 15:59', tz='America/New_York')]
+    _, statuses = extract(response.set_index(['ticker', 'date']), ['A'], start='2026-10-15')
+    assert statuses == {'A': 'ok'}
+    staged = read_frame(list_frames(str(tmp_path))[0])
+    assert staged['date'].astype(str).tolist() == ['2026-10-15', '2026-10-16']
+
+
+def test_symbol_missing_from_a_good_response_is_empty(extract):
+    _, statuses = extract(bars('A', ['2026-10-16']).set_index(['ticker', 'date']), ['A', 'B'])
+    assert statuses == {'A': 'ok', 'B': 'empty'}
+
+
+def test_symbol_erroring_next_to_good_ones_is_empty(extract):
+    response = {'A': bars('A', ['2026-10-16']).set_index(['ticker', 'date']),
+                'B': 'No data found, symbol may be delisted'}
+    _, statuses = extract(response, ['A', 'B'])
+    assert statuses == {'A': 'ok', 'B': 'empty'}
+
+
+@pytest.fixture
+def history_load(monkeypatch, tmp_path, conn, manifest):
+    """Run load_history on a merged file holding A's rebuilt history and B's incremental bars.
+
+    A and B were both queued for a rebuild; only A's full refetch succeeded.
+    Returns (rows, tickers deleted, loaded frame, tickers still queued).
+    """
+    merged = tmp_path / 'merged_history.csv'
+    pd.concat([
+        bars('A', ['2020-01-02', '2026-10-15']),
+        bars('B', ['2026-10-14', '2026-10-15']),
+    ]).to_csv(merged, index=False)
+    queue = tmp_path / 'rebuilds.json'
+    queue.write_text(json.dumps(['A', 'B']))
+
+    monkeypatch.setattr(load_pricing, 'merged_path', lambda directory, name: str(merged))
+    manifest.statuses.update({'A': 'rebuilt', 'B': 'failed'})
+    monkeypatch.setattr(load_pricing, 'get_manifest', lambda step: manifest)
+    monkeypatch.setattr(load_pricing, 'get_watermarks', lambda: {'A': '2026-10-15', 'B': '2026-10-15'})
+    monkeypatch.setattr(load_pricing, 'read_rebuilds', partial(watermarks.read_rebuilds, path=str(queue)))
+    monkeypatch.setattr(load_pricing, 'remove_rebuilds', partial(watermarks.remove_rebuilds, path=str(queue)))
+    monkeypatch.setattr(load_pricing, 'update_file_watermarks', lambda df: None)
+
+    def run(skipped=False):
+        loaded = []
+
+        def fake_load_file(conn, path, table, transform=None, before=None, **kwargs):
+            if skipped:
+                return 0  # Ledger skip: the file was already loaded
+            if before:
+                with conn.cursor() as cur:
+                    before(cur)
+            df = transform(pd.read_csv(path, parse_dates=['date']))
+            loaded.append(df)
+            return len(df)
+
+        monkeypatch.setattr(load_pricing, 'load_file', fake_load_file)
+        rows = load_pricing.load_history(conn)
+        deleted = [ticker for _, params in conn.executed('DELETE') for ticker in params[0]]
+        return rows, deleted, pd.concat(loaded) if loaded else None, watermarks.read_rebuilds(str(queue))
+    return run
+
+
+def test_failed_refetch_keeps_history_and_stays_queued(history_load):
+    rows, deleted, loaded, queued = history_load()
+    assert deleted == ['A']
+    assert queued == ['B']
+    # A's whole rebuilt history loads; B only from its watermark day on
+    assert loaded.groupby('ticker')['date'].count().to_dict() == {'A': 2, 'B': 1}
+    assert rows == 3
+
+
+def test_nothing_is_dequeued_when_the_load_wrote_no_rows(history_load):
+    rows, deleted, _, queued = history_load(skipped=True)
+    assert rows == 0 and deleted == []
+    assert queued == ['A', 'B']
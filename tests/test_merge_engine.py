@@ -0,0 +1,89 @@
+import os
+import pandas as pd
+import pytest
+from etl.merge_engine import incremental_merge, input_key, load_manifest
+from etl.staging import write_frame
+
+
+def stage(root, day, ticker, value):
+    return write_frame(pd.DataFrame({'ticker': [ticker] * 2, 'x': [value, value + 1.0]}),
+                       os.path.join(root, 'segment', f'date={day}', f'{ticker}.parquet'))
+
+
+def stamp_date(day):
+    def transform(df):
+        df.insert(0, 'date', day)
+        return df
+    return transform
+
+
+@pytest.fixture
+def merge(tmp_path):
+    output = str(tmp_path / 'merged.parquet')
+
+    def run(files, day='2026-10-15', params=None):
+        rows = incremental_merge(files, output, transform=stamp_date(day), params=params, stamp={'date': day})
+        return rows, pd.read_parquet(output)
+    return run
+
+
+def test_input_key_drops_the_run_date_partition():
+    assert input_key('out/history/date=2026-10-15/AAPL.parquet') == os.path.join('out/history', 'AAPL.parquet')
+    assert input_key('out/merged/AAPL.parquet') == os.path.join('out/merged', 'AAPL.parquet')
+
+
+def test_only_changed_files_are_reread(tmp_path, merge, capsys):
+    files = [stage(tmp_path, '2026-10-15', t, 1.0) for t in 'ABC']
+    merge(files)
+    stage(tmp_path, '2026-10-15', 'B', 5.0)
+    capsys.readouterr()
+
+    rows, df = merge(files)
+    assert 're-merged 1 changed files, dropped 0, reused 2' in capsys.readouterr().out
+    assert rows == 6
+    assert df['ticker'].tolist() == ['A', 'A', 'B', 'B', 'C', 'C']
+    assert df['x'].tolist() == [1.0, 2.0, 5.0, 6.0, 1.0, 2.0]
+
+
+def test_unchanged_inputs_keep_the_previous_output(tmp_path, merge, capsys):
+    files = [stage(tmp_path, '2026-10-15', t, 1.0) for t in 'AB']
+    merge(files)
+    before = os.stat(tmp_path / 'merged.parquet').st_mtime_ns
+    capsys.readouterr()
+
+    rows, _ = merge(files)
+    assert rows == 4
+    assert 'no input changes' in capsys.readouterr().out
+    assert os.stat(tmp_path / 'merged.parquet').st_mtime_ns == before
+
+
+def test_files_restaged_under_a_new_run_date_are_reused_and_restamped(tmp_path, merge, capsys):
+    merge([stage(tmp_path, '2026-10-15', t, 1.0) for t in 'ABC'])
+    files = [stage(tmp_path, '2026-10-16', t, 1.0 if t != 'C' else 9.0) for t in 'ABC']
+    capsys.readouterr()
+
+    _, df = merge(files, day='2026-10-16')
+    assert 're-merged 1 changed files, dropped 0, reused 2' in capsys.readouterr().out
+    assert set(df['date']) == {'2026-10-16'}
+    assert df['x'].tolist() == [1.0, 2.0, 1.0, 2.0, 9.0, 10.0]
+    assert set(load_manifest(str(tmp_path / 'merged.parquet'))['files']) == {input_key(f) for f in files}
+
+
+def test_removed_files_are_dropped(tmp_path, merge, capsys):
+    files = [stage(tmp_path, '2026-10-15', t, 1.0) for t in 'ABC']
+    merge(files)
+    capsys.readouterr()
+
+    rows, df = merge([files[0], files[2]])
+    assert 'dropped 1' in capsys.readouterr().out
+    assert rows == 4 and df['ticker'].tolist() == ['A', 'A', 'C', 'C']
+
+
+def test_different_params_rebuild_everything(tmp_path, merge, capsys):
+    files = [stage(tmp_path, '2026-10-15', t, 1.0) for t in 'AB']
+    merge(files, params={'postprocess': None})
+    capsys.readouterr()
+
+    rows, _ = merge(files, params={'postprocess': 'clean'})
+    assert rows == 4
+    assert '♻️' not in capsys.readouterr().out
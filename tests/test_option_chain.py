@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+from etl._1_pricing import _2_option_chain as option_chain
+
+
+def chain(symbol):
+    return pd.DataFrame({
+        'symbol': symbol, 'expiration': pd.Timestamp('2026-11-20'), 'optionType': 'calls',
+        'contractSymbol': f"{symbol}261120C00010000", 'strike': 10.0, 'lastPrice': 1.0, 'bid': 0.9, 'ask': 1.1,
+        'volume': 5, 'openInterest': 7, 'impliedVolatility': 0.3, 'inTheMoney': True,
+    }, index=[0]).set_index(['symbol', 'expiration', 'optionType'])
+
+
+class FakeTicker:
+    responses = []
+
+    def __init__(self, symbols, **kwargs):
+        self.symbols = symbols
+
+    @property
+    def option_chain(self):
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+@pytest.fixture
+def retry(monkeypatch, tmp_path, manifest):
+    """retry_symbol('A') against canned responses; returns (result, statuses, sleeps)."""
+    sleeps = []
+    monkeypatch.setattr(option_chain, 'Ticker', FakeTicker)
+    monkeypatch.setattr(option_chain, 'get_manifest', lambda step: manifest)
+    monkeypatch.setattr(option_chain, 'PRICING_OPTION_CHAIN_OUTPUT_DIR', str(tmp_path))
+    monkeypatch.setattr(option_chain.time, 'sleep', sleeps.append)
+
+    def run(*responses):
+        FakeTicker.responses = list(responses)
+        return option_chain.retry_symbol('A'), manifest.statuses, sleeps
+    return run
+
+
+@pytest.mark.parametrize('response', [{'A': 'No option chain data found'}, chain('B')])
+def test_symbol_without_listed_options_is_empty(retry, response):
+    ok, statuses, _ = retry(response)
+    assert ok and statuses == {'A': 'empty'}
+
+
+def test_transport_errors_back_off_and_end_failed(retry):
+    ok, statuses, sleeps = retry(*[ConnectionError("connection reset")] * option_chain.MAX_RETRIES)
+    assert not ok and statuses == {'A': 'failed'}
+    assert len(sleeps) == option_chain.MAX_RETRIES and sleeps == sorted(sleeps) and sleeps[0] > 0
+
+
+def test_throttled_retry_is_attempted_again(retry):
+    ok, statuses, sleeps = retry('Too Many Requests', chain('A'))
+    assert ok and statuses == {'A': 'ok'}
+    assert len(sleeps) == 2
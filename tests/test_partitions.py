@@ -0,0 +1,69 @@
+import datetime
+import pandas as pd
+import pytest
+from etl import bulk_load, partitions
+from etl.partitions import ensure_partitions, prepare_partitions, retention_start
+
+
+def created(conn):
+    return [stmt.split()[5].split('.')[-1] for stmt, _ in conn.executed('CREATE TABLE') if ' PARTITION OF ' in stmt]
+
+
+def test_retention_start_counts_back_whole_periods():
+    today = datetime.date(2026, 3, 15)
+    assert retention_start('pricing_history', today, {'pricing_history': 2}) == datetime.date(2025, 1, 1)
+    assert retention_start('pricing_option_chain', today, {'pricing_option_chain': 3}) == datetime.date(2026, 1, 1)
+    assert retention_start('pricing_history', today, {'pricing_history': 0}) is None
+
+
+def test_rows_before_the_retention_start_are_dropped_not_partitioned(monkeypatch, conn):
+    monkeypatch.setitem(partitions.RETAIN, 'pricing_history', 2)
+    year = datetime.date.today().year
+    df = pd.DataFrame({'date': [f"{year - 3}-06-01", f"{year - 1}-06-01", f"{year}-01-02"], 'ticker': 'A'})
+    conn.partitions.add(f"pricing_history_y{year}")
+
+    kept = ensure_partitions(conn.cursor(), 'yahooquery.pricing_history', df)
+    assert kept['date'].tolist() == [f"{year - 1}-06-01", f"{year}-01-02"]
+    assert created(conn) == [f"pricing_history_y{year - 1}"]
+
+
+def test_without_retention_every_period_gets_a_partition(monkeypatch, conn):
+    monkeypatch.setitem(partitions.RETAIN, 'pricing_option_chain', 0)
+    df = pd.DataFrame({'date': ['2019-11-20', '2020-01-03'], 'contractSymbol': ['X', 'Y']})
+
+    assert len(ensure_partitions(conn.cursor(), 'pricing_option_chain', df)) == 2
+    assert created(conn) == ['pricing_option_chain_m2019_11', 'pricing_option_chain_m2019_12',
+                             'pricing_option_chain_m2020_01']
+
+
+def test_other_tables_pass_through(conn):
+    df = pd.DataFrame({'date': ['1990-01-01'], 'symbol': ['A']})
+    assert ensure_partitions(conn.cursor(), 'yahooquery.pricing_technical_reports', df) is df
+    assert prepare_partitions(conn, 'yahooquery.pricing_technical_reports', [df]) == []
+    assert conn.statements == []
+
+
+def test_prepared_partitions_span_all_chunks_and_are_committed(monkeypatch, conn):
+    monkeypatch.setitem(partitions.RETAIN, 'pricing_history', 0)
+    chunks = [pd.DataFrame({'date': ['2024-03-01']}), pd.DataFrame({'date': ['2022-12-30']})]
+
+    assert prepare_partitions(conn, 'pricing_history', chunks) == [
+        'pricing_history_y2022', 'pricing_history_y2023', 'pricing_history_y2024']
+    assert conn.statements[-1] == 'COMMIT'
+
+
+@pytest.mark.parametrize('snapshot', [False, True])
+def test_load_commits_new_partitions_before_copying(monkeypatch, tmp_path, conn, snapshot):
+    monkeypatch.setitem(partitions.RETAIN, 'pricing_history', 0)
+    monkeypatch.setattr(bulk_load, 'LOAD_COMMIT', 'chunk')
+    path = tmp_path / 'history.csv'
+    pd.DataFrame({'ticker': ['A', 'A'], 'date': ['2024-12-31', '2025-01-02'], 'close': [1.0, 2.0]}).to_csv(
+        path, index=False)
+    conn.staged = (2, 2, datetime.date(2025, 1, 2))
+
+    bulk_load.load_file(conn, path, 'yahooquery.pricing_history', drop_indexes=False, snapshot=snapshot)
+    assert created(conn) == ['pricing_history_y2024', 'pricing_history_y2025']
+    last_create = max(i for i, stmt in enumerate(conn.statements) if ' PARTITION OF ' in stmt)
+    first_copy = next(i for i, stmt in enumerate(conn.statements) if stmt.startswith('COPY'))
+    assert last_create < first_copy
+    assert 'COMMIT' in conn.statements[last_create:first_copy]
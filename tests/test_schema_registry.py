@@ -0,0 +1,27 @@
+import pandas as pd
+import pytest
+from etl.schema_registry import _to_dates
+
+
+@pytest.mark.parametrize('values, expected', [
+    # Daily dates next to the bar of a session still open
+    (['2024-01-02', '2024-01-03 15:59:00-05:00'], ['2024-01-02 00:00', '2024-01-03 15:59']),
+    (['2024-01-03 15:59:00-05:00', '2024-01-02', None], ['2024-01-03 15:59', '2024-01-02 00:00', None]),
+    # One offset for the whole column, and offsets changing across a DST switch
+    (['2024-01-03 15:59:00-05:00', '2024-01-04 15:59:00-05:00'], ['2024-01-03 15:59', '2024-01-04 15:59']),
+    (['2024-03-08 15:59:00-05:00', '2024-03-11 15:59:00-04:00'], ['2024-03-08 15:59', '2024-03-11 15:59']),
+])
+def test_timestamps_with_utc_offsets_keep_their_local_time_naive(values, expected):
+    converted = _to_dates(pd.Series(values), dayfirst=False)
+    assert not isinstance(converted.dtype, pd.DatetimeTZDtype)
+    assert converted.tolist() == [pd.Timestamp(v) if v else pd.NaT for v in expected]
+
+
+def test_unparseable_dates_become_null():
+    converted = _to_dates(pd.Series(['2024-01-02', 'not a date']), dayfirst=False)
+    assert converted.isna().tolist() == [False, True]
+
+
+def test_epoch_seconds_and_milliseconds():
+    assert _to_dates(pd.Series([1704153600]), False).tolist() == [pd.Timestamp('2024-01-02')]
+    assert _to_dates(pd.Series([1704153600000]), False).tolist() == [pd.Timestamp('2024-01-02')]
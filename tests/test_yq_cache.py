@@ -0,0 +1,63 @@
+import pandas as pd
+import pytest
+from etl.yq_cache import CachedTicker
+
+
+class FakeLive:
+    def __init__(self, result):
+        self.result = result
+
+    def get_modules(self, *args, **kwargs):
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+    history = get_modules
+
+
+def call_live(monkeypatch, result, module='get_modules', symbols=('AAA',)):
+    ticker = CachedTicker(list(symbols))
+    monkeypatch.setattr(ticker, '_live_ticker', lambda symbols=None: FakeLive(result))
+    return ticker._call_live(module, list(symbols), (), {}, False)
+
+
+@pytest.mark.parametrize('result', [
+    {'AAA': 'No fundamentals data found for symbol: AAA'},
+    {},
+    pd.DataFrame(),
+])
+def test_empty_response_is_neither_success_nor_throttling(monkeypatch, controller_events, result):
+    _, parts = call_live(monkeypatch, result)
+    assert parts == {}
+    assert controller_events == []
+
+
+def test_throttled_history_is_not_a_success(monkeypatch, controller_events):
+    # yahooquery answers a throttled history() with an empty frame
+    _, parts = call_live(monkeypatch, pd.DataFrame(), module='history')
+    assert parts == {}
+    assert controller_events == []
+
+
+def test_throttle_error_for_one_symbol_backs_off(monkeypatch, controller_events):
+    result = {'AAA': {'price': {'regularMarketPrice': 429.0}}, 'BBB': 'HTTP 429 Too Many Requests'}
+    _, parts = call_live(monkeypatch, result, symbols=('AAA', 'BBB'))
+    assert list(parts) == ['AAA']
+    assert controller_events == ['throttle']
+
+
+def test_throttle_text_in_response_backs_off(monkeypatch, controller_events):
+    call_live(monkeypatch, 'Too Many Requests')
+    assert controller_events == ['throttle']
+
+
+def test_raised_429_backs_off(monkeypatch, controller_events):
+    with pytest.raises(Exception, match='429'):
+        call_live(monkeypatch, Exception("HTTP 429 Too Many Requests"))
+    assert controller_events == ['throttle']
+
+
+def test_usable_response_is_success(monkeypatch, controller_events):
+    _, parts = call_live(monkeypatch, {'AAA': {'price': {'regularMarketPrice': 429.0}}})
+    assert list(parts) == ['AAA']
+    assert controller_events == ['success']
@@ -38,14 +38,62 @@ STATIC_DIR = ROOT_DIR / "output/Static Data"
 MERGED_DIR = ROOT_DIR / "output/merged"
 MERGED_DIR_CLEAN = (ROOT_DIR / "output/merged").resolve()
 
+# Per-run extraction manifests (resume support)
+MANIFEST_DIR = ROOT_DIR / "output" / "manifests"
+ETL_RUN_ID = os.getenv('ETL_RUN_ID', today_str)
+ETL_RESUME = os.getenv('ETL_RESUME', '').lower() in ('1', 'true', 'yes')
+ETL_SHARDS = int(os.getenv('ETL_SHARDS', '1'))     # >1 runs extract steps in that many processes
+
+# Staging format for extract and merge outputs: 'parquet' (zstd) or 'csv'
+STAGING_FORMAT = os.getenv('ETL_STAGING_FORMAT', 'parquet').lower()
+STAGING_EXT = '.csv' if STAGING_FORMAT == 'csv' else '.parquet'
+MERGE_WORKERS = int(os.getenv('MERGE_WORKERS', str(min(8, os.cpu_count() or 1))))  # Files read in parallel by merges
+MERGE_EXECUTOR = os.getenv('MERGE_EXECUTOR', 'thread').lower()                     # 'thread' or 'process'
+
+# Database loads go through COPY FROM STDIN: 'text' or 'binary' wire format
+COPY_FORMAT = os.getenv('ETL_COPY_FORMAT', 'text').lower()
+# Loads read and COPY merged files in row chunks sized to stay under LOAD_MEMORY_MB
+LOAD_MEMORY_MB = int(os.getenv('ETL_LOAD_MEMORY_MB', '256'))                       # Memory ceiling per table load
+LOAD_CHUNK_ROWS = int(os.getenv('ETL_LOAD_CHUNK_ROWS', '200000'))                  # Upper bound on rows per chunk
+LOAD_COMMIT = os.getenv('ETL_LOAD_COMMIT', 'table').lower()                        # 'table' (one transaction) or 'chunk' (resumable)
+LOAD_WORKERS = int(os.getenv('ETL_LOAD_WORKERS', '4'))                             # Tables loaded concurrently (pooled connections)
+INDEX_DROP_ROWS = int(os.getenv('ETL_INDEX_DROP_ROWS', '1000000'))                 # Loads this large drop secondary indexes first (0 = never)
+SNAPSHOT_LOAD = os.getenv('ETL_SNAPSHOT_LOAD', '1').lower() in ('1', 'true', 'yes')  # Stage daily snapshots, publish them atomically
+SNAPSHOT_MIN_RATIO = float(os.getenv('ETL_SNAPSHOT_MIN_RATIO', '0.5'))             # Refuse snapshots smaller than this x the previous day
+LOAD_LEDGER = os.getenv('ETL_LOAD_LEDGER', '1').lower() in ('1', 'true', 'yes')    # Skip files whose content is already loaded
+
+# Partition maintenance (pricing_history by year, pricing_option_chain by month); 0 keeps every partition
+PARTITION_PREMAKE = int(os.getenv('ETL_PARTITION_PREMAKE', '2'))                   # Periods created ahead of today
+HISTORY_RETAIN_YEARS = int(os.getenv('ETL_HISTORY_RETAIN_YEARS', '0'))             # Older yearly partitions are detached
+OPTION_CHAIN_RETAIN_MONTHS = int(os.getenv('ETL_OPTION_CHAIN_RETAIN_MONTHS', '0')) # Older monthly partitions are detached
+PARTITION_ARCHIVE = os.getenv('ETL_PARTITION_ARCHIVE', '').lower() in ('1', 'true', 'yes')  # Export detached partitions and drop them
+PARTITION_ARCHIVE_DIR = ARCHIVE_DIR / "partitions"
+
+# On-disk yahooquery response cache
+YQ_CACHE_DIR = ROOT_DIR / "cache" / "yahooquery"
+YQ_CACHE_ENABLED = os.getenv('YQ_CACHE', '1').lower() not in ('0', 'false', 'no')
+YQ_CACHE_MAX_MB = int(os.getenv('YQ_CACHE_MAX_MB', '2048'))
+
+# yahooquery data source: 'live', 'record' (live + save responses) or 'replay' (offline)
+YQ_SOURCE = os.getenv('YQ_SOURCE', 'live').lower()
+YQ_RECORD_DIR = Path(os.getenv('YQ_RECORD_DIR', ROOT_DIR / "recordings" / "yahooquery"))
+YQ_REPLAY_LATENCY_MS = float(os.getenv('YQ_REPLAY_LATENCY_MS', '200'))   # Mean simulated latency per call
+YQ_REPLAY_ERROR_RATE = float(os.getenv('YQ_REPLAY_ERROR_RATE', '0'))     # Share of calls answered with a 429
+YQ_REPLAY_SEED = int(os.getenv('YQ_REPLAY_SEED', '42'))
+
 # Tickers
-TICKERS_CSV = STATIC_DIR / "Tickers.csv"
+TICKERS_CSV = Path(os.getenv('ETL_TICKERS_CSV', STATIC_DIR / "Tickers.csv"))   # Override e.g. for replay universes
 
 # Pricing
 PRICING_HISTORY_OUTPUT_DIR = ROOT_DIR / "output/_1_pricing/history"
 PRICING_OPTION_CHAIN_OUTPUT_DIR = ROOT_DIR / "output/_1_pricing/option_chain"
 PRICING_TECHNICAL_INSIGHTS_OUTPUT_DIR = ROOT_DIR / "output/_1_pricing/technical_insights"
 
+# Incremental history: last loaded date per ticker (fallback when the DB is unreachable)
+PRICING_HISTORY_WATERMARKS = STATIC_DIR / "history_watermarks.json"
+PRICING_HISTORY_REBUILDS = STATIC_DIR / "history_rebuilds.json"    # Tickers to replace after a split/dividend
+FORCE_FULL_HISTORY = os.getenv('FORCE_FULL_HISTORY', '').lower() in ('1', 'true', 'yes')
+
 # Financial Statements
 FINANCIAL_STATEMENTS_DIR = ROOT_DIR / "output/_2_financial_statements"
 FINANCIAL_STATEMENTS_OUTPUT_DIRS = {
@@ -65,13 +113,13 @@ FINANCIAL_STATEMENTS_OUTPUT_DIRS = {
 
 # Fundamentals
 FUNDAMENTALS_OUTPUT_DIR = ROOT_DIR / "output" / "_3_fundamentals" / "Batches"
-FUNDAMENTALS_FINANCIAL_DATA = MERGED_DIR_CLEAN / 'fin_merged.csv'
-FUNDAMENTALS_KEY_STATS = MERGED_DIR_CLEAN / 'keystats_merged.csv'
-FUNDAMENTALS_PRICE_DATA = MERGED_DIR_CLEAN / 'price_merged.csv'
-FUNDAMENTALS_PROFILE_DATA = MERGED_DIR_CLEAN / 'profile_merged.csv'
-FUNDAMENTALS_SUMMARY_DATA = MERGED_DIR_CLEAN / 'summary_merged.csv'
-FUNDAMENTALS_VALUATION = MERGED_DIR_CLEAN / 'valuation_merged.csv'
-FUNDAMENTALS_OFFICERS = MERGED_DIR_CLEAN / 'officers_merged.csv'
+FUNDAMENTALS_FINANCIAL_DATA = MERGED_DIR_CLEAN / f'fin_merged{STAGING_EXT}'
+FUNDAMENTALS_KEY_STATS = MERGED_DIR_CLEAN / f'keystats_merged{STAGING_EXT}'
+FUNDAMENTALS_PRICE_DATA = MERGED_DIR_CLEAN / f'price_merged{STAGING_EXT}'
+FUNDAMENTALS_PROFILE_DATA = MERGED_DIR_CLEAN / f'profile_merged{STAGING_EXT}'
+FUNDAMENTALS_SUMMARY_DATA = MERGED_DIR_CLEAN / f'summary_merged{STAGING_EXT}'
+FUNDAMENTALS_VALUATION = MERGED_DIR_CLEAN / f'valuation_merged{STAGING_EXT}'
+FUNDAMENTALS_OFFICERS = MERGED_DIR_CLEAN / f'officers_merged{STAGING_EXT}'
 
 # Table Names
 PRICING_HISTORY_TABLE_NAME = 'yahooquery.pricing_history'